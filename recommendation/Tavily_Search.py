@@ -1,63 +1,225 @@
+import os
+import threading
+import time
 import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+from pipeline_utils import join, submit_to
+from tracing import traced
+from weather_utils import get_season
+
+TAVILY_BASE_URL = os.environ.get("TAVILY_BASE_URL", "https://api.tavily.com")
+TAVILY_REQUEST_TIMEOUT = 15        # 초
+TAVILY_CACHE_TTL = 30 * 60         # 초, 같은 (쿼리, 검색 깊이)는 이 시간 동안 재사용
+TAVILY_POOL_SIZE = 10              # 세션이 유지하는 연결 수 (동시 검색 스레드 수도 같음)
+TAVILY_MAX_RESULTS = 5
+
+# 트렌드 조사용 기본 쿼리 (계절 쿼리는 trend_queries()가 덧붙임)
+TREND_QUERIES = ("요즘 유행하는 음식", "홍대 맛집 트렌드")
+SEASON_TREND_QUERIES = {
+    "winter": "겨울 제철 음식 유행",
+    "spring": "봄 제철 음식 유행",
+    "summer": "여름 보양식 유행",
+    "fall": "가을 제철 음식 유행",
+}
+
+
+def trend_queries(month=None):
+    """기본 트렌드 쿼리 + 이번 계절 쿼리"""
+    month = datetime.now().month if month is None else month
+    return list(TREND_QUERIES) + [SEASON_TREND_QUERIES[get_season(month)]]
+
+
+def normalize_url(url):
+    """URL 중복 판단용 정규화: 스킴/호스트 소문자, 프래그먼트와 끝의 '/' 제거"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+class TavilyClient:
+    """
+    연결을 재사용하는 Tavily Search 클라이언트
+
+    - requests.Session 연결 풀 공유
+    - (쿼리, search_depth) 기준 TTL 결과 캐시
+    - search_many: 여러 쿼리를 클라이언트 전용 스레드 풀에서 동시에 보내고 결과를 URL 기준으로 합침
+
+    Args:
+        api_key: Tavily API 키
+        base_url: API 주소 (로컬 대역 서버로 바꿔 테스트 가능)
+        cache_ttl: 결과 캐시 유효 시간(초)
+        max_results: 쿼리당 결과 수
+    """
+
+    def __init__(self, api_key, base_url=TAVILY_BASE_URL, timeout=TAVILY_REQUEST_TIMEOUT,
+                 cache_ttl=TAVILY_CACHE_TTL, max_results=TAVILY_MAX_RESULTS,
+                 pool_size=TAVILY_POOL_SIZE):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.max_results = max_results
+
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # search_many 전용 스레드 풀. 호출하는 쪽이 공용 풀(pipeline_utils) 작업이어도
+        # 같은 풀에 검색을 넣고 기다리다 막히지 않도록 따로 둠 (스레드는 필요할 때 생성)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="tavily")
+
+        # (쿼리, search_depth) → (조회 시각, 응답)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+
+    @traced("tavily.search")
+    def search(self, query, search_depth="basic"):
+        """
+        쿼리 하나를 검색합니다. 캐시에 신선한 결과가 있으면 요청하지 않습니다.
+
+        Returns:
+            Tavily 응답 dict ({"query", "answer", "results": [...]})
+            요청 실패 시 예외가 그대로 전달되며, 실패는 캐시하지 않습니다.
+        """
+        key = (query, search_depth)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.cache_ttl:
+            return entry[1]
+
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "search_depth": search_depth,  # "basic" 또는 "advanced"
+            "include_answer": True,
+            "max_results": self.max_results,
+        }
+        response = self._session.post(f"{self.base_url}/search", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        result = response.json()
+
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), result)
+        return result
+
+    def search_many(self, queries, search_depth="basic"):
+        """
+        여러 쿼리를 동시에 검색하고 결과를 합칩니다.
+        같은 URL은 한 번만 남기며, 점수가 가장 높은 결과를 쓰고 찾은 쿼리를 모두 기록합니다.
+
+        Returns:
+            {
+                "answers": {쿼리: 요약 답변},
+                "results": [{"title", "url", "content", "score", "queries": [...]}, ...]  (점수 내림차순),
+                "errors": {쿼리: 에러 메시지},
+            }
+        """
+        queries = list(dict.fromkeys(queries))
+        responses = join({
+            query: submit_to(self._executor, self.search, query, search_depth) for query in queries
+        })
+
+        answers, errors, merged = {}, {}, {}
+        for query in queries:  # 쿼리 순서대로 합쳐 결과 순서를 고정
+            response = responses[query]
+            if isinstance(response, Exception):
+                errors[query] = str(response)
+                continue
+            if response.get("answer"):
+                answers[query] = response["answer"]
+
+            for item in response.get("results", []):
+                if not item.get("url"):
+                    continue
+                key = normalize_url(item["url"])
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = dict(item, queries=[query])
+                    continue
+                if query not in existing["queries"]:
+                    existing["queries"].append(query)
+                if item.get("score", 0) > existing.get("score", 0):
+                    existing.update(item, queries=existing["queries"])
+
+        results = sorted(merged.values(), key=lambda item: -item.get("score", 0))
+        return {"answers": answers, "results": results, "errors": errors}
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_tavily_client(api_key, base_url=TAVILY_BASE_URL):
+    """(API 키, 주소)별 공용 클라이언트 (처음 호출 시 생성)"""
+    key = (api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = TavilyClient(api_key, base_url=base_url)
+        return client
+
 
 def tavily_search(query, api_key):
     """
     Tavily Search API를 사용하여 검색을 수행합니다.
-    
+
     Args:
         query (str): 검색할 쿼리
         api_key (str): Tavily API 키
-    
+
     Returns:
-        dict: 검색 결과
+        dict: 검색 결과 (실패 시 None)
     """
-    url = "https://api.tavily.com/search"
-    
-    payload = {
-        "api_key": api_key,
-        "query": query,
-        "search_depth": "basic",  # "basic" 또는 "advanced"
-        "include_answer": True,
-        "max_results": 5
-    }
-    
-    headers = {
-        "Content-Type": "application/json"
-    }
-    
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return get_tavily_client(api_key).search(query)
     except requests.exceptions.RequestException as e:
         print(f"에러 발생: {e}")
         return None
 
 
+def tavily_search_many(queries, api_key, search_depth="basic"):
+    """여러 쿼리를 동시에 검색해 URL 기준으로 합친 결과를 반환합니다. (TavilyClient.search_many)"""
+    return get_tavily_client(api_key).search_many(queries, search_depth=search_depth)
+
+
 # 사용 예시
 if __name__ == "__main__":
     # API 키를 여기에 입력하세요
     API_KEY = ""
-    
-    # 검색 쿼리
-    search_query = "요즘 유행하는 음식"
-    
-    # 검색 실행
-    results = tavily_search(search_query, API_KEY)
-    
-    if results:
-        print(f"검색 쿼리: {search_query}\n")
-        
+
+    # 검색 쿼리 (기본 트렌드 + 계절)
+    search_queries = trend_queries()
+
+    # 검색 실행 (동시에)
+    results = tavily_search_many(search_queries, API_KEY)
+
+    if results["results"] or results["answers"]:
+        print(f"검색 쿼리: {', '.join(search_queries)}\n")
+
         # 답변이 있으면 출력
-        if "answer" in results:
-            print(f"요약 답변: {results['answer']}\n")
-        
-        # 검색 결과 출력
+        for query, answer in results["answers"].items():
+            print(f"요약 답변 ({query}): {answer}\n")
+
+        # 검색 결과 출력 (URL 중복 제거됨)
         print("검색 결과:")
-        for i, result in enumerate(results.get("results", []), 1):
+        for i, result in enumerate(results["results"], 1):
             print(f"\n{i}. {result.get('title', 'N/A')}")
             print(f"   URL: {result.get('url', 'N/A')}")
+            print(f"   쿼리: {', '.join(result['queries'])}")
             print(f"   내용: {result.get('content', 'N/A')[:200]}...")
     else:
-        print("검색 결과를 가져오지 못했습니다.")
\ No newline at end of file
+        print("검색 결과를 가져오지 못했습니다.")
+
+    for query, error in results["errors"].items():
+        print(f"에러 발생 ({query}): {error}")
@@ -1,9 +1,18 @@
 import streamlit as st
-import json
-import ast
 import os
-from weather_utils import get_weather_info
-from claude_api import call_claude, FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT
+from datetime import datetime
+from weather_utils import get_weather_info, get_weather_for_slot, clear_weather_cache
+from intent_utils import get_intent_tags, get_intent_cache
+from menu_index import MenuIndex
+from menu_reload import MenuReloader
+from menu_store import (
+    compiled_path, is_compiled_fresh, open_compiled_menu_db, load_menu_index_streaming
+)
+from tracing import tracer, traced, span, stage_breakdown
+from pipeline_utils import submit, join
+from Tavily_Search import get_tavily_client, trend_queries
+from trend_boost import get_trend_booster
+from restaurants import RESTAURANT_FILE, get_restaurant_index
 
 # ============================================================================
 # 페이지 설정
@@ -14,16 +23,32 @@ st.set_page_config(
     layout="wide"
 )
 
+# 이번 실행(rerun)의 단계별 시간 기록 시작
+TRACE_REQUEST = tracer.start_request("app")
+
 # ============================================================================
 # 설정 및 상수
 # ============================================================================
 
 # API 키
 MY_API_KEY = ""
+TAVILY_API_KEY = ""  # 비워 두면 트렌드 가산점 없이 추천
 
 # 위치 (성남시)
 LAT, LON = 37.4201, 127.1262
 
+# 식사 시간대 (weather_utils.WEATHER_TIME_SLOTS 키) → 표시 이름. "now"는 현재 날씨
+WEATHER_SLOT_LABELS = {
+    "now": "지금",
+    "breakfast": "아침 (8시)",
+    "lunch": "점심 (12시)",
+    "dinner": "저녁 (18시)",
+    "late_night": "야식 (22시)",
+}
+
+# 디버그 패널에 보여줄 최근 실행 수
+TRACE_PANEL_REQUESTS = 10
+
 # 날씨/기온에 따른 가중치 점수표
 WEATHER_TO_FOOD_SCORE = {
     "RAINY":  {"SOUP": 3, "FRIED": 3, "NOODLES": 2, "SPICY": 1},
@@ -47,88 +72,89 @@ DEFAULT_MENU = [
 # 유틸리티 함수
 # ============================================================================
 
-@st.cache_data
+@st.cache_resource
 def load_menu_db(filename="menus.json"):
-    """JSON 파일을 읽고 중복을 제거하여 반환합니다."""
-    data = []
-    
-    if os.path.exists(filename):
+    """
+    메뉴 DB를 MenuIndex로 로드합니다.
+    컴파일된 바이너리(menus.bin)가 최신이면 mmap으로 열고, 아니면 JSON을 읽어 중복을 제거합니다.
+    """
+    if is_compiled_fresh(filename):
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            index = open_compiled_menu_db(compiled_path(filename))
         except Exception as e:
-            st.warning(f"파일 읽기 실패. 기본 데이터를 사용합니다.")
-            data = DEFAULT_MENU
+            st.warning(f"컴파일된 메뉴 DB 읽기 실패. JSON을 사용합니다.")
+            index = None
     else:
-        data = DEFAULT_MENU
+        index = None
 
-    # 중복 제거
-    unique_menus = []
-    seen_names = set()
+    # 스트리밍으로 읽으며 이름 기준 중복 제거
+    if index is None and os.path.exists(filename):
+        try:
+            index = load_menu_index_streaming(filename)
+        except Exception as e:
+            st.warning(f"파일 읽기 실패. 기본 데이터를 사용합니다.")
     
-    for menu in data:
-        if menu["name"] not in seen_names:
-            unique_menus.append(menu)
-            seen_names.add(menu["name"])
+    if index is None:
+        index = MenuIndex(DEFAULT_MENU)
     
-    return unique_menus
+    # 날씨 상태별 점수 미리 계산
+    index.precompute_weather(WEATHER_TO_FOOD_SCORE)
+    return index
+
+
+@st.cache_resource
+def get_menu_reloader(filename="menus.json"):
+    """
+    메뉴 DB 리로더 (프로세스 공용). menus.json이 바뀌면 바뀐 메뉴만 반영한 새 버전으로
+    백그라운드에서 교체하고, 트렌드 가산점도 새 메뉴 번호로 옮깁니다.
+    """
+    index = load_menu_db(filename)
+    trend_booster = get_trend_booster(index, get_tavily_client(TAVILY_API_KEY), trend_queries)
+    trend_booster.set_index(index)  # 캐시 초기화로 다시 만든 경우
+    return MenuReloader(filename, index, on_swap=trend_booster.set_index).start()
 
 
-def get_user_intent_tags(user_input, api_key):
-    """Claude API를 호출하여 사용자 의도를 파악합니다."""
-    if not user_input.strip():
-        return {}
+def render_weather(container, weather, menu_count):
+    """
+    날씨 조회 결과를 container에 표시하고 (상태, 온도플래그)를 반환합니다.
+    조회에 실패했으면 기본값(SUNNY, NORMAL)을 사용합니다.
+    """
+    weather_desc, temp_flag = weather
+    with container:
+        if not weather_desc:
+            weather_desc, temp_flag = "SUNNY", "NORMAL"
+            st.warning("날씨 조회 실패. 기본값을 사용합니다.")
         
-    try:
-        response = call_claude(
-            prompt=user_input,
-            system_prompt=FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT,
-            api_key=api_key
-        )
-        return ast.literal_eval(response)
-    except Exception as e:
-        st.error(f"의도 분석 실패: {e}")
-        return {}
-
-
-def calculate_recommendations(menu_list, weather_desc, temp_flag, user_tags):
-    """메뉴별 점수를 계산하고, 점수 내역을 포함하여 반환합니다."""
-    weather_pref = {}
-    if weather_desc in WEATHER_TO_FOOD_SCORE:
-        for tag, score in WEATHER_TO_FOOD_SCORE[weather_desc].items():
-            weather_pref[tag] = weather_pref.get(tag, 0) + score
-    if temp_flag in WEATHER_TO_FOOD_SCORE:
-        for tag, score in WEATHER_TO_FOOD_SCORE[temp_flag].items():
-            weather_pref[tag] = weather_pref.get(tag, 0) + score
-
-    scored_results = []
-    
-    for menu in menu_list:
-        total_score = 0
-        reasons = []
-        menu_tags = set(menu['tags'])
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            weather_emoji = {
+                "RAINY": "🌧️", "SNOWY": "❄️", 
+                "SUNNY": "☀️", "CLOUDY": "☁️"
+            }
+            st.metric("날씨", weather_desc, delta=None)
+            st.markdown(f"### {weather_emoji.get(weather_desc, '🌤️')}")
         
-        # 날씨 점수
-        for tag, score in weather_pref.items():
-            if tag in menu_tags:
-                total_score += score
-                reasons.append(f"날씨({tag} +{score})")
+        with col2:
+            temp_emoji = {"HOT": "🔥", "COLD": "🧊", "NORMAL": "🌡️"}
+            st.metric("기온", temp_flag, delta=None)
+            st.markdown(f"### {temp_emoji.get(temp_flag, '🌡️')}")
         
-        # 사용자 취향 점수 (2배 가중치)
-        for tag, score in user_tags.items():
-            if tag in menu_tags:
-                weighted_score = score * 2.0
-                total_score += weighted_score
-                reasons.append(f"취향({tag} +{weighted_score:.0f})")
-                
-        scored_results.append({
-            "name": menu["name"],
-            "score": total_score,
-            "reasons": reasons,
-            "tags": menu["tags"]
-        })
+        with col3:
+            st.metric("총 메뉴", f"{menu_count}개", delta=None)
     
-    return sorted(scored_results, key=lambda x: x["score"], reverse=True)
+    return weather_desc, temp_flag
+
+
+@traced("score")
+def calculate_recommendations(menu_list, weather_desc, temp_flag, user_tags, top_k=None, boosts=None):
+    """메뉴별 점수를 계산하고, 점수 내역을 포함하여 반환합니다. (top_k: 상위 k개만, boosts: 메뉴별 가산점)"""
+    if not isinstance(menu_list, MenuIndex):
+        menu_list = MenuIndex(menu_list)
+    if menu_list.weather_table != WEATHER_TO_FOOD_SCORE:
+        menu_list.precompute_weather(WEATHER_TO_FOOD_SCORE)
+    
+    # 날씨 점수는 로드 시 미리 계산된 값을 사용
+    return menu_list.score_for_weather(weather_desc, temp_flag, user_tags, top_k=top_k, boosts=boosts)
 
 
 # ============================================================================
@@ -143,40 +169,59 @@ with st.sidebar:
     st.header("⚙️ 설정")
     st.info(f"📍 위치: 성남시\n🗓️ 날짜: {st.session_state.get('today', '오늘')}")
     
+    # 다가오는 식사 시간대를 고르면 그 시각의 예보 날씨로 추천 (예보는 위치별로 한 번만 받음)
+    weather_slot = st.selectbox(
+        "🕒 언제 드실 건가요?", list(WEATHER_SLOT_LABELS),
+        format_func=WEATHER_SLOT_LABELS.get, key="weather_slot"
+    )
+    
     if st.button("🔄 날씨 새로고침"):
-        st.cache_data.clear()
+        # 날씨만 새로 조회 (메뉴 DB는 바뀐 부분만 반영되므로 캐시를 비우지 않음)
+        clear_weather_cache()
+        get_menu_reloader("menus.json").check()
+        # st.rerun()은 예외로 이번 실행을 끝내므로 아래의 finish_request까지 가지 않음 → 여기서 기록 마감
+        tracer.finish_request(TRACE_REQUEST)
         st.rerun()
 
+# 날씨 조회는 바로 시작 (메뉴 로드, 취향 분석과 동시에 진행)
+if weather_slot == "now":
+    weather_future = submit(get_weather_info, LAT, LON)
+else:
+    weather_future = submit(get_weather_for_slot, LAT, LON, weather_slot)
+
 # 메뉴 로드
-MENU_DB = load_menu_db("menus.json")
+with span("load_menu_db"):
+    menu_reloader = get_menu_reloader("menus.json")
+MENU_DB = menu_reloader.index  # 이번 실행 동안 같은 버전을 사용
 st.sidebar.success(f"✅ {len(MENU_DB)}개 메뉴 로드됨")
+if menu_reloader.last_changes:
+    st.sidebar.caption(
+        f"🔁 메뉴 DB v{menu_reloader.version} "
+        f"({datetime.fromtimestamp(menu_reloader.reloaded_at):%H:%M} 반영: "
+        f"추가 {len(menu_reloader.last_changes['added'])}, "
+        f"변경 {len(menu_reloader.last_changes['changed'])}, "
+        f"삭제 {len(menu_reloader.last_changes['removed'])})"
+    )
+cache_stats = get_intent_cache().stats()
+st.sidebar.caption(
+    f"🧠 의도 캐시: 적중 {cache_stats['hits']} / 미스 {cache_stats['misses']} "
+    f"(저장 {cache_stats['size']}개)"
+)
 
-# 날씨 정보
-st.subheader("🌤️ 현재 날씨")
-with st.spinner("날씨 정보를 가져오는 중..."):
-    weather_desc, temp_flag = get_weather_info(LAT, LON)
-    
-    if not weather_desc:
-        weather_desc, temp_flag = "SUNNY", "NORMAL"
-        st.warning("날씨 조회 실패. 기본값을 사용합니다.")
-
-# 날씨 정보 표시
-col1, col2, col3 = st.columns(3)
-with col1:
-    weather_emoji = {
-        "RAINY": "🌧️", "SNOWY": "❄️", 
-        "SUNNY": "☀️", "CLOUDY": "☁️"
-    }
-    st.metric("날씨", weather_desc, delta=None)
-    st.markdown(f"### {weather_emoji.get(weather_desc, '🌤️')}")
-
-with col2:
-    temp_emoji = {"HOT": "🔥", "COLD": "🧊", "NORMAL": "🌡️"}
-    st.metric("기온", temp_flag, delta=None)
-    st.markdown(f"### {temp_emoji.get(temp_flag, '🌡️')}")
-
-with col3:
-    st.metric("총 메뉴", f"{len(MENU_DB)}개", delta=None)
+# 트렌드 가산점 (백그라운드에서 주기적으로 갱신, 추천 계산은 현재 값만 읽음)
+trend_booster = get_trend_booster(MENU_DB, get_tavily_client(TAVILY_API_KEY), trend_queries)
+trend_boosts = trend_booster.boosts_for(MENU_DB)
+if TAVILY_API_KEY:
+    trend_booster.start()
+    if trend_booster.updated_at:
+        st.sidebar.caption(
+            f"📈 트렌드 가산점: {len(trend_boosts)}개 메뉴 "
+            f"({datetime.fromtimestamp(trend_booster.updated_at):%H:%M} 갱신)"
+        )
+
+# 날씨 정보 (조회가 끝나는 대로 이 자리에 표시)
+st.subheader("🌤️ 현재 날씨" if weather_slot == "now" else f"🌤️ {WEATHER_SLOT_LABELS[weather_slot]} 예보")
+weather_panel = st.container()
 
 st.divider()
 
@@ -190,21 +235,71 @@ user_input = st.text_input(
     key="user_input"
 )
 
+stage_futures = {"weather": weather_future}
 if st.button("🔍 메뉴 추천받기", type="primary", use_container_width=True):
     if user_input.strip():
-        with st.spinner("🧠 AI가 당신의 취향을 분석하는 중..."):
-            user_tags = get_user_intent_tags(user_input, MY_API_KEY)
-        
-        if user_tags:
-            st.success(f"✅ 분석 완료: {user_tags}")
-        
-        # 추천 계산
-        with st.spinner("🎯 최적의 메뉴를 찾는 중..."):
-            results = calculate_recommendations(MENU_DB, weather_desc, temp_flag, user_tags)
-        
+        stage_futures["intent"] = submit(get_intent_tags, user_input, MY_API_KEY)
+    else:
+        st.session_state.pop("user_tags", None)
+        st.warning("⚠️ 원하는 메뉴 스타일을 입력해주세요!")
+
+# 날씨 조회와 취향 분석을 기다리며 끝난 것부터 표시
+stage_values = {}
+progress = None
+if "intent" in stage_futures:
+    progress = st.status("🌤️🧠 날씨 조회와 취향 분석을 함께 진행하는 중...", expanded=True)
+
+def on_stage_done(name, result):
+    if name == "weather":
+        if isinstance(result, Exception):
+            result = (None, None)
+        stage_values["weather"] = render_weather(weather_panel, result, len(MENU_DB))
+        message = "✅ 날씨 조회 완료"
+    elif isinstance(result, Exception):
+        st.error(f"의도 분석 실패: {result}")
+        st.session_state["user_tags"] = {}
+        message = "⚠️ 의도 분석 실패"
+    else:
+        # 토글 등으로 다시 실행되어도 결과를 유지하도록 세션에 저장
+        st.session_state["user_tags"] = result
+        message = "✅ 취향 분석 완료"
+    if progress is not None:
+        progress.write(message)
+
+with span("wait"):
+    if progress is not None:
+        join(stage_futures, on_done=on_stage_done)
+        progress.update(label="✅ 날씨 조회와 취향 분석 완료", state="complete", expanded=False)
+    else:
+        with weather_panel, st.spinner("날씨 정보를 가져오는 중..."):
+            join(stage_futures, on_done=on_stage_done)
+
+weather_desc, temp_flag = stage_values["weather"]
+
+if "user_tags" in st.session_state:
+    user_tags = st.session_state["user_tags"]
+    
+    if user_tags:
+        st.success(f"✅ 분석 완료: {user_tags}")
+    
+    # 추천 계산 (TOP 3만 부분 선택)
+    with st.spinner("🎯 최적의 메뉴를 찾는 중..."):
+        results = calculate_recommendations(
+            MENU_DB, weather_desc, temp_flag, user_tags, top_k=3, boosts=trend_boosts
+        )
+    
+    # 메뉴별 가까운 영업 중 식당 (식당 데이터가 없으면 메뉴만 표시)
+    with span("restaurants"):
+        restaurant_index = get_restaurant_index(RESTAURANT_FILE)
+        nearby = (
+            restaurant_index.resolve([item['name'] for item in results[:3]], LAT, LON)
+            if restaurant_index is not None else {}
+        )
+    
+    with span("render"):
         st.divider()
         st.subheader("🏆 오늘의 추천 메뉴 TOP 3")
-        
+    
         if not results:
             st.error("😭 추천할 메뉴가 없습니다.")
         else:
@@ -213,32 +308,66 @@ if st.button("🔍 메뉴 추천받기", type="primary", use_container_width=Tru
             for i, item in enumerate(results[:3]):
                 with st.container():
                     col_a, col_b = st.columns([1, 3])
-                    
+                
                     with col_a:
                         st.markdown(f"## {medals[i]}")
-                    
+                
                     with col_b:
                         st.markdown(f"### {item['name']}")
                         st.metric("총점", f"{item['score']}점")
-                        
+                    
                         if item['reasons']:
                             st.caption(f"🔍 점수 요인: {', '.join(item['reasons'])}")
                         else:
                             st.caption("(특별한 가중치 없음)")
-                        
+                    
                         st.caption(f"🏷️ 태그: {', '.join(item['tags'])}")
                     
+                        if nearby.get(item['name']):
+                            places = ", ".join(
+                                f"{r['name']}({r['distance_m']}m)" for r in nearby[item['name']]
+                            )
+                            st.caption(f"📍 가까운 식당: {places}")
+                
                     st.divider()
-            
-            # 전체 결과 (접기)
-            with st.expander("📋 전체 추천 목록 보기"):
-                for i, item in enumerate(results[3:], start=4):
+        
+            # 전체 결과 (펼쳤을 때만 전체 순위와 점수 요인을 계산)
+            if st.toggle("📋 전체 추천 목록 보기"):
+                all_results = calculate_recommendations(
+                    MENU_DB, weather_desc, temp_flag, user_tags, boosts=trend_boosts
+                )
+                for i, item in enumerate(all_results[3:], start=4):
                     st.write(f"{i}. **{item['name']}** ({item['score']}점)")
                     if item['reasons']:
                         st.caption(f"   └ {', '.join(item['reasons'])}")
-    else:
-        st.warning("⚠️ 원하는 메뉴 스타일을 입력해주세요!")
 
 # 푸터
 st.divider()
-st.caption("Made with ❤️ using Streamlit & Claude AI")
\ No newline at end of file
+st.caption("Made with ❤️ using Streamlit & Claude AI")
+
+# ============================================================================
+# 지연 시간 디버그 패널
+# ============================================================================
+
+tracer.finish_request(TRACE_REQUEST)
+
+with st.sidebar:
+    if st.toggle("⏱️ 단계별 지연 시간 보기"):
+        st.caption(f"최근 {TRACE_PANEL_REQUESTS}회 실행 (ms)")
+        st.dataframe(
+            [
+                {"전체": round(r["total_ms"], 1),
+                 **{stage: round(ms, 1) for stage, ms in stage_breakdown(r).items()}}
+                for r in tracer.recent(TRACE_PANEL_REQUESTS)
+            ],
+            hide_index=True
+        )
+        st.caption("단계별 백분위 (ms)")
+        st.dataframe(
+            [
+                {"단계": stage, "횟수": s["count"], "p50": round(s["p50_ms"], 1),
+                 "p95": round(s["p95_ms"], 1), "p99": round(s["p99_ms"], 1)}
+                for stage, s in tracer.stats().items()
+            ],
+            hide_index=True
+        )
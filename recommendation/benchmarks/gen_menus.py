@@ -0,0 +1,77 @@
+"""
+합성 메뉴 DB 생성기 (벤치마크용)
+
+실제 menus.json의 메뉴를 바탕으로 이름을 변형하고 태그를 조금씩 바꿔서,
+태그 분포와 동시 출현 패턴이 실제 데이터와 비슷한 대용량 menus.json을 만듭니다.
+이름 중복도 일정 비율 섞어 load_menu_db의 중복 제거 경로까지 측정합니다.
+
+사용법:
+    python benchmarks/gen_menus.py 100000 /tmp/menus_100k.json
+"""
+
+import json
+import os
+import random
+import sys
+
+BASE_MENU_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "menus.json")
+
+NAME_PREFIXES = ["", "매운", "순한", "치즈", "해물", "얼큰", "왕", "수제", "옛날", "직화", "반반", "특"]
+DUPLICATE_RATIO = 0.05   # 이름이 앞 메뉴와 겹치는 비율
+TAG_DROP_PROB = 0.15     # 원본 태그를 하나 빼는 확률
+TAG_ADD_PROB = 0.15      # 다른 태그를 하나 더하는 확률
+
+
+def load_base_menus(path=BASE_MENU_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_synthetic_menus(count, seed=0, base_menus=None):
+    """
+    합성 메뉴를 count개 만들어 하나씩 내보냅니다.
+
+    원본 메뉴 하나를 골라 접두어/번호로 이름을 바꾸고, 일정 확률로 태그를 하나 빼거나 더합니다.
+    추가되는 태그는 원본 데이터의 태그 출현 빈도를 따릅니다.
+    """
+    rng = random.Random(seed)
+    base_menus = base_menus or load_base_menus()
+    tag_pool = [tag for menu in base_menus for tag in menu["tags"]]  # 빈도 가중 추출용
+    names = []
+
+    for i in range(count):
+        base = rng.choice(base_menus)
+        if names and rng.random() < DUPLICATE_RATIO:
+            name = rng.choice(names)
+        else:
+            name = f"{rng.choice(NAME_PREFIXES)}{base['name']} {i}"
+            names.append(name)
+
+        tags = list(base["tags"])
+        if len(tags) > 1 and rng.random() < TAG_DROP_PROB:
+            tags.pop(rng.randrange(len(tags)))
+        if rng.random() < TAG_ADD_PROB:
+            extra = rng.choice(tag_pool)
+            if extra not in tags:
+                tags.append(extra)
+
+        yield {"name": name, "tags": tags}
+
+
+def write_synthetic_menus(path, count, seed=0):
+    """합성 메뉴 DB를 JSON 배열로 저장합니다. (메모리에 전체를 올리지 않음)"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, menu in enumerate(iter_synthetic_menus(count, seed=seed)):
+            if i:
+                f.write(",\n")
+            f.write("    " + json.dumps(menu, ensure_ascii=False))
+        f.write("\n]\n")
+    return path
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    path = sys.argv[2] if len(sys.argv) > 2 else f"menus_{count}.json"
+    write_synthetic_menus(path, count)
+    print(f"🧪 합성 메뉴 {count}개 → '{path}'")
@@ -0,0 +1,71 @@
+"""
+합성 식당 데이터 생성기 (벤치마크/로컬 실행용)
+
+홍대입구역 주변 반경 안에 식당을 흩뿌리고, 실제 menus.json의 메뉴 이름을 식당마다 몇 개씩
+나눠 줍니다. 인기 메뉴일수록 많은 식당이 팔도록 메뉴 선택에 치우침을 둡니다.
+
+사용법:
+    python benchmarks/gen_restaurants.py 50000 /tmp/restaurants_50k.json
+"""
+
+import json
+import math
+import random
+import sys
+
+from gen_menus import load_base_menus
+
+HONGDAE_LAT, HONGDAE_LON = 37.5570, 126.9245   # 홍대입구역
+SPREAD_RADIUS = 3000          # m, 식당을 흩뿌릴 반경
+MENUS_PER_RESTAURANT = (3, 12)
+LATE_NIGHT_RATIO = 0.3        # 새벽까지 여는 식당 비율
+CLOSED_DAY_RATIO = 0.2        # 주 1회 쉬는 식당 비율
+
+
+def iter_synthetic_restaurants(count, seed=0, base_menus=None):
+    """합성 식당을 count개 만들어 하나씩 내보냅니다."""
+    rng = random.Random(seed)
+    names = [menu["name"] for menu in (base_menus or load_base_menus())]
+    weights = [1.0 / (rank + 1) for rank in range(len(names))]  # 앞쪽(대표) 메뉴일수록 흔함
+
+    for i in range(count):
+        # 원 안에 고르게 (면적 기준 균등)
+        distance = SPREAD_RADIUS * math.sqrt(rng.random())
+        angle = rng.uniform(0, 2 * math.pi)
+        lat = HONGDAE_LAT + distance * math.sin(angle) / 111320.0
+        lon = HONGDAE_LON + distance * math.cos(angle) / (111320.0 * math.cos(math.radians(HONGDAE_LAT)))
+
+        menus = list(dict.fromkeys(rng.choices(names, weights, k=rng.randint(*MENUS_PER_RESTAURANT))))
+        if rng.random() < LATE_NIGHT_RATIO:
+            hours = [["17:00", "04:00"]]
+        else:
+            hours = [["11:00", "15:00"], ["17:00", "22:00"]]
+        restaurant = {
+            "name": f"{menus[0]} 맛집 {i}",
+            "lat": round(lat, 6),
+            "lon": round(lon, 6),
+            "menus": menus,
+            "hours": hours,
+        }
+        if rng.random() < CLOSED_DAY_RATIO:
+            restaurant["closed_days"] = [rng.randrange(7)]
+        yield restaurant
+
+
+def write_synthetic_restaurants(path, count, seed=0):
+    """합성 식당 데이터를 JSON 배열로 저장합니다."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, restaurant in enumerate(iter_synthetic_restaurants(count, seed=seed)):
+            if i:
+                f.write(",\n")
+            f.write("    " + json.dumps(restaurant, ensure_ascii=False))
+        f.write("\n]\n")
+    return path
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    path = sys.argv[2] if len(sys.argv) > 2 else f"restaurants_{count}.json"
+    write_synthetic_restaurants(path, count)
+    print(f"🧪 합성 식당 {count}개 → '{path}'")
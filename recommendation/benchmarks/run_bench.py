@@ -0,0 +1,443 @@
+"""
+추천 파이프라인 벤치마크
+
+합성 메뉴 DB(10³~10⁶개)와 외부 서비스 대역(stubs.py)으로 다음을 측정하고,
+결과를 JSON 파일로 남겨 실행 간 성능 회귀를 비교할 수 있게 합니다.
+
+- load_menu_db: JSON 스트리밍 로드 / 컴파일된 바이너리 mmap 로드
+- calculate_recommendations: TOP 3, 취향 없음, 전체 목록, 100명 일괄
+- get_user_intent_tags: 규칙 기반 / 캐시 적중 / 캐시 미스 (Claude 대역 지연 포함)
+- Claude 호출(대역 서버, 실제 SDK): 구조화 스트리밍 / 텍스트, 일괄 분류 구조화 / 텍스트
+- Tavily 트렌드 검색: 쿼리 여러 개 동시 검색 (캐시 미스 / 적중)
+- main.py 전체 파이프라인: 날씨(open-meteo 대역) → 의도 분석 → 추천 (순차 / 동시 실행)
+- 시간별 예보: 시간대별 날씨 조회 (예보 캐시 미스 / 동시 미스 합치기 / 적중)
+- 신규 메뉴 자동 태깅: 요청당 메뉴 1개 / TAGGER_BATCH_SIZE개 묶음 (Claude 대역 지연 포함),
+  기록 중 잘린 체크포인트에서 이어 하기
+- 근처 식당 연결: 합성 식당 데이터 로드 / TOP 3 메뉴별 가까운 영업 중 식당 (점심 / 새벽)
+
+사용법:
+    python benchmarks/run_bench.py --sizes 1000,10000,100000 --output bench.json
+    python benchmarks/run_bench.py --baseline bench.json   # 이전 결과와 비교
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import intent_utils  # noqa: E402
+import Tavily_Search  # noqa: E402
+import claude_api  # noqa: E402
+import claude_batch  # noqa: E402
+import main  # noqa: E402
+import menu_store  # noqa: E402
+import menu_tagger  # noqa: E402
+import pipeline_utils  # noqa: E402
+import restaurants  # noqa: E402
+import weather_utils  # noqa: E402
+from gen_menus import iter_synthetic_menus, write_synthetic_menus  # noqa: E402
+from gen_restaurants import HONGDAE_LAT, HONGDAE_LON, write_synthetic_restaurants  # noqa: E402
+from stubs import (  # noqa: E402
+    STUB_INTENT_RESPONSE, StubServer, stub_call_claude, stub_call_claude_intent, stub_call_claude_tagger
+)
+
+REGRESSION_THRESHOLD = 1.2  # 기준 대비 평균이 이 배수를 넘으면 회귀로 표시
+TAGGER_BENCH_MENUS = 200    # 자동 태깅 측정에 쓸 메뉴 수
+CLAUDE_BATCH_BENCH_INPUTS = 50   # 일괄 분류 측정에 쓸 입력 수
+STUB_API_KEY = "stub"            # 대역 서버용 (실제 키와 다른 공용 클라이언트를 쓰도록)
+
+# 규칙 기반 분류기가 확신하지 못해 캐시/Claude로 넘어가는 입력
+AMBIGUOUS_INPUT = "오늘 기분이 꿀꿀해"
+LOCAL_INPUT = "비오는데 따뜻한 국물 먹고 싶어"
+
+
+# ============================================================================
+# 측정 도구
+# ============================================================================
+
+def measure(name, fn, repeat, setup=None, **params):
+    """fn을 repeat번 실행해 지연 시간 통계(ms)를 반환합니다. setup은 매 실행 전 호출(시간 제외)"""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    result = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "mean_ms": statistics.fmean(times),
+        "p50_ms": times[len(times) // 2],
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "min_ms": times[0],
+        "max_ms": times[-1],
+    }
+    print(f"  {name:<40} {json.dumps(params, ensure_ascii=False):<40} "
+          f"mean {result['mean_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms")
+    return result
+
+
+def quiet(fn):
+    """main.py의 print 출력을 숨기고 실행합니다."""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return None
+
+
+# ============================================================================
+# 벤치마크
+# ============================================================================
+
+def bench_menu_db(size, repeat, workdir):
+    """메뉴 DB 로드와 추천 계산"""
+    results = []
+    path = write_synthetic_menus(os.path.join(workdir, f"menus_{size}.json"), size)
+
+    results.append(measure("load_menu_db.json_stream", quiet(lambda: main.load_menu_db(path)),
+                           repeat, menus=size))
+
+    menu_store.compile_menu_json(path)
+    results.append(measure("load_menu_db.compiled_mmap", quiet(lambda: main.load_menu_db(path)),
+                           repeat, menus=size))
+    os.remove(menu_store.compiled_path(path))
+
+    index = quiet(lambda: main.load_menu_db(path))()
+    user_tags = {"SOUP": 5, "SPICY": 3, "HOT_SERVE": 3}
+    users = [{"SPICY": (i % 5) + 1, "RICE": 3} if i % 2 else {"LIGHT": 5} for i in range(100)]
+
+    results.append(measure(
+        "calculate_recommendations.top3",
+        lambda: main.calculate_recommendations(index, "RAINY", "COLD", user_tags, top_k=3),
+        repeat, menus=size))
+    results.append(measure(
+        "calculate_recommendations.empty_intent_top3",
+        lambda: main.calculate_recommendations(index, "SUNNY", "HOT", {}, top_k=3),
+        repeat, menus=size))
+    results.append(measure(
+        "calculate_recommendations.full_list",
+        lambda: [r["reasons"] for r in main.calculate_recommendations(index, "RAINY", "COLD", user_tags)],
+        max(1, repeat // 5), menus=size))
+    results.append(measure(
+        "calculate_recommendations_batch.100_users",
+        lambda: main.calculate_recommendations_batch(index, "RAINY", "COLD", users, top_k=3),
+        max(1, repeat // 5), menus=size))
+    return results
+
+
+def bench_intent(repeat, claude_latency, workdir):
+    """의도 분석: 규칙 기반 / 캐시 적중 / 캐시 미스"""
+    intent_utils.call_claude = stub_call_claude(claude_latency)
+    intent_utils.call_claude_intent = stub_call_claude_intent(claude_latency)
+    cache = intent_utils.IntentCache(os.path.join(workdir, "intent_cache.sqlite3"))
+    intent_utils._default_cache = cache
+
+    counter = iter(range(10 ** 9))
+    results = [
+        measure("get_user_intent_tags.local_rules",
+                quiet(lambda: main.get_user_intent_tags(LOCAL_INPUT, "")), repeat),
+        measure("get_user_intent_tags.cache_miss",
+                quiet(lambda: main.get_user_intent_tags(f"{AMBIGUOUS_INPUT} {next(counter)}", "")),
+                max(1, repeat // 5), claude_latency_ms=claude_latency * 1000),
+    ]
+    main.get_user_intent_tags(AMBIGUOUS_INPUT, "")
+    results.append(measure("get_user_intent_tags.cache_hit",
+                           quiet(lambda: main.get_user_intent_tags(AMBIGUOUS_INPUT, "")), repeat))
+    return results
+
+
+def bench_pipeline(repeat, claude_latency, http_latency, workdir):
+    """main.py 전체 흐름 (메뉴는 미리 로드): 날씨 → 의도 분석 → 추천"""
+    path = write_synthetic_menus(os.path.join(workdir, "menus_pipeline.json"), 1000)
+    index = quiet(lambda: main.load_menu_db(path))()
+    intent_utils.call_claude = stub_call_claude(claude_latency)
+    intent_utils.call_claude_intent = stub_call_claude_intent(claude_latency)
+    intent_utils._default_cache = intent_utils.IntentCache(os.path.join(workdir, "pipeline_cache.sqlite3"))
+
+    def pipeline():
+        weather_desc, temp_flag = weather_utils.get_weather_info(main.LAT, main.LON)
+        user_tags = main.get_user_intent_tags(AMBIGUOUS_INPUT, "")
+        return main.calculate_recommendations(index, weather_desc, temp_flag, user_tags, top_k=3)
+
+    def concurrent_pipeline():
+        results = pipeline_utils.join({
+            "weather": pipeline_utils.submit(weather_utils.get_weather_info, main.LAT, main.LON),
+            "intent": pipeline_utils.submit(main.get_user_intent_tags, AMBIGUOUS_INPUT, ""),
+        })
+        weather_desc, temp_flag = results["weather"]
+        return main.calculate_recommendations(index, weather_desc, temp_flag, results["intent"], top_k=3)
+
+    def cold():
+        weather_utils.clear_weather_cache()
+        intent_utils.get_intent_cache().clear()
+
+    with StubServer(latency=http_latency) as server:
+        weather_utils.WEATHER_API_URL = server.url + "/v1/forecast"
+        params = {"claude_latency_ms": claude_latency * 1000, "http_latency_ms": http_latency * 1000}
+        results = [
+            measure("pipeline.cold", quiet(pipeline), max(1, repeat // 5), setup=cold, **params),
+            measure("pipeline.warm", quiet(pipeline), repeat, **params),
+            measure("pipeline.concurrent_cold", quiet(concurrent_pipeline), max(1, repeat // 5),
+                    setup=cold, **params),
+        ]
+    return results
+
+
+def bench_forecast(repeat, http_latency):
+    """시간별 예보: 위치당 한 번 받아 두고 시간대별 날씨는 메모리에서 조회 (대역 서버)"""
+    slots = ["now", *weather_utils.WEATHER_TIME_SLOTS]
+
+    def all_slots():
+        return [weather_utils.get_weather_for_slot(main.LAT, main.LON, slot) for slot in slots]
+
+    def concurrent_cold():
+        return pipeline_utils.join({
+            slot: pipeline_utils.submit(weather_utils.get_weather_for_slot, main.LAT, main.LON, slot)
+            for slot in slots
+        })
+
+    with StubServer(latency=http_latency) as server:
+        weather_utils.WEATHER_API_URL = server.url + "/v1/forecast"
+        params = {"slots": len(slots), "http_latency_ms": http_latency * 1000}
+        results = [
+            measure("weather.get_weather_for_slot.cold", all_slots, max(1, repeat // 5),
+                    setup=weather_utils.clear_weather_cache, **params),
+            measure("weather.get_weather_for_slot.concurrent_cold", concurrent_cold, max(1, repeat // 5),
+                    setup=weather_utils.clear_weather_cache, **params),
+            measure("weather.get_weather_for_slot.cached", all_slots, repeat, **params),
+        ]
+        # 모든 시간대가 값이 있어야 하고, 시간대 수와 상관없이 측정 1회당 예보 요청은 한 번
+        if (None, None) in all_slots():
+            raise RuntimeError("예보 범위 밖 시간대가 있음")
+        if len(server.requests) != 2 * max(1, repeat // 5):
+            raise RuntimeError(f"예보 요청 횟수가 예상과 다름: {len(server.requests)}")
+    weather_utils.clear_weather_cache()
+    return results
+
+
+def bench_search(repeat, http_latency):
+    """Tavily 트렌드 쿼리 동시 검색 (대역 서버)"""
+    queries = Tavily_Search.trend_queries()
+    with StubServer(latency=http_latency) as server:
+        client = Tavily_Search.TavilyClient(api_key="", base_url=server.url)
+        params = {"queries": len(queries), "http_latency_ms": http_latency * 1000}
+        results = [
+            measure("tavily.search_many.cold", lambda: client.search_many(queries),
+                    max(1, repeat // 5), setup=client.clear_cache, **params),
+            measure("tavily.search_many.cached", lambda: client.search_many(queries), repeat, **params),
+        ]
+        client.close()
+    return results
+
+
+def bench_claude(repeat, http_latency):
+    """Anthropic 대역 서버 대상 실제 SDK 호출: 구조화(도구 사용, 스트리밍) / 텍스트, 단건 / 일괄"""
+    inputs = [f"{AMBIGUOUS_INPUT} {i}" for i in range(CLAUDE_BATCH_BENCH_INPUTS)]
+    expected = json.loads(STUB_INTENT_RESPONSE)
+    base_url = os.environ.get("ANTHROPIC_BASE_URL")
+    with StubServer(latency=http_latency) as server:
+        os.environ["ANTHROPIC_BASE_URL"] = server.url  # call_claude/call_claude_intent는 base_url을 받지 않음
+        params = {"http_latency_ms": http_latency * 1000}
+        try:
+            results = [
+                measure("claude_api.call_claude_intent.stream",
+                        lambda: claude_api.call_claude_intent(AMBIGUOUS_INPUT, api_key=STUB_API_KEY),
+                        repeat, **params),
+                measure("claude_api.call_claude.text",
+                        lambda: claude_api.call_claude(AMBIGUOUS_INPUT, api_key=STUB_API_KEY),
+                        repeat, **params),
+            ]
+            if claude_api.call_claude_intent(AMBIGUOUS_INPUT, api_key=STUB_API_KEY) != expected:
+                raise RuntimeError("스트리밍 구조화 응답이 대역 응답과 다름")
+
+            for structured in (True, False):
+                runs = []
+                results.append(measure(
+                    "claude_batch.classify_intents",
+                    lambda: runs.append(claude_batch.classify_intents(
+                        inputs, api_key=STUB_API_KEY, base_url=server.url, structured=structured
+                    )),
+                    max(1, repeat // 5), inputs=len(inputs), structured=structured,
+                    concurrency=claude_batch.BATCH_CONCURRENCY, **params
+                ))
+                errors = [r["error"] for run in runs for r in run if r["tags"] != expected]
+                if errors:
+                    raise RuntimeError(f"일괄 분류 실패 (structured={structured}): {errors[0]}")
+        finally:
+            claude_api.client_manager.close_all()
+            if base_url is None:
+                os.environ.pop("ANTHROPIC_BASE_URL", None)
+            else:
+                os.environ["ANTHROPIC_BASE_URL"] = base_url
+    return results
+
+
+def write_torn_checkpoint(path, names):
+    """앞 절반은 완전한 줄, 마지막 줄은 한글 글자 중간에서 잘린 체크포인트를 만듭니다. (중단 재현)"""
+    lines = [
+        json.dumps({"name": name, "tags": ["RICE"]}, ensure_ascii=False).encode("utf-8") + b"\n"
+        for name in names[:len(names) // 2 + 1]
+    ]
+    torn = lines.pop()
+    cut = next(i for i in range(len(torn) - 1, 0, -1) if 0x80 <= torn[i] < 0xC0)  # 다바이트 글자의 중간 바이트
+    with open(path, "wb") as f:
+        f.writelines(lines)
+        f.write(torn[:cut])
+
+
+def bench_tagger(repeat, claude_latency, workdir):
+    """신규 메뉴 자동 태깅: 요청당 메뉴 수에 따른 처리 시간, 잘린 체크포인트에서 이어 하기"""
+    names = list(dict.fromkeys(menu["name"] for menu in iter_synthetic_menus(TAGGER_BENCH_MENUS, seed=1)))
+    call = stub_call_claude_tagger(claude_latency)
+    results = []
+    for batch_size in (1, menu_tagger.TAGGER_BATCH_SIZE):
+        results.append(measure(
+            "menu_tagger.tag_menus", lambda: menu_tagger.tag_menus(names, call=call, batch_size=batch_size),
+            max(1, repeat // 10), menus=len(names), batch_size=batch_size,
+            concurrency=menu_tagger.TAGGER_CONCURRENCY, claude_latency_ms=claude_latency * 1000
+        ))
+
+    # 기록 중 중단된 체크포인트(한글 글자 중간에서 잘림)에서 이어 하기: 나머지만 태깅하고 파일이 온전해야 함
+    path = os.path.join(workdir, "tagger.ckpt.jsonl")
+    resumed = {}
+    results.append(measure(
+        "menu_tagger.tag_menus.resume_torn_checkpoint",
+        lambda: resumed.update(menu_tagger.tag_menus(names, checkpoint_path=path, call=call)),
+        max(1, repeat // 10), setup=lambda: write_torn_checkpoint(path, names),
+        menus=len(names), claude_latency_ms=claude_latency * 1000
+    ))
+    with open(path, "rb") as f:
+        f.read().decode("utf-8")  # 잘린 바이트가 남아 있으면 UnicodeDecodeError
+    if len(resumed["tags"]) != len(names) or len(menu_tagger.load_checkpoint(path)) != len(names):
+        raise RuntimeError("잘린 체크포인트에서 이어 하기 실패")
+    return results
+
+
+def bench_restaurants(count, repeat, workdir):
+    """추천 TOP 3 메뉴 → 가까운 영업 중 식당 (홍대입구역 기준)"""
+    path = write_synthetic_restaurants(os.path.join(workdir, f"restaurants_{count}.json"), count)
+    results = [measure("restaurants.load", lambda: restaurants.load_restaurants(path),
+                       max(1, repeat // 10), restaurants=count)]
+
+    index = restaurants.load_restaurants(path)
+    top3 = [menu["name"] for menu in main.DEFAULT_MENU[:3]]
+    for label, at in (("lunch", datetime(2026, 10, 16, 12, 30)), ("late_night", datetime(2026, 10, 16, 1, 30))):
+        results.append(measure(
+            f"restaurants.resolve_top3.{label}",
+            lambda: index.resolve(top3, HONGDAE_LAT, HONGDAE_LON, at=at),
+            repeat * 10, restaurants=count, radius_m=restaurants.RESTAURANT_SEARCH_RADIUS
+        ))
+    return results
+
+
+def compare(results, baseline_path):
+    """이전 결과와 평균 지연 시간을 비교해 회귀 항목을 출력합니다."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {
+            (r["name"], json.dumps(r["params"], sort_keys=True)): r
+            for r in json.load(f)["results"]
+        }
+
+    regressions = 0
+    print(f"\n📈 기준 결과와 비교: {baseline_path}")
+    for r in results:
+        base = baseline.get((r["name"], json.dumps(r["params"], sort_keys=True)))
+        if base is None or base["mean_ms"] == 0:
+            continue
+        ratio = r["mean_ms"] / base["mean_ms"]
+        flag = "⚠️ 회귀" if ratio > REGRESSION_THRESHOLD else ""
+        regressions += ratio > REGRESSION_THRESHOLD
+        print(f"  {r['name']:<40} {json.dumps(r['params'], ensure_ascii=False):<40} x{ratio:5.2f} {flag}")
+    return regressions
+
+
+# ============================================================================
+# 실행
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 파이프라인 벤치마크")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="쉼표로 구분한 합성 메뉴 수 (예: 1000,10000,100000,1000000)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--restaurants", type=int, default=50000, help="합성 식당 수")
+    parser.add_argument("--claude-latency", type=float, default=0.05, help="Claude 대역 지연(초)")
+    parser.add_argument("--http-latency", type=float, default=0.02, help="HTTP 대역 지연(초)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            print(f"\n🍽️ 메뉴 {size}개")
+            results += bench_menu_db(size, args.repeat, workdir)
+
+        print("\n🧠 의도 분석")
+        results += bench_intent(args.repeat, args.claude_latency, workdir)
+
+        print("\n🤖 Claude 호출 (대역 서버)")
+        results += bench_claude(args.repeat, args.http_latency)
+
+        print("\n🔎 트렌드 검색")
+        results += bench_search(args.repeat, args.http_latency)
+
+        print("\n🔗 전체 파이프라인")
+        results += bench_pipeline(args.repeat, args.claude_latency, args.http_latency, workdir)
+
+        print("\n🕒 시간별 예보")
+        results += bench_forecast(args.repeat, args.http_latency)
+
+        print("\n🏷️ 메뉴 자동 태깅")
+        results += bench_tagger(args.repeat, args.claude_latency, workdir)
+
+        print("\n📍 근처 식당 연결")
+        results += bench_restaurants(args.restaurants, args.repeat, workdir)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {output}")
+
+    if args.baseline and compare(results, args.baseline):
+        sys.exit(1)
@@ -0,0 +1,304 @@
+"""
+외부 서비스 대역 (벤치마크/로컬 실행용)
+
+- StubServer: open-meteo, Tavily, Anthropic Messages API(도구 사용, 스트리밍 포함)를 흉내 내는 로컬 HTTP 서버
+- stub_call_claude / stub_call_claude_intent: call_claude / call_claude_intent 대신 끼워 넣는 함수
+- stub_call_claude_tagger: 메뉴 자동 태깅(menu_tagger)용 call_claude 대역
+
+모든 대역은 응답 전 latency초만큼 기다려 실제 네트워크 지연을 재현합니다.
+
+사용 예:
+    with StubServer(latency=0.2) as server:
+        weather_utils.WEATHER_API_URL = server.url + "/v1/forecast"
+        os.environ["ANTHROPIC_BASE_URL"] = server.url
+        tavily = TavilyClient(api_key="", base_url=server.url)
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STUB_INTENT_RESPONSE = '{"SOUP": 3, "SPICY": 3}'
+STUB_UTC_OFFSET = 9 * 60 * 60   # 초, open-meteo timezone=Asia/Seoul 응답과 같게
+STUB_DAILY_SWING = 5.0          # ℃, 시간별 예보 기온의 일교차 절반
+
+
+def stub_call_claude(latency=0.5, response=STUB_INTENT_RESPONSE):
+    """call_claude와 같은 시그니처로 latency초 뒤 고정 응답을 돌려주는 함수를 만듭니다."""
+    def call_claude(prompt, system_prompt=None, model=None, max_tokens=1000, api_key=None):
+        time.sleep(latency)
+        return response
+
+    return call_claude
+
+
+def stub_call_claude_intent(latency=0.5, tags=None):
+    """call_claude_intent와 같은 시그니처로 latency초 뒤 고정 태그 사전을 돌려주는 함수를 만듭니다."""
+    tags = {"SOUP": 3, "SPICY": 3} if tags is None else tags
+
+    def call_claude_intent(prompt, system_prompt=None, model=None, max_tokens=None, api_key=None):
+        time.sleep(latency)
+        return dict(tags)
+
+    return call_claude_intent
+
+
+# 이름에 들어 있으면 붙이는 태그 (대역 태깅 규칙, 위에서부터 모두 적용)
+STUB_TAGGER_RULES = (
+    (("찌개", "탕", "국", "전골"), ("SOUP", "HOT_SERVE")),
+    (("냉", "빙수", "아이스"), ("COLD_SERVE", "LIGHT")),
+    (("면", "국수", "라멘", "파스타", "우동"), ("NOODLES",)),
+    (("밥", "덮밥", "리조또"), ("RICE",)),
+    (("튀김", "까스", "치킨", "가라아게"), ("FRIED", "HEAVY")),
+    (("매운", "불", "마라", "떡볶이", "김치"), ("SPICY",)),
+    (("크림", "치즈", "카레"), ("CREAMY",)),
+    (("구이", "볶음", "삼겹살"), ("DRY",)),
+)
+STUB_TAGGER_DEFAULT = ("HOT_SERVE", "HEAVY")
+
+
+def stub_tags_for(name, known=None):
+    """대역 태깅 규칙: 알려진 메뉴 이름이 들어 있으면 그 태그, 아니면 이름의 키워드로 결정"""
+    if known:
+        for base_name, tags in known.items():
+            if base_name in name:
+                return list(tags)
+    tags = [tag for words, rule_tags in STUB_TAGGER_RULES if any(w in name for w in words)
+            for tag in rule_tags]
+    return list(dict.fromkeys(tags)) or list(STUB_TAGGER_DEFAULT)
+
+
+def stub_call_claude_tagger(latency=0.5, menu_path=None):
+    """
+    call_claude와 같은 시그니처로, '번호. 메뉴 이름' 줄 목록을 받아 latency초 뒤
+    {"번호": [태그, ...]} JSON 문자열을 돌려주는 함수를 만듭니다.
+    menu_path(기본: 실제 menus.json)에 있는 메뉴는 그 태그를, 없으면 키워드 규칙을 씁니다.
+    """
+    menu_path = menu_path or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "menus.json")
+    with open(menu_path, "r", encoding="utf-8") as f:
+        # 긴 이름부터 비교해야 '돌솥비빔밥'이 '비빔밥'보다 먼저 맞음
+        known = {m["name"]: m["tags"] for m in sorted(json.load(f), key=lambda m: -len(m["name"]))}
+
+    def call_claude(prompt, system_prompt=None, model=None, max_tokens=1000, api_key=None):
+        time.sleep(latency)
+        result = {}
+        for line in prompt.splitlines():
+            match = re.match(r"(\d+)\.\s*(.*)", line)
+            if match:
+                result[match.group(1)] = stub_tags_for(match.group(2), known)
+        return json.dumps(result, ensure_ascii=False)
+
+    return call_claude
+
+
+# ============================================================================
+# HTTP 대역 서버
+# ============================================================================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (세션 재사용 효과 측정용)
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 지연 ACK로 ~40ms씩 밀리지 않도록
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self, events):
+        """Server-Sent Events로 이벤트를 하나씩 보냅니다. (Anthropic 스트리밍 형식)"""
+        chunks = [
+            f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+            for event in events
+        ]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(sum(len(chunk) for chunk in chunks)))
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
+            self.wfile.flush()
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        self.server.stub.record(self.path)
+        time.sleep(self.server.stub.latency)
+        url = urlparse(self.path)
+        if url.path != "/v1/forecast":
+            return self._send_json({"error": "not found"}, 404)
+        self._send_json(self.server.stub.forecast(parse_qs(url.query)))
+
+    def do_POST(self):
+        self.server.stub.record(self.path)
+        body = self._read_json()
+        time.sleep(self.server.stub.latency)
+        if self.path == "/search":
+            return self._send_json(self.server.stub.search(body))
+        if self.path == "/v1/messages":
+            if body.get("stream"):
+                return self._send_events(self.server.stub.message_events(body))
+            return self._send_json(self.server.stub.message(body))
+        self._send_json({"error": "not found"}, 404)
+
+
+class StubServer:
+    """
+    open-meteo(/v1/forecast), Tavily(/search), Anthropic(/v1/messages) 대역 서버
+
+    Args:
+        latency: 모든 응답 전 대기 시간(초)
+        weather_code / temperature: open-meteo 'current' 응답 값 ('hourly'는 이 값을 중심으로 일교차 적용)
+        intent_response: Anthropic 응답 텍스트 (요청에 tools가 있으면 이 사전을 tool_use 입력으로 돌려줌)
+        search_results: Tavily 'results' 목록 (없으면 쿼리로 만든 가짜 결과)
+    """
+
+    def __init__(self, latency=0.0, weather_code=61, temperature=12.0,
+                 intent_response=STUB_INTENT_RESPONSE, search_results=None,
+                 host="127.0.0.1", port=0):
+        self.latency = latency
+        self.weather_code = weather_code
+        self.temperature = temperature
+        self.intent_response = intent_response
+        self.search_results = search_results
+        self.requests = []  # 받은 요청 경로 (호출 횟수 확인용)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, path):
+        with self._lock:
+            self.requests.append(path)
+
+    # --- 응답 생성 ---------------------------------------------------------
+
+    def forecast(self, query):
+        latitudes = query.get("latitude", ["0"])[0].split(",")
+        longitudes = query.get("longitude", ["0"])[0].split(",")
+        hourly = self.hourly(int(query.get("forecast_days", ["7"])[0])) if "hourly" in query else None
+        items = []
+        for lat, lon in zip(latitudes, longitudes):
+            item = {"latitude": float(lat), "longitude": float(lon), "utc_offset_seconds": STUB_UTC_OFFSET}
+            if hourly is not None:
+                item["hourly"] = hourly
+            if "current" in query or hourly is None:
+                item["current"] = {"temperature_2m": self.temperature, "weather_code": self.weather_code}
+            items.append(item)
+        return items[0] if len(items) == 1 else items
+
+    def hourly(self, days):
+        """오늘 0시부터 days일치 시간별 예보 (현지 시각, 기온은 15시에 가장 높은 일교차)"""
+        start = (datetime.now(timezone.utc) + timedelta(seconds=STUB_UTC_OFFSET)).replace(
+            hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+        )
+        hours = [start + timedelta(hours=h) for h in range(24 * days)]
+        return {
+            "time": [hour.strftime("%Y-%m-%dT%H:%M") for hour in hours],
+            "temperature_2m": [
+                round(self.temperature + STUB_DAILY_SWING * math.sin((hour.hour - 9) * math.pi / 12), 1)
+                for hour in hours
+            ],
+            "weather_code": [self.weather_code] * len(hours),
+        }
+
+    def search(self, body):
+        query = body.get("query", "")
+        results = self.search_results
+        if results is None:
+            results = [
+                {"title": f"{query} {i}", "url": f"https://example.com/{i}", "content": query,
+                 "score": round(1.0 - i / 10, 2)}
+                for i in range(body.get("max_results", 5))
+            ]
+        return {"query": query, "answer": f"{query} 요약", "results": results}
+
+    def _content_block(self, body):
+        """요청에 도구가 있으면 첫 도구의 tool_use 블록, 없으면 텍스트 블록"""
+        tools = body.get("tools")
+        if tools:
+            try:
+                tags = json.loads(self.intent_response)
+            except ValueError:
+                tags = {}
+            return {"type": "tool_use", "id": "toolu_stub", "name": tools[0]["name"], "input": tags}
+        return {"type": "text", "text": self.intent_response}
+
+    def message(self, body):
+        block = self._content_block(body)
+        return {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "stub"),
+            "content": [block],
+            "stop_reason": "tool_use" if block["type"] == "tool_use" else "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+
+    def message_events(self, body, chunk_size=8):
+        """message()와 같은 응답을 스트리밍 이벤트 목록으로 (본문은 chunk_size 글자씩 델타로 나눔)"""
+        message = self.message(body)
+        block = message["content"][0]
+        if block["type"] == "tool_use":
+            text = json.dumps(block["input"], ensure_ascii=False)
+            start_block = dict(block, input={})
+            delta = lambda piece: {"type": "input_json_delta", "partial_json": piece}
+        else:
+            text = block["text"]
+            start_block = dict(block, text="")
+            delta = lambda piece: {"type": "text_delta", "text": piece}
+
+        events = [
+            {"type": "message_start",
+             "message": dict(message, content=[], stop_reason=None, usage={"input_tokens": 1, "output_tokens": 0})},
+            {"type": "content_block_start", "index": 0, "content_block": start_block},
+        ]
+        events += [
+            {"type": "content_block_delta", "index": 0, "delta": delta(text[i:i + chunk_size])}
+            for i in range(0, len(text), chunk_size)
+        ]
+        events += [
+            {"type": "content_block_stop", "index": 0},
+            {"type": "message_delta", "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+             "usage": {"output_tokens": 1}},
+            {"type": "message_stop"},
+        ]
+        return events
+
+    # --- 수명 관리 ---------------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
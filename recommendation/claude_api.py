@@ -2,8 +2,12 @@
 Claude API 호출 모듈 (통합 버전)
 """
 
+import json
+import os
+import threading
 import anthropic
 from typing import Optional
+from tracing import traced
 
 
 # ============================================================================
@@ -37,10 +41,108 @@ FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT = """
 """
 
 
+def _parse_allowed_tags(system_prompt: str) -> tuple:
+    """시스템 프롬프트의 '# Allowed Tags' 섹션에서 태그 목록을 읽습니다."""
+    section = system_prompt.split("# Allowed Tags", 1)[1].split("\n#", 1)[0]
+    tags = []
+    for line in section.splitlines():
+        if ":" in line:
+            tags.extend(tag.strip() for tag in line.split(":", 1)[1].split(","))
+    return tuple(tag for tag in tags if tag)
+
+
+# 분류기가 사용할 수 있는 태그 (프롬프트와 항상 일치)
+ALLOWED_TAGS = _parse_allowed_tags(FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT)
+
+
+# ============================================================================
+# 클라이언트 관리
+# ============================================================================
+
+# 연결 풀/타임아웃 기본값 (초 단위)
+CLIENT_TIMEOUT = 30.0
+CLIENT_CONNECT_TIMEOUT = 5.0
+CLIENT_MAX_CONNECTIONS = 20
+CLIENT_MAX_KEEPALIVE_CONNECTIONS = 10
+CLIENT_MAX_RETRIES = 2
+
+
+class ClaudeClientManager:
+    """
+    API 키와 연결 설정별로 오래 유지되는 anthropic 클라이언트를 재사용합니다.
+
+    호출마다 클라이언트를 만들면 매번 새 연결 풀과 TLS 핸드셰이크가 생기므로,
+    한 번 만든 클라이언트(와 그 연결 풀)를 프로세스 안에서 공유합니다.
+    모듈 수준 인스턴스라 Streamlit 재실행에도 유지되고, 스레드 간 공유해도 안전합니다.
+    """
+
+    def __init__(
+        self,
+        timeout: float = CLIENT_TIMEOUT,
+        connect_timeout: float = CLIENT_CONNECT_TIMEOUT,
+        max_connections: int = CLIENT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+        max_retries: int = CLIENT_MAX_RETRIES
+    ):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.max_retries = max_retries
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> anthropic.Anthropic:
+        """API 키(없으면 환경변수)와 base_url 조합별 공용 클라이언트를 반환합니다."""
+        api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
+        key = (api_key, base_url)
+
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                # 타임아웃/연결 한도는 SDK가 쓰는 HTTP 라이브러리의 타입으로 만들어야 함
+                # (SDK 버전에 따라 httpx 대신 다른 구현을 쓰므로 httpx를 직접 쓰지 않음)
+                limits = type(anthropic.DEFAULT_CONNECTION_LIMITS)(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                )
+                client = anthropic.Anthropic(
+                    api_key=api_key,
+                    base_url=base_url,
+                    max_retries=self.max_retries,
+                    timeout=anthropic.Timeout(self.timeout, connect=self.connect_timeout),
+                    http_client=anthropic.DefaultHttpxClient(limits=limits)
+                )
+                self._clients[key] = client
+            return client
+
+    def close_all(self):
+        """보관 중인 클라이언트의 연결 풀을 모두 닫습니다."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+# 프로세스 공용 클라이언트 관리자
+client_manager = ClaudeClientManager()
+
+
+def get_client(api_key: Optional[str] = None, base_url: Optional[str] = None) -> anthropic.Anthropic:
+    """공용 관리자에서 재사용 클라이언트를 가져옵니다."""
+    return client_manager.get(api_key=api_key, base_url=base_url)
+
+
 # ============================================================================
 # API 호출 함수
 # ============================================================================
 
+@traced("claude")
 def call_claude(
     prompt: str,
     system_prompt: Optional[str] = None,
@@ -71,11 +173,8 @@ def call_claude(
             system_prompt=FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT
         )
     """
-    # API 클라이언트 생성
-    if api_key:
-        client = anthropic.Anthropic(api_key=api_key)
-    else:
-        client = anthropic.Anthropic()  # 환경변수에서 자동으로 가져옴
+    # 공용 클라이언트 재사용 (키가 없으면 환경변수에서 가져옴)
+    client = get_client(api_key)
     
     # API 호출 파라미터 설정
     params = {
@@ -96,6 +195,116 @@ def call_claude(
     return message.content[0].text
 
 
+# ============================================================================
+# 구조화된 의도 분류 (도구 사용 + 스트리밍)
+# ============================================================================
+
+INTENT_TOOL_NAME = "record_food_tags"
+INTENT_MAX_TOKENS = 150   # 태그 11개짜리 JSON 객체도 충분히 담기는 크기
+INTENT_MIN_SCORE = 1
+INTENT_MAX_SCORE = 5
+
+# 허용 태그만 키로 쓸 수 있는 JSON 스키마 (점수는 1~5 정수)
+INTENT_TOOL = {
+    "name": INTENT_TOOL_NAME,
+    "description": (
+        "사용자 입력에서 추출한 음식 태그와 강도(1~5)를 기록한다. "
+        "'아무거나'처럼 선호가 없으면 빈 객체를 기록한다."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            tag: {"type": "integer", "minimum": INTENT_MIN_SCORE, "maximum": INTENT_MAX_SCORE}
+            for tag in ALLOWED_TAGS
+        },
+        "additionalProperties": False,
+    },
+}
+
+
+def validate_intent_tags(tags) -> dict:
+    """
+    태그 사전을 허용 태그/정수 점수(1~5)로 정리합니다.
+    모르는 태그나 숫자가 아닌 점수는 버리고, 범위를 벗어난 점수는 잘라 냅니다.
+    """
+    if not isinstance(tags, dict):
+        raise ValueError(f"태그 사전이 아닌 응답: {tags!r}")
+    result = {}
+    for tag, score in tags.items():
+        if tag not in ALLOWED_TAGS or isinstance(score, bool) or not isinstance(score, (int, float)):
+            continue
+        result[tag] = max(INTENT_MIN_SCORE, min(INTENT_MAX_SCORE, int(score)))
+    return result
+
+
+def _complete_json_object(text: str):
+    """누적된 도구 입력 JSON이 완성된 객체면 dict를, 아직 덜 왔으면 None을 반환합니다."""
+    text = text.lstrip()
+    if not text.startswith("{"):
+        return None
+    try:
+        obj, _ = json.JSONDecoder().raw_decode(text)
+    except json.JSONDecodeError:
+        return None
+    return obj
+
+
+@traced("claude.intent")
+def call_claude_intent(
+    prompt: str,
+    system_prompt: str = FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT,
+    model: str = "claude-sonnet-4-20250514",
+    max_tokens: int = INTENT_MAX_TOKENS,
+    api_key: Optional[str] = None
+) -> dict:
+    """
+    사용자 입력을 태그 사전으로 분류합니다. (구조화 + 스트리밍)
+
+    자유 텍스트 대신 허용 태그 스키마를 가진 도구 호출을 강제하고, 스트리밍으로 받다가
+    도구 입력 JSON 객체가 닫히는 순간 스트림을 끊고 반환합니다.
+
+    Returns:
+        {태그: 점수} (허용 태그, 1~5 정수만)
+
+    Raises:
+        ValueError: 토큰 한도 등으로 도구 입력이 완성되지 않은 경우
+    """
+    client = get_client(api_key)
+    params = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "system": system_prompt,
+        "messages": [{"role": "user", "content": prompt}],
+        "tools": [INTENT_TOOL],
+        "tool_choice": {"type": "tool", "name": INTENT_TOOL_NAME},
+    }
+
+    chunks = []
+    in_tool = False
+    with client.messages.stream(**params) as stream:
+        for event in stream:
+            if event.type == "content_block_start":
+                in_tool = event.content_block.type == "tool_use"
+            elif event.type == "content_block_delta" and in_tool:
+                if event.delta.type != "input_json_delta":
+                    continue
+                chunks.append(event.delta.partial_json)
+                if "}" in event.delta.partial_json:
+                    tags = _complete_json_object("".join(chunks))
+                    if tags is not None:
+                        return validate_intent_tags(tags)  # 나머지 스트림은 받지 않음
+            elif event.type == "content_block_stop" and in_tool:
+                break
+
+    raw = "".join(chunks)
+    if not raw.strip():
+        return {}  # 빈 객체는 델타 없이 끝날 수 있음
+    tags = _complete_json_object(raw)
+    if tags is None:
+        raise ValueError(f"도구 입력이 완성되지 않았습니다: {raw!r}")
+    return validate_intent_tags(tags)
+
+
 # ============================================================================
 # 사용 예제
 # ============================================================================
@@ -131,4 +340,12 @@ if __name__ == "__main__":
         )
         print(f"입력: {user_input}")
         print(f"태그: {response}")
+        print()
+    
+    print("=" * 60)
+    print("예제 3: 구조화된 태그 분류 (도구 사용 + 스트리밍)")
+    print("=" * 60)
+    for user_input in test_cases:
+        print(f"입력: {user_input}")
+        print(f"태그: {call_claude_intent(user_input, api_key=API_KEY)}")
         print()
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Claude 의도 분류 일괄 처리 모듈 (asyncio)
+
+로그에 쌓인 사용자 발화 수천 건을 동시에 재분류할 때 사용합니다.
+동시 요청 수 제한, 429 응답 시 전체 일시 정지(rate limit 대응), 지수 백오프 재시도,
+항목별 오류 기록을 지원하며 결과는 끝나는 순서대로 흘려보냅니다.
+base_url을 지정하면 로컬 스텁 서버를 대상으로 실행할 수 있습니다.
+"""
+
+import ast
+import asyncio
+import json
+import random
+import sys
+import time
+import anthropic
+from typing import AsyncIterator, Iterable, List, Optional
+from claude_api import (
+    FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT, INTENT_MAX_TOKENS, INTENT_TOOL, INTENT_TOOL_NAME,
+    validate_intent_tags
+)
+
+
+# ============================================================================
+# 설정
+# ============================================================================
+
+BATCH_CONCURRENCY = 8
+BATCH_MAX_RETRIES = 5
+BATCH_BACKOFF_BASE = 1.0    # 초, 재시도마다 2배
+BATCH_BACKOFF_MAX = 30.0
+
+# 재시도할 가치가 있는 오류 (요청 자체가 잘못된 4xx는 재시도하지 않음)
+RETRYABLE_ERRORS = (
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,   # APITimeoutError 포함
+    anthropic.InternalServerError,  # 5xx, 529 overloaded 포함
+)
+
+
+def _retry_after(error) -> Optional[float]:
+    """응답의 retry-after 헤더(초)를 읽습니다."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# ============================================================================
+# 일괄 분류기
+# ============================================================================
+
+class BatchIntentClassifier:
+    """AsyncAnthropic 클라이언트 하나로 여러 입력을 동시에 분류합니다."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        system_prompt: str = FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT,
+        model: str = "claude-sonnet-4-20250514",
+        max_tokens: Optional[int] = None,
+        concurrency: int = BATCH_CONCURRENCY,
+        max_retries: int = BATCH_MAX_RETRIES,
+        backoff_base: float = BATCH_BACKOFF_BASE,
+        backoff_max: float = BATCH_BACKOFF_MAX,
+        base_url: Optional[str] = None,
+        structured: bool = True
+    ):
+        self.api_key = api_key or None
+        self.system_prompt = system_prompt
+        self.model = model
+        # 구조화 모드는 도구 입력 JSON만 받으면 되므로 토큰 한도를 작게 둠
+        self.max_tokens = max_tokens or (INTENT_MAX_TOKENS if structured else 1000)
+        self.structured = structured
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.base_url = base_url
+        self._paused_until = 0.0  # 429를 받으면 모든 작업자가 이 시각까지 대기
+
+    async def _wait_for_rate_limit(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt, error):
+        """재시도 대기 시간. retry-after가 있으면 우선하고, 없으면 지수 백오프 + 지터"""
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+            delay *= random.uniform(0.5, 1.0)
+        if isinstance(error, anthropic.RateLimitError):
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    async def _classify_one(self, client, index, text):
+        """입력 한 건 분류. 실패해도 예외 대신 error 필드에 기록합니다."""
+        result = {"index": index, "input": text, "tags": None, "error": None, "attempts": 0}
+        if not text.strip():
+            result["tags"] = {}
+            return result
+
+        params = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "system": self.system_prompt,
+            "messages": [{"role": "user", "content": text}],
+        }
+        if self.structured:
+            params["tools"] = [INTENT_TOOL]
+            params["tool_choice"] = {"type": "tool", "name": INTENT_TOOL_NAME}
+
+        for attempt in range(self.max_retries + 1):
+            result["attempts"] = attempt + 1
+            await self._wait_for_rate_limit()
+            try:
+                message = await client.messages.create(**params)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    result["error"] = f"{type(e).__name__}: {e}"
+                    return result
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            except Exception as e:  # 4xx, 예상 못한 전송 오류 등은 재시도하지 않음
+                result["error"] = f"{type(e).__name__}: {e}"
+                return result
+
+            try:
+                result["tags"] = self._parse_response(message)
+            except Exception as e:  # 예상과 다른 응답 형태(TypeError/KeyError 등) 포함
+                result["error"] = f"파싱 실패 ({type(e).__name__}: {e})"
+            return result
+
+        return result
+
+    def _parse_response(self, message):
+        """응답 메시지 → 태그 사전 (구조화 모드는 도구 입력, 아니면 텍스트를 파싱)"""
+        if self.structured:
+            for block in message.content:
+                if block.type == "tool_use" and block.name == INTENT_TOOL_NAME:
+                    return validate_intent_tags(block.input)
+            raise ValueError(f"도구 호출이 없는 응답 (stop_reason={message.stop_reason})")
+
+        response = message.content[0].text
+        tags = ast.literal_eval(response)
+        if not isinstance(tags, dict):
+            raise ValueError(f"태그 사전이 아님: {response!r}")
+        return tags
+
+    async def iter_classify(self, inputs: Iterable[str]) -> AsyncIterator[dict]:
+        """
+        입력들을 동시에 분류하고, 끝나는 순서대로 결과를 내보냅니다.
+
+        Yields:
+            {"index", "input", "tags", "error", "attempts"}
+            (index는 입력 순서, 실패 시 tags는 None이고 error에 사유)
+        """
+        pending = asyncio.Queue()
+        for item in enumerate(inputs):
+            pending.put_nowait(item)
+        total = pending.qsize()
+        done = asyncio.Queue()
+
+        async with anthropic.AsyncAnthropic(
+            api_key=self.api_key, base_url=self.base_url, max_retries=0
+        ) as client:
+
+            async def worker():
+                while True:
+                    try:
+                        index, text = pending.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        result = await self._classify_one(client, index, text)
+                    except Exception as e:
+                        # 어떤 오류든 항목마다 결과를 하나씩 내보내야 done.get()이 멈추지 않음
+                        result = {"index": index, "input": text, "tags": None,
+                                  "error": f"{type(e).__name__}: {e}", "attempts": 0}
+                    await done.put(result)
+
+            workers = [
+                asyncio.create_task(worker())
+                for _ in range(min(self.concurrency, total))
+            ]
+            try:
+                for _ in range(total):
+                    yield await done.get()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def iter_classify_intents(inputs: Iterable[str], **options) -> AsyncIterator[dict]:
+    """BatchIntentClassifier(**options).iter_classify(inputs) 단축 함수"""
+    async for result in BatchIntentClassifier(**options).iter_classify(inputs):
+        yield result
+
+
+def classify_intents(inputs: Iterable[str], **options) -> List[dict]:
+    """동기 코드용: 모두 끝날 때까지 기다린 뒤 입력 순서대로 결과를 반환합니다."""
+    async def collect():
+        return [r async for r in iter_classify_intents(inputs, **options)]
+
+    return sorted(asyncio.run(collect()), key=lambda r: r["index"])
+
+
+# ============================================================================
+# 사용 예제: python claude_batch.py utterances.txt > results.jsonl
+# ============================================================================
+
+if __name__ == "__main__":
+    API_KEY = ""
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        utterances = [line.rstrip("\n") for line in f]
+
+    async def main():
+        failed = 0
+        async for result in iter_classify_intents(utterances, api_key=API_KEY):
+            failed += result["error"] is not None
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+        print(f"완료: {len(utterances)}건 (실패 {failed}건)", file=sys.stderr)
+
+    asyncio.run(main())
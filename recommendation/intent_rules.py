@@ -0,0 +1,183 @@
+"""
+규칙 기반 로컬 의도 분류기
+
+"국물" → SOUP, "매운" → SPICY처럼 뜻이 분명한 입력은 Claude를 부르지 않고
+키워드 사전만으로 태그를 뽑습니다. 결과와 함께 확신도(0~1)를 돌려주며,
+확신도가 낮으면 호출 측에서 Claude로 넘깁니다.
+"""
+
+import re
+from claude_api import ALLOWED_TAGS
+
+
+# ============================================================================
+# 키워드 사전
+# ============================================================================
+
+# 키워드 → {태그: 점수}. 점수 기준은 FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT와 동일
+# (5: 명시적, 3: 문맥상 유추). 긴 키워드가 먼저 매칭됩니다. ("탕수육" > "탕")
+LEXICON = {
+    # 국물
+    "시원한 국물": {"SOUP": 5, "HOT_SERVE": 3},
+    "국물": {"SOUP": 5},
+    "찌개": {"SOUP": 5, "HOT_SERVE": 3},
+    "국밥": {"SOUP": 5, "RICE": 5, "HOT_SERVE": 3},
+    "해장": {"SOUP": 3, "SPICY": 3},
+    "얼큰": {"SOUP": 3, "SPICY": 5},
+    # 맛
+    "매운": {"SPICY": 5},
+    "매콤": {"SPICY": 5},
+    "맵게": {"SPICY": 5},
+    "맵고": {"SPICY": 5},
+    "매워": {"SPICY": 5},
+    "스트레스": {"SPICY": 3},
+    # 온도
+    "시원한": {"COLD_SERVE": 5},
+    "차가운": {"COLD_SERVE": 5},
+    "차갑게": {"COLD_SERVE": 5},
+    "따뜻한": {"HOT_SERVE": 5},
+    "따끈": {"HOT_SERVE": 5},
+    "뜨끈": {"HOT_SERVE": 5},
+    "뜨거운": {"HOT_SERVE": 5},
+    # 튀김/건식/크림
+    "탕수육": {"FRIED": 5, "HEAVY": 3},
+    "튀김": {"FRIED": 5},
+    "튀긴": {"FRIED": 5},
+    "바삭": {"FRIED": 5},
+    "치킨": {"FRIED": 5, "HEAVY": 3},
+    "돈까스": {"FRIED": 5, "HEAVY": 3},
+    "구이": {"DRY": 5},
+    "크림": {"CREAMY": 5},
+    "꾸덕": {"CREAMY": 5},
+    "치즈": {"CREAMY": 3},
+    # 주식
+    "면 요리": {"NOODLES": 5},
+    "면요리": {"NOODLES": 5},
+    "국수": {"NOODLES": 5},
+    "라면": {"NOODLES": 5, "SOUP": 3, "SPICY": 3},
+    "냉면": {"NOODLES": 5, "COLD_SERVE": 5},
+    "파스타": {"NOODLES": 5},
+    "우동": {"NOODLES": 5, "SOUP": 3},
+    "덮밥": {"RICE": 5},
+    "볶음밥": {"RICE": 5},
+    "밥": {"RICE": 5},
+    # 무게
+    "살 안 찌는": {"LIGHT": 5},
+    "다이어트": {"LIGHT": 5},
+    "가볍게": {"LIGHT": 5},
+    "가벼운": {"LIGHT": 5},
+    "담백": {"LIGHT": 5},
+    "샐러드": {"LIGHT": 5},
+    "든든": {"HEAVY": 3},
+    "배부른": {"HEAVY": 3},
+    "푸짐": {"HEAVY": 3},
+    "기름진": {"HEAVY": 5},
+    "고기": {"HEAVY": 3},
+}
+
+# '아무거나' 계열 → 빈 딕셔너리
+ANYTHING_WORDS = ("아무거나", "아무 거나", "아무거", "뭐든", "상관없는", "상관없")
+
+# 확신도 계산 시 무시하는 군더더기 표현 (낱말 통째로 또는 낱말 끝에 붙은 경우만, "로제"/"한식"은 그대로)
+FILLER_WORDS = (
+    "먹고 싶어", "먹고싶어", "먹고 싶다", "먹고싶다", "먹을래", "먹자", "당긴다", "땡겨", "땡긴다",
+    "오늘", "지금", "뭔가", "좀", "거", "것", "요리", "음식", "메뉴", "한 끼", "한끼", "추천",
+    "비오는데", "비 오는데", "추운데", "더운데", "해서", "받아서", "하고 싶어", "싶어", "싶다",
+    "원해", "주세요", "해줘", "줘", "같은", "종류", "로", "으로", "랑", "이랑", "하고", "한", "인",
+)
+
+# 점수 조절 표현
+INTENSIFIERS = ("엄청", "완전", "무조건", "진짜", "너무", "아주", "정말")
+SOFTENERS = ("약간", "살짝", "조금", "적당히")
+
+# 부정/배제 표현이 원문에 있으면 규칙으로 판단하지 않음 ("안 매운", "국물 말고", "매운거 별로")
+NEGATION_WORDS = ("안", "않", "말고", "빼고", "싫", "별로", "없는", "못")
+
+# 서로 상충하는 태그 쌍 (프롬프트 규칙 3: 더 강한 쪽 하나만)
+CONFLICTING_TAGS = (("HOT_SERVE", "COLD_SERVE"), ("LIGHT", "HEAVY"))
+
+# 이 확신도 이상이면 Claude를 부르지 않음
+LOCAL_INTENT_MIN_CONFIDENCE = 0.8
+
+_KEYWORDS = sorted(LEXICON, key=len, reverse=True)
+_ALLOWED = set(ALLOWED_TAGS)
+_IGNORED = re.compile(r"[\s.,!?~…^]+")
+_FILLERS = re.compile(
+    "(?:" + "|".join(map(re.escape, sorted(FILLER_WORDS, key=len, reverse=True))) + r")+(?=\s|$)"
+)
+# 부정 표현을 품고 있지만 그 자체로 뜻이 정해진 표현 ("살 안 찌는", "상관없는")
+_NEGATION_FREE = tuple(
+    word for word in (*ANYTHING_WORDS, *LEXICON) if any(neg in word for neg in NEGATION_WORDS)
+)
+
+
+def _consume(text, words):
+    """text에서 words를 찾아 공백으로 지우고, (지운 텍스트, 찾은 단어 목록)을 반환합니다."""
+    found = []
+    for word in sorted(words, key=len, reverse=True):
+        if word in text:
+            found.append(word)
+            text = text.replace(word, " ")
+    return text, found
+
+
+def _has_negation(text):
+    """원문(군더더기를 지우기 전)에 부정/배제 표현이 있는지 확인합니다."""
+    for word in _NEGATION_FREE:
+        text = text.replace(word, " ")
+    return any(word in text for word in NEGATION_WORDS)
+
+
+# ============================================================================
+# 분류
+# ============================================================================
+
+def classify_local(text):
+    """
+    키워드 사전으로 의도를 분류합니다.
+
+    Args:
+        text: 정규화된 사용자 입력 (intent_utils.normalize_query 결과)
+
+    Returns:
+        ({태그: 점수}, 확신도 0~1)
+        확신도는 입력 중 키워드/군더더기로 설명되는 글자 비율이며,
+        부정 표현이나 동점 상충 태그가 있으면 0입니다.
+    """
+    total = len(_IGNORED.sub("", text))
+    if total == 0:
+        return {}, 1.0
+    if _has_negation(text):
+        return {}, 0.0
+
+    rest, anything = _consume(text, ANYTHING_WORDS)
+    rest, keywords = _consume(rest, _KEYWORDS)
+    rest, intensifiers = _consume(rest, INTENSIFIERS)
+    rest, softeners = _consume(rest, SOFTENERS)
+    rest = _IGNORED.sub("", _FILLERS.sub(" ", rest))
+
+    confidence = 1.0 - len(rest) / total
+
+    if anything and not keywords:
+        return {}, confidence
+
+    tags = {}
+    for keyword in keywords:
+        for tag, score in LEXICON[keyword].items():
+            if tag in _ALLOWED:
+                tags[tag] = max(tags.get(tag, 0), score)
+
+    if intensifiers and not softeners:
+        tags = {tag: 5 for tag in tags}
+    elif softeners and not intensifiers:
+        tags = {tag: min(score, 2) for tag, score in tags.items()}
+
+    for a, b in CONFLICTING_TAGS:
+        if a in tags and b in tags:
+            if tags[a] == tags[b]:
+                return {}, 0.0
+            del tags[a if tags[a] < tags[b] else b]
+
+    if not tags:
+        return {}, 0.0
+    return tags, confidence
@@ -0,0 +1,203 @@
+"""
+사용자 의도 분석 모듈
+
+Claude 의도 분류 결과를 정규화된 입력 문장 기준으로 로컬 SQLite 파일에 캐시합니다.
+Streamlit 재시작 후에도 유지되며, app.py와 main.py가 같은 파일을 공유합니다.
+뜻이 분명한 입력은 규칙 기반 분류기(intent_rules)가 먼저 처리합니다.
+"""
+
+import ast
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from claude_api import call_claude, call_claude_intent, FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT
+from intent_rules import classify_local, LOCAL_INTENT_MIN_CONFIDENCE
+from pipeline_utils import SingleFlight
+from tracing import traced
+
+
+# ============================================================================
+# 설정
+# ============================================================================
+
+INTENT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "intent_cache.sqlite3"
+)
+INTENT_CACHE_MAX_ENTRIES = 10000      # 초과 시 가장 오래 안 쓴 항목부터 삭제 (LRU)
+INTENT_CACHE_TTL = 7 * 24 * 60 * 60   # 초 단위 (7일)
+INTENT_STRUCTURED_OUTPUT = True       # 도구 사용 + 스트리밍 분류 (False면 자유 텍스트 응답을 파싱)
+
+
+def normalize_query(text):
+    """캐시 키용 정규화: 앞뒤 공백/문장부호 제거, 연속 공백 축약, 소문자화"""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.strip(" .,!?~…")
+
+
+# ============================================================================
+# SQLite 캐시
+# ============================================================================
+
+class IntentCache:
+    """정규화된 입력 → 태그 사전 캐시 (LRU + TTL, SQLite 저장)"""
+
+    def __init__(self, path=INTENT_CACHE_PATH, max_entries=INTENT_CACHE_MAX_ENTRIES,
+                 ttl=INTENT_CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=3000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS intent_cache ("
+            " query TEXT PRIMARY KEY,"
+            " tags TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_intent_cache_last_used"
+            " ON intent_cache (last_used)"
+        )
+
+    def get(self, user_input):
+        """캐시된 태그 사전을 반환합니다. 없거나 만료되었으면 None"""
+        key = normalize_query(user_input)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tags, created_at FROM intent_cache WHERE query = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM intent_cache WHERE query = ?", (key,))
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE intent_cache SET last_used = ? WHERE query = ?", (now, key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, user_input, tags):
+        """태그 사전을 저장하고, 최대 개수를 넘으면 오래 안 쓴 항목을 지웁니다."""
+        key = normalize_query(user_input)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO intent_cache (query, tags, created_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(tags, ensure_ascii=False), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM intent_cache WHERE query IN ("
+                " SELECT query FROM intent_cache ORDER BY last_used DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        """캐시 전체 삭제 (적중/미스 카운터도 초기화)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM intent_cache")
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """적중/미스 카운터와 현재 저장 개수"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM intent_cache").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": size,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_intent_cache():
+    """프로세스 공용 캐시 인스턴스 (처음 호출 시 생성)"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = IntentCache()
+        return _default_cache
+
+
+# ============================================================================
+# 의도 분석
+# ============================================================================
+
+# 같은 입력(정규화 기준)에 대한 동시 분류는 Claude 호출 한 번으로 합침
+_intent_flight = SingleFlight("intent")
+
+
+def _classify_remote(user_input, api_key, cache, structured):
+    """Claude로 분류하고 캐시에 저장합니다. (합쳐진 호출에서 한 번만 실행)"""
+    if structured:
+        tags = call_claude_intent(user_input, api_key=api_key)
+    else:
+        response = call_claude(
+            prompt=user_input,
+            system_prompt=FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT,
+            api_key=api_key
+        )
+        tags = ast.literal_eval(response)
+        if not isinstance(tags, dict):
+            raise ValueError(f"태그 사전이 아닌 응답: {response!r}")
+
+    cache.put(user_input, tags)
+    return tags
+
+
+@traced("intent")
+def get_intent_tags(user_input, api_key, cache=None, min_confidence=LOCAL_INTENT_MIN_CONFIDENCE,
+                    structured=INTENT_STRUCTURED_OUTPUT, timeout=None):
+    """
+    사용자 의도를 분석합니다.
+    규칙 기반 분류 → 캐시 → Claude API 순서로, 앞 단계에서 답이 나오면 멈춥니다.
+
+    Args:
+        user_input: 사용자 자연어 입력
+        api_key: Claude API 키
+        cache: 사용할 IntentCache (없으면 공용 캐시)
+        min_confidence: 규칙 기반 결과를 그대로 쓸 최소 확신도
+        structured: True면 허용 태그 스키마로 강제된 도구 호출(call_claude_intent)을 사용
+        timeout: Claude 응답을 기다릴 최대 시간(초). 넘으면 TimeoutError
+                 (같은 입력으로 진행 중인 호출이 있으면 그 결과를 함께 기다림)
+
+    Returns:
+        {태그: 점수} 사전. API 호출이나 파싱에 실패하면 예외가 그대로 전달되며
+        (같은 호출을 기다리던 쪽 모두에게), 실패한 결과는 캐시에 저장하지 않습니다.
+    """
+    if not user_input.strip():
+        return {}
+
+    tags, confidence = classify_local(normalize_query(user_input))
+    if confidence >= min_confidence:
+        return tags
+
+    cache = cache or get_intent_cache()
+    tags = cache.get(user_input)
+    if tags is not None:
+        return tags
+
+    key = (normalize_query(user_input), structured, api_key, cache.path)
+    return _intent_flight.do(
+        key, _classify_remote, user_input, api_key, cache, structured, timeout=timeout
+    )
@@ -1,8 +1,15 @@
-import json
-import ast
 import os
 from weather_utils import get_weather_info
-from claude_api import call_claude, FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT
+from intent_utils import get_intent_tags, get_intent_cache
+from menu_index import MenuIndex
+from menu_store import (
+    compiled_path, is_compiled_fresh, open_compiled_menu_db, load_menu_index_streaming
+)
+from tracing import tracer, traced, span, stage_breakdown
+from pipeline_utils import submit, join
+from Tavily_Search import get_tavily_client, trend_queries
+from trend_boost import TrendBooster
+from restaurants import RESTAURANT_FILE, get_restaurant_index
 
 # ============================================================================
 # 1. 설정 및 상수
@@ -10,6 +17,7 @@ from claude_api import call_claude, FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT
 
 # API 키 (여기에 입력하세요)
 MY_API_KEY = "" 
+TAVILY_API_KEY = ""  # 비워 두면 트렌드 가산점 없이 추천
 
 # 위치 (성남시)
 LAT, LON = 37.4201, 127.1262
@@ -40,96 +48,105 @@ DEFAULT_MENU = [
 # 2. 유틸리티 함수
 # ============================================================================
 
+@traced("load_menu_db")
 def load_menu_db(filename="menus.json"):
-    """JSON 파일을 읽고 중복을 제거하여 반환합니다."""
-    data = []
-    
-    # 1. 파일 읽기
+    """
+    메뉴 DB를 MenuIndex로 로드합니다.
+    컴파일된 바이너리(menus.bin)가 최신이면 mmap으로 열고, 아니면 JSON을 읽어 중복을 제거합니다.
+    """
+    # 0. 컴파일된 파일 우선 (python menu_store.py menus.json)
+    if is_compiled_fresh(filename):
+        try:
+            index = open_compiled_menu_db(compiled_path(filename))
+            index.precompute_weather(WEATHER_TO_FOOD_SCORE)
+            print(f"📦 '{compiled_path(filename)}' 매핑 완료: 총 {len(index)}개의 메뉴")
+            return index
+        except Exception as e:
+            print(f"⚠️ 컴파일된 파일 읽기 실패 ({e}). JSON을 사용합니다.")
+
+    # 1. 파일 읽기 (스트리밍으로 읽으며 이름 기준 중복 제거)
+    index = None
     if os.path.exists(filename):
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            print(f"📂 '{filename}' 로드 성공!")
+            index = load_menu_index_streaming(filename, progress=print_load_progress)
+            print(f"\n📂 '{filename}' 로드 성공!")
         except Exception as e:
-            print(f"⚠️ 파일 읽기 실패 ({e}). 기본 데이터를 사용합니다.")
-            data = DEFAULT_MENU
+            print(f"\n⚠️ 파일 읽기 실패 ({e}). 기본 데이터를 사용합니다.")
     else:
         print("⚠️ 파일이 없습니다. 기본 데이터를 사용합니다.")
-        data = DEFAULT_MENU
 
-    # 2. 중복 제거 (이름 기준)
-    unique_menus = []
-    seen_names = set()
+    # 2. 기본 데이터 (파일 오류 시)
+    if index is None:
+        index = MenuIndex(DEFAULT_MENU)
     
-    for menu in data:
-        if menu["name"] not in seen_names:
-            unique_menus.append(menu)
-            seen_names.add(menu["name"])
+    # 3. 날씨 상태별 점수 미리 계산
+    index.precompute_weather(WEATHER_TO_FOOD_SCORE)
     
-    print(f"📊 총 {len(unique_menus)}개의 메뉴 준비 완료 (중복 제거됨)")
-    return unique_menus
+    print(f"📊 총 {len(index)}개의 메뉴 준비 완료 (중복 제거됨)")
+    return index
+
+
+def print_load_progress(read_bytes, total_bytes, menu_count):
+    """메뉴 로드 진행률 출력 (같은 줄 덮어쓰기)"""
+    percent = read_bytes / total_bytes if total_bytes else 1.0
+    print(f"\r   ⏳ 메뉴 읽는 중... {percent:.0%} ({menu_count}개)", end="", flush=True)
 
 
 def get_user_intent_tags(user_input, api_key):
-    """Claude API를 호출하여 사용자 의도를 파악합니다."""
-    if not user_input.strip():
-        return {}
-        
+    """Claude API를 호출하여 사용자 의도를 파악합니다. (같은 입력은 캐시에서 응답)"""
     try:
-        response = call_claude(
-            prompt=user_input,
-            system_prompt=FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT,
-            api_key=api_key
-        )
-        return ast.literal_eval(response)
+        return get_intent_tags(user_input, api_key)
     except Exception as e:
         print(f"⚠️ 의도 분석 실패: {e}")
         return {}
 
 
-def calculate_recommendations(menu_list, weather_desc, temp_flag, user_tags):
+@traced("score")
+def calculate_recommendations(menu_list, weather_desc, temp_flag, user_tags, top_k=None, boosts=None):
     """
     메뉴별 점수를 계산하고, 점수 내역(reason)을 포함하여 반환합니다.
+    top_k를 지정하면 상위 k개만 뽑고, 점수 내역은 조회할 때 만들어집니다.
+    boosts({메뉴 번호: 가산점}, 예: 트렌드 가산점)를 주면 해당 메뉴 점수에 더합니다.
     """
-    # 1. 날씨 점수표 미리 만들기
-    weather_pref = {}
-    if weather_desc in WEATHER_TO_FOOD_SCORE:
-        for tag, score in WEATHER_TO_FOOD_SCORE[weather_desc].items():
-            weather_pref[tag] = weather_pref.get(tag, 0) + score
-    if temp_flag in WEATHER_TO_FOOD_SCORE:
-        for tag, score in WEATHER_TO_FOOD_SCORE[temp_flag].items():
-            weather_pref[tag] = weather_pref.get(tag, 0) + score
-
-    scored_results = []
+    # 1. 컴파일된 인덱스가 없으면 즉석에서 생성
+    if not isinstance(menu_list, MenuIndex):
+        menu_list = MenuIndex(menu_list)
+    if menu_list.weather_table != WEATHER_TO_FOOD_SCORE:
+        menu_list.precompute_weather(WEATHER_TO_FOOD_SCORE)
     
-    # 2. 각 메뉴 점수 계산
-    for menu in menu_list:
-        total_score = 0
-        reasons = [] # 점수 획득 사유 저장용
-        menu_tags = set(menu['tags'])
-        
-        # (A) 날씨 점수 계산
-        for tag, score in weather_pref.items():
-            if tag in menu_tags:
-                total_score += score
-                reasons.append(f"날씨({tag} +{score})")
-        
-        # (B) 사용자 취향 점수 계산 (가중치 2배)
-        for tag, score in user_tags.items():
-            if tag in menu_tags:
-                weighted_score = score * 2.0
-                total_score += weighted_score
-                reasons.append(f"취향({tag} +{weighted_score:.0f})")
-                
-        scored_results.append({
-            "name": menu["name"],
-            "score": total_score,
-            "reasons": reasons, # 상세 내역 추가
-            "tags": menu["tags"]
-        })
+    # 2. 미리 계산된 날씨 점수 + 사용자 취향 점수
+    return menu_list.score_for_weather(weather_desc, temp_flag, user_tags, top_k=top_k, boosts=boosts)
+
+
+@traced("score.batch")
+def calculate_recommendations_batch(menu_list, weather_desc, temp_flag, users, top_k=3, api_key=MY_API_KEY):
+    """
+    날씨가 같은 여러 사용자의 추천을 한 번에 계산합니다. (점심 푸시 같은 일괄 작업용)
+
+    Args:
+        users: 사용자별 {태그: 점수} 사전 또는 자연어 입력 문자열의 리스트
+        top_k: 사용자별 상위 k개
+
+    Returns:
+        users와 같은 순서의 [[추천 결과, ...], ...]
+    """
+    # 1. 자연어 입력은 같은 문장끼리 한 번만 분석
+    intents = {}
+    user_tags_list = []
+    for user in users:
+        if isinstance(user, str):
+            if user not in intents:
+                intents[user] = get_user_intent_tags(user, api_key)
+            user = intents[user]
+        user_tags_list.append(user)
+
+    # 2. 사용자 × 태그 조합 점수를 한 번에 계산 (날씨 점수는 미리 계산된 값 공유)
+    if not isinstance(menu_list, MenuIndex):
+        menu_list = MenuIndex(menu_list)
+    if menu_list.weather_table != WEATHER_TO_FOOD_SCORE:
+        menu_list.precompute_weather(WEATHER_TO_FOOD_SCORE)
     
-    # 점수 높은 순 정렬
-    return sorted(scored_results, key=lambda x: x["score"], reverse=True)
+    return menu_list.score_batch_for_weather(weather_desc, temp_flag, user_tags_list, top_k=top_k)
 
 
 # ============================================================================
@@ -137,47 +154,98 @@ def calculate_recommendations(menu_list, weather_desc, temp_flag, user_tags):
 # ============================================================================
 
 if __name__ == "__main__":
-    # 1. 메뉴 로드
+    # 단계별 시간 기록 시작
+    request = tracer.start_request("cli")
+
+    # 1. 날씨 조회는 바로 시작 (메뉴 로드와 사용자 입력을 기다리는 동안 진행)
+    weather_future = submit(get_weather_info, LAT, LON)
+
+    # 2. 메뉴 로드 (식당 색인은 입력을 기다리는 동안 백그라운드에서 로드)
+    restaurant_future = submit(get_restaurant_index, RESTAURANT_FILE)
     MENU_DB = load_menu_db("menus.json")
 
-    # 2. 날씨 확인
-    print("\n🌤️ [시스템] 현재 날씨 정보를 조회합니다...")
-    weather_desc, temp_flag = get_weather_info(LAT, LON)
+    # 3. 사용자 입력
+    print("\n🍽️ [시스템] 드시고 싶은 메뉴 스타일이 있나요?")
+    print("   (예: '비오는데 따뜻한 국물 먹고 싶어', '스트레스 받아서 매운거!')")
+    with span("input"):
+        user_input = input("   입력 >> ")
+    
+    # 4. 의도 분석 (+ 트렌드 검색) 시작 → 날씨와 함께 끝나는 순서대로 출력
+    print("\n🌤️🧠 [시스템] 날씨 조회와 의도 분석을 함께 진행합니다...")
+    stage_futures = {
+        "weather": weather_future,
+        "intent": submit(get_intent_tags, user_input, MY_API_KEY),
+    }
+    trend_booster = TrendBooster(MENU_DB, get_tavily_client(TAVILY_API_KEY), trend_queries)
+    if TAVILY_API_KEY:
+        stage_futures["trend"] = submit(trend_booster.refresh)
+    
+    def print_stage_done(name, result):
+        if name == "weather":
+            print(f"   🌤️ 날씨 조회 완료: {result}")
+        elif name == "trend":
+            if isinstance(result, Exception) or trend_booster.last_error:
+                print(f"   ⚠️ 트렌드 검색 실패: {trend_booster.last_error or result}")
+            else:
+                print(f"   📈 트렌드 검색 완료: 가산점 메뉴 {len(result)}개")
+        elif isinstance(result, Exception):
+            print(f"   ⚠️ 의도 분석 실패: {result}")
+        else:
+            print(f"   🧠 의도 분석 완료: {result}")
     
+    with span("wait"):
+        stage_results = join(stage_futures, on_done=print_stage_done)
+    
+    weather_desc, temp_flag = stage_results["weather"]
     if not weather_desc:
         weather_desc, temp_flag = "SUNNY", "NORMAL"
         print("   (날씨 조회 실패로 기본값 사용)")
-    
     print(f"   👉 상태: {weather_desc} / 기온: {temp_flag}")
-
-    # 3. 사용자 입력
-    print("\n🍽️ [시스템] 드시고 싶은 메뉴 스타일이 있나요?")
-    print("   (예: '비오는데 따뜻한 국물 먹고 싶어', '스트레스 받아서 매운거!')")
-    user_input = input("   입력 >> ")
     
-    # 4. 의도 분석
-    print("\n🧠 [시스템] 사용자의 의도를 분석 중입니다...")
-    user_tags = get_user_intent_tags(user_input, MY_API_KEY)
+    user_tags = stage_results["intent"]
+    if isinstance(user_tags, Exception):
+        user_tags = {}
     print(f"   👉 분석 결과: {user_tags}")
+    cache_stats = get_intent_cache().stats()
+    print(f"   (의도 캐시: 적중 {cache_stats['hits']} / 미스 {cache_stats['misses']})")
     
     # 5. 추천 결과 계산
-    results = calculate_recommendations(MENU_DB, weather_desc, temp_flag, user_tags)
+    results = calculate_recommendations(
+        MENU_DB, weather_desc, temp_flag, user_tags, top_k=3, boosts=trend_booster.boosts
+    )
+    with span("restaurants"):
+        restaurant_index = restaurant_future.result()
+        nearby = (
+            restaurant_index.resolve([item['name'] for item in results[:3]], LAT, LON)
+            if restaurant_index is not None else {}
+        )
     
     # 6. 최종 출력 (상세 내역 포함)
-    print("\n" + "="*50)
-    print(f"🏆 오늘의 추천 메뉴 (Top 3)")
-    print("="*50)
-    
-    if not results:
-        print("😭 추천할 메뉴가 없습니다.")
-    else:
-        for i, item in enumerate(results[:3]):
-            print(f"\n🥇 {i+1}위: [{item['name']}] (총점: {item['score']}점)")
-            
-            # 상세 점수 이유 출력
-            if item['reasons']:
-                print(f"   └─ 🔍 점수 요인: {', '.join(item['reasons'])}")
-            else:
-                print(f"   └─ (특별한 가중치 없음)")
-    
-    print("\n" + "="*50)
\ No newline at end of file
+    with span("render"):
+        print("\n" + "="*50)
+        print(f"🏆 오늘의 추천 메뉴 (Top 3)")
+        print("="*50)
+        
+        if not results:
+            print("😭 추천할 메뉴가 없습니다.")
+        else:
+            for i, item in enumerate(results[:3]):
+                print(f"\n🥇 {i+1}위: [{item['name']}] (총점: {item['score']}점)")
+                
+                # 상세 점수 이유 출력
+                if item['reasons']:
+                    print(f"   └─ 🔍 점수 요인: {', '.join(item['reasons'])}")
+                else:
+                    print(f"   └─ (특별한 가중치 없음)")
+                
+                # 가까운 영업 중 식당 (식당 데이터가 있을 때만)
+                if nearby.get(item['name']):
+                    places = ", ".join(f"{r['name']}({r['distance_m']}m)" for r in nearby[item['name']])
+                    print(f"   └─ 📍 가까운 식당: {places}")
+        
+        print("\n" + "="*50)
+
+    # 7. 단계별 소요 시간
+    tracer.finish_request(request)
+    breakdown = ", ".join(f"{stage} {ms:.0f}ms" for stage, ms in stage_breakdown(request).items())
+    print(f"⏱️ 단계별 시간: {breakdown} (전체 {request['total_ms']:.0f}ms)")
\ No newline at end of file
@@ -0,0 +1,500 @@
+"""
+메뉴 DB 스코어링 엔진
+
+메뉴 DB를 로드 시점에 한 번만 '메뉴 × 태그' 비트마스크 행렬로 컴파일합니다.
+요청마다 메뉴별 set을 만들지 않고, 가중치 벡터와 비트마스크의 내적으로 점수를 냅니다.
+태그 조합(비트마스크)이 같은 메뉴는 점수가 같으므로 조합별로 한 번만 계산합니다.
+태그 → 메뉴 역색인(posting list)으로 활성 태그가 하나도 없는 메뉴는 건너뜁니다.
+"""
+
+import heapq
+from array import array
+from functools import partial
+from itertools import chain, groupby, islice
+
+# 날씨 쪽 점수가 가질 수 있는 상태 (weather_utils 기준)
+WEATHER_DESCS = ("RAINY", "SNOWY", "SUNNY", "CLOUDY", "UNKNOWN")
+TEMP_FLAGS = ("HOT", "COLD", "NORMAL")
+
+
+class MenuIndex:
+    """메뉴 × 태그 비트마스크 행렬로 컴파일된 메뉴 DB"""
+
+    def __init__(self, menu_list):
+        self.menus = []      # 원본 메뉴 dict (입력 순서 유지)
+        self.masks = []      # 메뉴별 태그 비트마스크 (menus와 같은 순서)
+        self.tag_bits = {}   # 태그 → 비트
+        self.postings = {}   # 태그 → 해당 태그를 가진 메뉴 번호 (오름차순)
+        self._mask_groups = None  # 태그 조합 → 메뉴 번호 (mask_groups()에서 생성)
+        self.weather_table = None  # precompute_weather()에서 지정
+        self._weather_states = {}  # (날씨 상태, 기온 플래그) → 사전 계산 결과
+
+        for menu in menu_list:
+            self.add(menu)
+
+    @classmethod
+    def from_parts(cls, menus, masks, tag_bits, postings):
+        """
+        이미 컴파일된 구조(예: menu_store의 메모리 매핑 뷰)로 인덱스를 만듭니다.
+        menus/masks/postings는 인덱싱과 len()만 지원하면 되며, 이 경우 add()는 쓸 수 없습니다.
+        """
+        index = cls.__new__(cls)
+        index.menus = menus
+        index.masks = masks
+        index.tag_bits = tag_bits
+        index.postings = postings
+        index._mask_groups = None
+        index.weather_table = None
+        index._weather_states = {}
+        return index
+
+    def __len__(self):
+        return len(self.menus)
+
+    def __iter__(self):
+        return iter(self.menus)
+
+    def __getitem__(self, i):
+        return self.menus[i]
+
+    # ------------------------------------------------------------------------
+    # 컴파일
+    # ------------------------------------------------------------------------
+
+    def add(self, menu):
+        """메뉴 한 건을 행렬과 역색인에 추가합니다."""
+        self._append(menu, self.encode(menu["tags"], add_new=True))
+
+    def _append(self, menu, mask):
+        position = len(self.menus)
+        self.menus.append(menu)
+        self.masks.append(mask)
+        for tag in set(menu["tags"]):
+            self.postings.setdefault(tag, []).append(position)
+        if self._mask_groups is not None:
+            self._mask_groups.setdefault(self.masks[-1], []).append(position)
+        self._weather_states.clear()  # 날씨 점수는 다음 조회 때 다시 계산
+
+    def with_menus(self, menu_list):
+        """
+        메뉴 목록이 바뀐 새 버전의 인덱스를 만듭니다. (이 인덱스는 그대로 두므로 읽는 쪽을 막지 않음)
+
+        이름과 태그가 그대로인 메뉴는 비트마스크를 다시 만들지 않고, 이미 계산한 태그 조합의
+        날씨 점수도 재사용해 추가/변경된 조합만 계산합니다. 메뉴 순서는 menu_list를 따르므로
+        처음부터 다시 로드한 것과 같은 순위가 나옵니다.
+
+        Args:
+            menu_list: 이름 기준으로 중복이 제거된 새 메뉴 목록
+
+        Returns:
+            (새 인덱스, {"added", "changed", "removed": [이름, ...], "positions": {이전 번호: 새 번호}})
+        """
+        old_positions = {menu["name"]: i for i, menu in enumerate(self.menus)}
+
+        # 기존 태그 비트를 그대로 이어받아야 남은 메뉴의 비트마스크를 재사용할 수 있음
+        index = MenuIndex([])
+        index.tag_bits = dict(self.tag_bits)
+
+        menus, masks, groups = index.menus, index.masks, {}
+        added, changed, positions = [], [], {}
+        for menu in menu_list:
+            position = len(menus)
+            old = old_positions.pop(menu["name"], None)
+            if old is None:
+                added.append(menu["name"])
+                mask = index.encode(menu["tags"], add_new=True)
+            else:
+                positions[old] = position
+                old_menu = self.menus[old]
+                if old_menu == menu:
+                    mask = self.masks[old]
+                else:
+                    changed.append(menu["name"])
+                    if old_menu["tags"] == menu["tags"]:
+                        mask = self.masks[old]
+                    else:
+                        mask = index.encode(menu["tags"], add_new=True)
+            menus.append(menu)
+            masks.append(mask)
+            groups.setdefault(mask, []).append(position)
+        index._mask_groups = groups
+
+        # 역색인은 태그 조합별 메뉴 번호를 합쳐서 만듦 (메뉴마다 태그를 다시 훑지 않음)
+        for tag, bit in index.tag_bits.items():
+            index.postings[tag] = sorted(
+                chain.from_iterable(group for mask, group in groups.items() if mask & bit)
+            )
+
+        removed = [self.menus[i]["name"] for i in sorted(old_positions.values())]
+
+        if self.weather_table is not None:
+            index.weather_table = self.weather_table
+            for (weather_desc, temp_flag), state in self._weather_states.items():
+                index.weather_state(weather_desc, temp_flag, previous=state)
+
+        return index, {"added": added, "changed": changed, "removed": removed, "positions": positions}
+
+    def mask_groups(self):
+        """태그 조합(비트마스크) → 해당 메뉴 번호 목록(오름차순). 처음 호출할 때 만듭니다."""
+        if self._mask_groups is None:
+            groups = {}
+            for position, mask in enumerate(self.masks):
+                groups.setdefault(mask, []).append(position)
+            self._mask_groups = groups
+        return self._mask_groups
+
+    def encode(self, tags, add_new=False):
+        """태그 목록을 비트마스크로 변환합니다. (모르는 태그는 무시)"""
+        mask = 0
+        for tag in tags:
+            bit = self.tag_bits.get(tag)
+            if bit is None:
+                if not add_new:
+                    continue
+                bit = 1 << len(self.tag_bits)
+                self.tag_bits[tag] = bit
+            mask |= bit
+        return mask
+
+    def weight_vector(self, weights):
+        """{태그: 점수} 사전을 (비트, 태그, 점수) 벡터로 변환합니다.
+
+        어떤 메뉴에도 없는 태그는 점수에 영향이 없으므로 제외합니다.
+        """
+        return [
+            (self.tag_bits[tag], tag, score)
+            for tag, score in weights.items()
+            if tag in self.tag_bits
+        ]
+
+    # ------------------------------------------------------------------------
+    # 점수 계산
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def _score_mask(mask, weather_vec, user_vec):
+        """비트마스크 한 행의 총점을 계산합니다."""
+        total_score = 0
+
+        # 날씨 점수
+        for bit, tag, score in weather_vec:
+            if mask & bit:
+                total_score += score
+
+        # 사용자 취향 점수 (2배 가중치)
+        for bit, tag, score in user_vec:
+            if mask & bit:
+                total_score += score * 2.0
+
+        return total_score
+
+    @staticmethod
+    def _explain_mask(mask, weather_vec, user_vec):
+        """비트마스크 한 행의 점수 요인 문자열을 만듭니다."""
+        reasons = []
+        for bit, tag, score in weather_vec:
+            if mask & bit:
+                reasons.append(f"날씨({tag} +{score})")
+        for bit, tag, score in user_vec:
+            if mask & bit:
+                reasons.append(f"취향({tag} +{score * 2.0:.0f})")
+        return reasons
+
+    def candidates(self, *weight_vecs):
+        """가중치 벡터에 있는 태그의 posting list에 등장하는 메뉴 번호 집합"""
+        result = set()
+        for vec in weight_vecs:
+            for bit, tag, score in vec:
+                result.update(self.postings[tag])
+        return result
+
+    def _iter_ranking(self, scores):
+        """
+        후보 메뉴 점수({메뉴 번호: 점수})로 전체 순위를 차례로 내보냅니다.
+
+        후보가 아닌 메뉴는 모두 0점이므로, 양수 점수 메뉴를 다 내보낸 뒤
+        0점 구간에서만 메뉴 번호 순으로 지연 생성합니다.
+        """
+        def rank_key(i):
+            return (-scores[i], i)
+
+        positive = [i for i, s in scores.items() if s > 0]
+        yield from sorted(positive, key=rank_key)
+
+        # 0점: 후보 중 0점인 메뉴와 비후보 메뉴를 메뉴 번호 순으로 병합
+        zero_candidates = sorted(i for i, s in scores.items() if s == 0)
+        non_candidates = (i for i in range(len(self.menus)) if i not in scores)
+        yield from heapq.merge(zero_candidates, non_candidates)
+
+        negative = [i for i, s in scores.items() if s < 0]
+        yield from sorted(negative, key=rank_key)
+
+    def score(self, weather_pref, user_tags, top_k=None):
+        """
+        메뉴별 점수를 계산하고, 점수 높은 순으로 반환합니다.
+
+        Args:
+            weather_pref: 날씨/기온 가중치를 합친 {태그: 점수}
+            user_tags: 사용자 취향 {태그: 점수} (2배 가중치)
+            top_k: 지정하면 상위 k개만 부분 선택으로 뽑습니다. (None이면 전체 순위)
+
+        Returns:
+            [ScoredMenu, ...] (동점이면 메뉴 DB 순서)
+            점수 요인("reasons")은 결과를 실제로 조회할 때 만들어집니다.
+        """
+        weather_vec = self.weight_vector(weather_pref)
+        user_vec = self.weight_vector(user_tags)
+
+        # 활성 태그와 겹치는 메뉴만 점수 계산 (태그 조합별로 한 번만)
+        mask_scores = {}
+        scores = {}
+        for i in self.candidates(weather_vec, user_vec):
+            mask = self.masks[i]
+            total_score = mask_scores.get(mask)
+            if total_score is None:
+                total_score = mask_scores[mask] = self._score_mask(mask, weather_vec, user_vec)
+            scores[i] = total_score
+
+        if top_k is None:
+            order = self._iter_ranking(scores)
+        elif sum(1 for s in scores.values() if s > 0) >= top_k:
+            # 양수 점수 후보만으로 충분하면 부분 선택
+            positive = (i for i, s in scores.items() if s > 0)
+            order = heapq.nsmallest(top_k, positive, key=lambda i: (-scores[i], i))
+        else:
+            order = islice(self._iter_ranking(scores), top_k)
+
+        explain = self._explainer(weather_vec, user_vec)
+        return [
+            ScoredMenu(self.menus[i], scores.get(i, 0), partial(explain, self.masks[i]))
+            for i in order
+        ]
+
+    def _explainer(self, weather_vec, user_vec):
+        """점수 요인을 태그 조합별로 한 번만, 필요할 때 만드는 함수를 반환합니다."""
+        reason_cache = {}
+
+        def explain(mask):
+            reasons = reason_cache.get(mask)
+            if reasons is None:
+                reasons = reason_cache[mask] = self._explain_mask(mask, weather_vec, user_vec)
+            return reasons
+
+        return explain
+
+    # ------------------------------------------------------------------------
+    # 일괄 점수 계산 (여러 사용자)
+    # ------------------------------------------------------------------------
+
+    def score_batch(self, weather_pref, user_tags_list, top_k=3):
+        """
+        같은 날씨를 공유하는 여러 사용자의 추천을 한 번에 계산합니다.
+
+        점수는 태그 조합에만 의존하므로 '사용자 × 태그'와 '태그 × 태그 조합' 행렬의 곱으로
+        구하고, 날씨 기여분은 태그 조합별로 한 번만 계산해 모든 사용자가 공유합니다.
+        사용자당 비용은 메뉴 수가 아니라 태그 조합 수 + top_k에 비례합니다.
+
+        Args:
+            weather_pref: 날씨/기온 가중치를 합친 {태그: 점수}
+            user_tags_list: [사용자별 {태그: 점수}, ...]
+            top_k: 사용자별 상위 k개 (None이면 전체 순위)
+
+        Returns:
+            user_tags_list와 같은 순서의 [[ScoredMenu, ...], ...] (score()와 같은 순위/점수)
+        """
+        weather_vec = self.weight_vector(weather_pref)
+        weather_scores = {
+            mask: self._score_mask(mask, weather_vec, ()) for mask in self.mask_groups()
+        }
+        return [
+            self._score_user(weather_vec, weather_scores, user_tags, top_k)
+            for user_tags in user_tags_list
+        ]
+
+    def _score_user(self, weather_vec, weather_scores, user_tags, top_k):
+        """태그 조합별 날씨 점수 위에 사용자 점수만 더해 순위를 냅니다."""
+        groups = self.mask_groups()
+        user_vec = self.weight_vector(user_tags)
+        mask_scores = self._user_mask_scores(weather_scores, user_vec)
+
+        explain = self._explainer(weather_vec, user_vec)
+        return [
+            ScoredMenu(self.menus[i], mask_scores[self.masks[i]], partial(explain, self.masks[i]))
+            for i in self._top_positions(mask_scores, groups, top_k)
+        ]
+
+    @staticmethod
+    def _user_mask_scores(weather_scores, user_vec):
+        """날씨 점수 위에 사용자 점수를 더함 (score()와 같은 덧셈 순서)"""
+        mask_scores = {}
+        for mask, total_score in weather_scores.items():
+            for bit, tag, score in user_vec:
+                if mask & bit:
+                    total_score += score * 2.0
+            mask_scores[mask] = total_score
+        return mask_scores
+
+    @staticmethod
+    def _top_positions(mask_scores, groups, top_k):
+        """태그 조합을 점수순으로 훑으며, 동점 조합끼리는 메뉴 번호 순으로 병합해 상위 k개를 뽑습니다."""
+        ranked = sorted(mask_scores, key=mask_scores.__getitem__, reverse=True)
+        order = []
+        for _, masks in groupby(ranked, key=mask_scores.__getitem__):
+            if top_k is None:
+                # 각 조합의 번호 목록은 이미 정렬되어 있으므로, 이어 붙여 정렬하면(정렬된 구간 병합) 번호 순
+                tied = [groups[mask] for mask in masks]
+                order.extend(tied[0] if len(tied) == 1 else sorted(chain.from_iterable(tied)))
+                continue
+            need = top_k - len(order)
+            if need <= 0:
+                break
+            order.extend(islice(heapq.merge(*(groups[mask] for mask in masks)), need))
+        return order
+
+    # ------------------------------------------------------------------------
+    # 날씨 상태별 사전 계산
+    # ------------------------------------------------------------------------
+
+    def precompute_weather(self, weather_table, weather_descs=WEATHER_DESCS, temp_flags=TEMP_FLAGS):
+        """
+        모든 (날씨 상태, 기온 플래그) 조합의 태그 조합별 날씨 점수와, 취향이 없을 때의
+        전체 순위를 미리 계산합니다. 메뉴 로드 직후 한 번 호출하므로 첫 요청도 O(k)로 응답합니다.
+
+        Args:
+            weather_table: WEATHER_TO_FOOD_SCORE 형식의 {상태/플래그: {태그: 점수}}
+        """
+        self.weather_table = weather_table
+        self._weather_states = {}
+        for weather_desc in weather_descs:
+            for temp_flag in temp_flags:
+                self.weather_state(weather_desc, temp_flag)
+
+    def weather_state(self, weather_desc, temp_flag, previous=None):
+        """
+        (날씨 상태, 기온 플래그)의 사전 계산 결과 (없으면 만들어 보관)
+        previous(이전 버전 인덱스의 같은 상태)를 주면 날씨 벡터가 같을 때 조합별 점수를 재사용합니다.
+        """
+        key = (weather_desc, temp_flag)
+        state = self._weather_states.get(key)
+        if state is None:
+            if self.weather_table is None:
+                raise RuntimeError("precompute_weather()를 먼저 호출해야 합니다.")
+            weather_pref = {}
+            for name in key:
+                for tag, score in self.weather_table.get(name, {}).items():
+                    weather_pref[tag] = weather_pref.get(tag, 0) + score
+            weather_vec = self.weight_vector(weather_pref)
+            reuse = {}
+            if previous is not None and previous["weather_vec"] == weather_vec:
+                reuse = previous["mask_scores"]
+            mask_scores = {
+                mask: reuse[mask] if mask in reuse else self._score_mask(mask, weather_vec, ())
+                for mask in self.mask_groups()
+            }
+            state = self._weather_states[key] = {
+                "weather_vec": weather_vec,
+                "mask_scores": mask_scores,
+                # 취향 없는 경우의 전체 순위 (메뉴 번호 array)
+                "ranking": array("I", self._top_positions(mask_scores, self.mask_groups(), None)),
+            }
+        return state
+
+    def score_batch_for_weather(self, weather_desc, temp_flag, user_tags_list, top_k=3):
+        """사전 계산된 날씨 점수로 score_batch()를 수행합니다."""
+        state = self.weather_state(weather_desc, temp_flag)
+        return [
+            self._score_user(state["weather_vec"], state["mask_scores"], user_tags, top_k)
+            for user_tags in user_tags_list
+        ]
+
+    def score_for_weather(self, weather_desc, temp_flag, user_tags, top_k=None, boosts=None):
+        """
+        사전 계산된 날씨 점수로 추천을 계산합니다. (score()와 같은 순위/점수)
+
+        취향이 없으면(user_tags == {}) 보관된 순위에서 k개를 잘라 O(k)로 응답하고,
+        있으면 태그 조합별 날씨 점수에 사용자 점수만 더합니다.
+        precompute_weather()를 먼저 호출해야 합니다.
+
+        Args:
+            boosts: 메뉴별 가산점 {메뉴 번호: 점수} (예: 트렌드 가산점, 0 이하는 무시)
+        """
+        state = self.weather_state(weather_desc, temp_flag)
+        weather_vec = state["weather_vec"]
+
+        if boosts:
+            user_vec = self.weight_vector(user_tags)
+            mask_scores = state["mask_scores"]
+            if user_vec:
+                mask_scores = self._user_mask_scores(mask_scores, user_vec)
+            return self._score_boosted(weather_vec, user_vec, mask_scores, boosts, top_k)
+
+        if self.weight_vector(user_tags):
+            return self._score_user(weather_vec, state["mask_scores"], user_tags, top_k)
+
+        ranking = state["ranking"]
+        positions = ranking if top_k is None else ranking[:top_k]
+
+        mask_scores = state["mask_scores"]
+        explain = self._explainer(weather_vec, ())
+        return [
+            ScoredMenu(self.menus[i], mask_scores[self.masks[i]], partial(explain, self.masks[i]))
+            for i in positions
+        ]
+
+    def _score_boosted(self, weather_vec, user_vec, mask_scores, boosts, top_k):
+        """
+        태그 조합 점수에 메뉴별 가산점을 더해 순위를 냅니다.
+        가산점은 점수를 올리기만 하므로, 가산점 없는 순위의 상위 k개와
+        가산점을 받은 메뉴만 비교하면 전체 상위 k개가 나옵니다.
+        """
+        boosts = {i: b for i, b in boosts.items() if b > 0 and 0 <= i < len(self.menus)}
+        candidates = set(self._top_positions(mask_scores, self.mask_groups(), top_k))
+        candidates.update(boosts)
+
+        scores = {}
+        for i in candidates:
+            scores[i] = mask_scores[self.masks[i]]
+            if i in boosts:
+                scores[i] += boosts[i]
+        order = sorted(candidates, key=lambda i: (-scores[i], i))
+        if top_k is not None:
+            order = order[:top_k]
+
+        explain = self._explainer(weather_vec, user_vec)
+        return [
+            ScoredMenu(
+                self.menus[i], scores[i],
+                partial(_explain_with_boost, explain, self.masks[i], boosts[i]) if i in boosts
+                else partial(explain, self.masks[i])
+            )
+            for i in order
+        ]
+
+
+def _explain_with_boost(explain, mask, boost):
+    """태그 점수 요인 뒤에 가산점 요인을 붙입니다."""
+    return explain(mask) + [f"트렌드(검색 +{boost:.1f})"]
+
+
+class ScoredMenu(dict):
+    """
+    추천 결과 한 건 ({"name", "score", "reasons", "tags"}).
+
+    "reasons"는 처음 조회할 때 만들어지므로, 화면에 그리지 않는 결과는
+    문자열을 만들지 않습니다.
+    """
+
+    def __init__(self, menu, score, explain):
+        super().__init__(name=menu["name"], score=score, tags=menu["tags"])
+        self._explain = explain
+
+    def __missing__(self, key):
+        if key != "reasons":
+            raise KeyError(key)
+        reasons = self["reasons"] = self._explain()
+        return reasons
+
+    def get(self, key, default=None):
+        if key == "reasons":
+            return self[key]
+        return super().get(key, default)
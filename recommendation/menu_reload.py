@@ -0,0 +1,131 @@
+"""
+menus.json 변경 감지 + 증분 반영
+
+백그라운드 스레드가 menus.json의 수정 시각/크기를 주기적으로 확인하고, 바뀌었으면
+새 파일을 스트리밍으로 읽어 현재 인덱스와 비교합니다. 추가/변경/삭제된 메뉴만 새로
+인코딩하고 날씨 점수도 새 태그 조합만 계산한 새 버전(MenuIndex.with_menus)을 만든 뒤
+참조를 한 번에 바꿔 끼웁니다. 읽는 쪽은 reloader.index를 한 번 읽어 요청 끝까지 쓰면 되며,
+교체 중에도 기다리지 않습니다.
+
+사용 예:
+    reloader = MenuReloader("menus.json", load_menu_db("menus.json"),
+                            on_swap=trend_booster.set_index).start()
+    index = reloader.index   # 요청마다 한 번 읽기
+"""
+
+import os
+import threading
+import time
+from menu_store import iter_menu_json
+
+
+MENU_RELOAD_INTERVAL = 2.0   # 초, 파일 변경 확인 주기
+
+
+def file_signature(filename):
+    """변경 감지용 (수정 시각 ns, 크기). 파일이 없으면 None"""
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def read_menu_list(filename):
+    """메뉴 JSON을 읽어 이름 기준으로 중복 제거한 목록을 반환합니다. (먼저 나온 항목 유지)"""
+    menus = {}
+    for menu in iter_menu_json(filename):
+        menus.setdefault(menu["name"], menu)
+    return list(menus.values())
+
+
+class MenuReloader:
+    """
+    menus.json이 바뀌면 바뀐 메뉴만 반영한 새 인덱스로 교체합니다.
+
+    Args:
+        filename: 감시할 메뉴 JSON 경로
+        index: 현재 로드된 MenuIndex (precompute_weather까지 마친 상태)
+        on_swap: 교체 직후 on_swap(새 인덱스, {이전 번호: 새 번호}) 호출
+                 (예: TrendBooster.set_index로 가산점 번호 이전)
+        interval: 백그라운드 확인 주기(초)
+    """
+
+    def __init__(self, filename, index, on_swap=None, interval=MENU_RELOAD_INTERVAL):
+        self.filename = filename
+        self.index = index          # 현재 버전 (교체 시 참조만 바뀜)
+        self.version = 1
+        self.on_swap = on_swap
+        self.interval = interval
+
+        self.last_changes = None    # 마지막 교체의 {"added", "changed", "removed"} 이름 목록
+        self.reloaded_at = None     # 마지막 교체 시각 (time.time())
+        self.last_error = None
+
+        self._signature = file_signature(filename)
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """파일이 바뀌었으면 반영합니다. 교체했으면 True"""
+        signature = file_signature(self.filename)
+        if signature is None or signature == self._signature:
+            return False
+        return self.reload(signature)
+
+    def reload(self, signature=None):
+        """
+        파일을 다시 읽어 현재 인덱스와 비교하고, 달라진 점이 있으면 새 버전으로 교체합니다.
+        읽기에 실패하면(예: 쓰는 도중의 파일) 기존 인덱스를 유지하고, 파일이 다시 바뀌면 재시도합니다.
+        """
+        with self._reload_lock:
+            signature = signature or file_signature(self.filename)
+            try:
+                menu_list = read_menu_list(self.filename)
+            except Exception as e:
+                self._signature = signature
+                self.last_error = str(e)
+                print(f"Error reloading menus: {e}")
+                return False
+            self.last_error = None
+            self._signature = signature
+
+            index, changes = self.index.with_menus(menu_list)
+            if not (changes["added"] or changes["changed"] or changes["removed"]):
+                return False
+
+            self.index = index
+            self.version += 1
+            self.reloaded_at = time.time()
+            self.last_changes = {
+                key: changes[key] for key in ("added", "changed", "removed")
+            }
+            print(
+                f"🔁 메뉴 DB v{self.version}: 추가 {len(changes['added'])}, "
+                f"변경 {len(changes['changed'])}, 삭제 {len(changes['removed'])}"
+            )
+            if self.on_swap is not None:  # 교체 순서대로 알리도록 락 안에서 호출
+                self.on_swap(index, changes["positions"])
+        return True
+
+    # --- 백그라운드 실행 ---------------------------------------------------
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error checking menus: {e}")
+
+    def start(self):
+        """백그라운드 확인 스레드를 시작합니다. (이미 실행 중이면 무시)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="menu-reload", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,313 @@
+"""
+바이너리 메뉴 DB (컴파일 + 메모리 매핑 로드)
+
+menus.json을 중복 제거된 바이너리 파일(menus.bin)로 미리 컴파일해 두면,
+load_menu_db가 JSON 파싱과 dict 생성 없이 파일을 mmap으로 열어 바로 MenuIndex로 씁니다.
+읽기 전용 mmap이라 여러 Streamlit 워커 프로세스가 같은 페이지 캐시를 공유합니다.
+
+JSON은 스트리밍으로 읽으므로(iter_menu_json) 수 GB짜리 메뉴 덤프도 파일 전체를
+메모리에 올리지 않고 처리할 수 있습니다.
+
+사용법:
+    python menu_store.py menus.json menus.bin
+
+파일 구조 (리틀 엔디언, 각 구역은 8바이트 정렬):
+    헤더      magic "HMDB", version, 태그 수 T, 메뉴 수 N, 구역 크기들
+    masks     N × u64   메뉴별 태그 비트마스크 (비트 i = 태그 ID i)
+    names     (N+1) × u32 오프셋 + UTF-8 이름 문자열 테이블
+    tagseq    (N+1) × u32 오프셋 + 메뉴별 태그 ID 나열 (u8, 원래 태그 순서 유지)
+    postings  (T+1) × u32 오프셋 + 태그별 메뉴 번호 (u32, 오름차순)
+    tags      태그 문자열 테이블 (u8 길이 + UTF-8)
+"""
+
+import codecs
+import json
+import mmap
+import os
+import struct
+import sys
+from menu_index import MenuIndex
+
+
+MAGIC = b"HMDB"
+VERSION = 1
+MAX_TAGS = 64  # 비트마스크가 u64이므로
+
+# magic, version, 태그 수, 메뉴 수, 이름 바이트, 태그열 바이트, posting 수, 태그 테이블 바이트
+_HEADER = struct.Struct("<4sHHIIIII")
+
+STREAM_CHUNK_SIZE = 1 << 20       # 스트리밍 로더가 한 번에 읽는 바이트 수
+STREAM_MAX_RECORD_CHARS = 1 << 20  # 메뉴 한 건이 이보다 길면 손상된 파일로 판단
+
+
+def compiled_path(filename):
+    """menus.json → menus.bin"""
+    return os.path.splitext(filename)[0] + ".bin"
+
+
+def is_compiled_fresh(filename):
+    """컴파일 파일이 있고 원본 JSON보다 새로운지 (JSON이 없으면 컴파일 파일만 있으면 됨)"""
+    binary = compiled_path(filename)
+    if not os.path.exists(binary):
+        return False
+    if not os.path.exists(filename):
+        return True
+    return os.path.getmtime(binary) >= os.path.getmtime(filename)
+
+
+def _pad(data):
+    return data + b"\0" * (-len(data) % 8)
+
+
+# ============================================================================
+# 컴파일
+# ============================================================================
+
+def compile_menu_db(menu_list, out_path):
+    """
+    메뉴 목록을 이름 기준으로 중복 제거(먼저 나온 항목 유지)하여 바이너리 파일로 저장합니다.
+
+    Returns:
+        저장한 메뉴 수
+    """
+    tag_ids = {}
+    names, tag_seqs, masks = [], [], []
+    seen_names = set()
+
+    for menu in menu_list:
+        if menu["name"] in seen_names:
+            continue
+        seen_names.add(menu["name"])
+
+        seq = []
+        for tag in menu["tags"]:
+            if tag not in tag_ids:
+                if len(tag_ids) >= MAX_TAGS:
+                    raise ValueError(f"태그 종류가 {MAX_TAGS}개를 넘습니다: {tag}")
+                tag_ids[tag] = len(tag_ids)
+            seq.append(tag_ids[tag])
+
+        names.append(menu["name"].encode("utf-8"))
+        tag_seqs.append(bytes(seq))
+        masks.append(sum(1 << i for i in set(seq)))
+
+    postings = [[] for _ in tag_ids]
+    for position, seq in enumerate(tag_seqs):
+        for tag_id in sorted(set(seq)):
+            postings[tag_id].append(position)
+
+    def offsets(chunks):
+        result, total = [0], 0
+        for chunk in chunks:
+            total += len(chunk)
+            result.append(total)
+        return struct.pack(f"<{len(result)}I", *result)
+
+    name_blob = b"".join(names)
+    seq_blob = b"".join(tag_seqs)
+    posting_ids = [p for plist in postings for p in plist]
+    tag_table = b"".join(
+        bytes([len(raw)]) + raw for raw in (tag.encode("utf-8") for tag in tag_ids)
+    )
+
+    sections = [
+        _HEADER.pack(MAGIC, VERSION, len(tag_ids), len(names), len(name_blob),
+                     len(seq_blob), len(posting_ids), len(tag_table)),
+        struct.pack(f"<{len(masks)}Q", *masks),
+        offsets(names),
+        offsets(tag_seqs),
+        offsets(postings),
+        struct.pack(f"<{len(posting_ids)}I", *posting_ids),
+        name_blob,
+        seq_blob,
+        tag_table,
+    ]
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for section in sections:
+            f.write(_pad(section))
+    os.replace(tmp_path, out_path)  # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록
+    return len(names)
+
+
+def compile_menu_json(filename="menus.json", out_path=None):
+    """menus.json을 스트리밍으로 읽어 바이너리 파일로 컴파일합니다."""
+    return compile_menu_db(iter_menu_json(filename), out_path or compiled_path(filename))
+
+
+# ============================================================================
+# 스트리밍 JSON 로드
+# ============================================================================
+
+def iter_menu_json(filename, chunk_size=STREAM_CHUNK_SIZE, on_chunk=None):
+    """
+    메뉴 배열 JSON을 조금씩 읽으며 메뉴 dict를 하나씩 내보냅니다.
+
+    Args:
+        filename: '[{...}, {...}, ...]' 형태의 JSON 파일
+        chunk_size: 한 번에 읽을 바이트 수
+        on_chunk: 청크를 읽을 때마다 on_chunk(읽은 바이트, 전체 바이트) 호출
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    total_bytes = os.path.getsize(filename)
+    read_bytes = 0
+    buf, pos = "", 0
+    started = eof = False
+
+    with open(filename, "rb") as f:
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+
+            if pos < len(buf):
+                if not started:
+                    if buf[pos] != "[":
+                        raise ValueError(f"메뉴 배열이 아닙니다: {filename}")
+                    started = True
+                    pos += 1
+                    continue
+                if buf[pos] == "]":
+                    return
+                try:
+                    menu, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    # 레코드가 청크 경계에서 잘림 → 더 읽음
+                    if eof or len(buf) - pos > STREAM_MAX_RECORD_CHARS:
+                        raise
+                else:
+                    pos = end
+                    yield menu
+                    continue
+            elif eof:
+                raise ValueError(f"메뉴 배열이 닫히지 않았습니다: {filename}")
+
+            chunk = f.read(chunk_size)
+            read_bytes += len(chunk)
+            eof = not chunk
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+            if on_chunk is not None:
+                on_chunk(read_bytes, total_bytes)
+
+
+def load_menu_index_streaming(filename, progress=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    메뉴 JSON을 스트리밍으로 읽어 곧바로 MenuIndex에 넣습니다.
+    이름 기준 중복 제거(먼저 나온 항목 유지)는 이름 집합으로 즉석에서 처리합니다.
+    (집합은 인덱스가 이미 들고 있는 이름 문자열을 가리키기만 하므로 추가 메모리는 참조뿐)
+
+    Args:
+        progress: 청크마다 progress(읽은 바이트, 전체 바이트, 로드된 메뉴 수) 호출
+    """
+    index = MenuIndex([])
+    seen_names = set()
+
+    on_chunk = None
+    if progress is not None:
+        def on_chunk(read_bytes, total_bytes):
+            progress(read_bytes, total_bytes, len(index))
+
+    for menu in iter_menu_json(filename, chunk_size=chunk_size, on_chunk=on_chunk):
+        if menu["name"] in seen_names:
+            continue
+        seen_names.add(menu["name"])
+        index.add(menu)
+
+    if progress is not None:
+        size = os.path.getsize(filename)
+        progress(size, size, len(index))
+    return index
+
+
+# ============================================================================
+# 메모리 매핑 로드
+# ============================================================================
+
+class _MappedMenus:
+    """mmap 위의 메뉴 목록. 조회할 때마다 {"name", "tags"} dict를 만듭니다."""
+
+    def __init__(self, buf, name_offsets, names_start, seq_offsets, seq_start, tags):
+        self._buf = buf
+        self._name_offsets = name_offsets
+        self._names_start = names_start
+        self._seq_offsets = seq_offsets
+        self._seq_start = seq_start
+        self._tags = tags
+
+    def __len__(self):
+        return len(self._name_offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        name = bytes(self._buf[self._names_start + self._name_offsets[i]:
+                               self._names_start + self._name_offsets[i + 1]])
+        seq = self._buf[self._seq_start + self._seq_offsets[i]:
+                        self._seq_start + self._seq_offsets[i + 1]]
+        return {"name": name.decode("utf-8"), "tags": [self._tags[t] for t in seq]}
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def open_compiled_menu_db(path):
+    """
+    컴파일된 메뉴 DB를 읽기 전용 mmap으로 열어 MenuIndex를 반환합니다.
+    비트마스크와 posting list는 파일 위의 memoryview를 그대로 씁니다. (복사 없음)
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = memoryview(mm)
+
+    (magic, version, tag_count, menu_count, names_len, seq_len,
+     posting_count, tag_table_len) = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"지원하지 않는 메뉴 DB 파일: {path}")
+
+    pos = 0
+
+    def section(nbytes):
+        nonlocal pos
+        start = pos
+        pos += nbytes + (-nbytes % 8)
+        return start
+
+    section(_HEADER.size)
+    masks = buf[section(8 * menu_count):][:8 * menu_count].cast("Q")
+    name_offsets = buf[section(4 * (menu_count + 1)):][:4 * (menu_count + 1)].cast("I")
+    seq_offsets = buf[section(4 * (menu_count + 1)):][:4 * (menu_count + 1)].cast("I")
+    posting_offsets = buf[section(4 * (tag_count + 1)):][:4 * (tag_count + 1)].cast("I")
+    posting_ids = buf[section(4 * posting_count):][:4 * posting_count].cast("I")
+    names_start = section(names_len)
+    seq_start = section(seq_len)
+    tag_table_start = section(tag_table_len)
+
+    tags = []
+    cursor = tag_table_start
+    for _ in range(tag_count):
+        length = buf[cursor]
+        tags.append(bytes(buf[cursor + 1:cursor + 1 + length]).decode("utf-8"))
+        cursor += 1 + length
+
+    tag_bits = {tag: 1 << i for i, tag in enumerate(tags)}
+    postings = {
+        tag: posting_ids[posting_offsets[i]:posting_offsets[i + 1]]
+        for i, tag in enumerate(tags)
+    }
+    menus = _MappedMenus(buf, name_offsets, names_start, seq_offsets, seq_start, tags)
+
+    index = MenuIndex.from_parts(menus, masks, tag_bits, postings)
+    index.source_mmap = mm  # 인덱스가 살아 있는 동안 매핑 유지
+    return index
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "menus.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else compiled_path(src)
+    count = compile_menu_json(src, dst)
+    print(f"📦 '{src}' → '{dst}' 컴파일 완료 ({count}개 메뉴)")
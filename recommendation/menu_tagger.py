@@ -0,0 +1,306 @@
+"""
+신규 메뉴 자동 태깅 (일괄 처리 + 체크포인트 재개)
+
+업체에서 받은 메뉴에는 추천 계산에 필요한 tags가 없으므로, 메뉴 이름 여러 개를 한 요청에
+묶어 Claude(call_claude)에게 태그를 붙이게 합니다. 태그 어휘는 FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT의
+'# Allowed Tags' 구역을 그대로 쓰고, 응답은 허용 태그로 걸러 냅니다.
+
+- 요청 여러 개를 동시에 보내고, 태그를 얻지 못한 메뉴는 다음 묶음에 다시 넣어 재시도
+- 끝난 메뉴는 체크포인트(JSONL)에 바로 추가하므로, 중단 후 같은 명령으로 이어서 실행
+- call 인자로 call_claude 대신 대역 함수(benchmarks/stubs.py)를 넣어 API 없이 실행 가능
+
+사용법:
+    python menu_tagger.py vendor_menus.json menus_tagged.json
+    python menu_tagger.py vendor_menus.json menus_tagged.json --stub 0.2   # 대역 모델
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from claude_api import call_claude, ALLOWED_TAGS, FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT
+from menu_store import iter_menu_json
+from tracing import traced
+
+
+# ============================================================================
+# 설정
+# ============================================================================
+
+TAGGER_BATCH_SIZE = 50          # 요청 하나에 담을 메뉴 수
+TAGGER_CONCURRENCY = 8          # 동시에 보낼 요청 수
+TAGGER_MAX_ATTEMPTS = 3         # 메뉴당 최대 시도 횟수 (넘으면 실패로 기록)
+TAGGER_TOKENS_PER_MENU = 40     # 응답 토큰 한도 = 메뉴 수 × 이 값 + TAGGER_TOKENS_BASE
+TAGGER_TOKENS_BASE = 50
+
+
+def _allowed_tags_section(system_prompt):
+    """분류기 프롬프트의 '# Allowed Tags' 구역 (태그 어휘를 한 곳에서만 관리)"""
+    return "# Allowed Tags" + system_prompt.split("# Allowed Tags", 1)[1].split("\n#", 1)[0]
+
+
+MENU_TAGGER_SYSTEM_PROMPT = f"""
+# Role
+너는 음식점 메뉴 이름을 보고 '음식 태그'를 붙이는 AI 분류기다.
+
+{_allowed_tags_section(FOOD_TAG_CLASSIFIER_SYSTEM_PROMPT).strip()}
+
+# Instructions
+1. 입력은 '번호. 메뉴 이름' 형식의 줄 목록이다.
+2. 메뉴마다 허용된 태그 중 해당하는 것을 2~5개 고른다.
+3. 상충되는 태그(HOT_SERVE와 COLD_SERVE, LIGHT와 HEAVY)는 함께 쓰지 않는다.
+4. 출력은 오직 JSON 객체로만 답한다. 키는 입력 번호(문자열), 값은 태그 목록이다.
+
+# Output Example
+{{"1": ["SOUP", "SPICY", "HOT_SERVE", "RICE"], "2": ["NOODLES", "COLD_SERVE", "LIGHT"]}}
+"""
+
+
+# ============================================================================
+# 요청/응답
+# ============================================================================
+
+def build_prompt(names):
+    """메뉴 이름 목록 → '번호. 이름' 줄 목록 (번호는 1부터)"""
+    return "\n".join(f"{i}. {name}" for i, name in enumerate(names, 1))
+
+
+def validate_menu_tags(tags):
+    """태그 목록을 허용 태그만, 중복 없이, 원래 순서대로 정리합니다. (목록이 아니면 [])"""
+    if not isinstance(tags, list):
+        return []
+    return [tag for tag in dict.fromkeys(t for t in tags if isinstance(t, str)) if tag in ALLOWED_TAGS]
+
+
+def parse_tag_response(response, names):
+    """
+    응답 텍스트에서 JSON 객체를 찾아 {메뉴 이름: 태그 목록}으로 바꿉니다.
+    코드 블록 등으로 감싸져 있어도 첫 '{'부터 읽으며, 허용 태그가 하나도 없는 메뉴는 뺍니다.
+
+    Raises:
+        ValueError: JSON 객체가 없는 응답
+    """
+    start = response.find("{")
+    if start < 0:
+        raise ValueError(f"JSON 객체가 없는 응답: {response[:100]!r}")
+    try:
+        data, _ = json.JSONDecoder().raw_decode(response, start)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON 파싱 실패 ({e})")
+    if not isinstance(data, dict):
+        raise ValueError(f"JSON 객체가 아닌 응답: {response[:100]!r}")
+
+    tagged = {}
+    for number, name in enumerate(names, 1):
+        tags = validate_menu_tags(data.get(str(number)))
+        if tags:
+            tagged[name] = tags
+    return tagged
+
+
+@traced("tagger.batch")
+def tag_batch(names, call=call_claude, api_key=None):
+    """
+    메뉴 이름 묶음을 요청 하나로 태깅합니다.
+
+    Returns:
+        ({메뉴 이름: 태그 목록}, 에러 메시지 또는 None)
+        요청/파싱 실패도 예외 대신 에러 메시지로 돌려줍니다. (묶음 전체 재시도용)
+    """
+    try:
+        response = call(
+            prompt=build_prompt(names),
+            system_prompt=MENU_TAGGER_SYSTEM_PROMPT,
+            max_tokens=TAGGER_TOKENS_BASE + TAGGER_TOKENS_PER_MENU * len(names),
+            api_key=api_key
+        )
+        return parse_tag_response(response, names), None
+    except Exception as e:
+        return {}, f"{type(e).__name__}: {e}"
+
+
+# ============================================================================
+# 체크포인트
+# ============================================================================
+
+def load_checkpoint(path):
+    """체크포인트(JSONL)에서 {메뉴 이름: 태그 목록}을 읽습니다. 중단으로 잘린 줄(글자 중간 포함)은 무시"""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            if not isinstance(record, dict):
+                continue
+            tags = validate_menu_tags(record.get("tags"))
+            if tags and record.get("name"):
+                done[record["name"]] = tags
+    return done
+
+
+def truncate_torn_tail(path, chunk_size=1 << 16):
+    """
+    마지막 줄이 줄바꿈으로 끝나지 않으면(기록 중 중단) 마지막 완전한 줄까지 잘라냅니다.
+    이어 쓰는 줄이 잘린 줄에 붙지 않도록 추가 전에 호출합니다.
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    keep = 0
+    with open(path, "rb") as f:
+        end = size
+        while end > 0:
+            start = max(0, end - chunk_size)
+            f.seek(start)
+            chunk = f.read(end - start)
+            if end == size and chunk.endswith(b"\n"):
+                return
+            pos = chunk.rfind(b"\n")
+            if pos >= 0:
+                keep = start + pos + 1
+                break
+            end = start
+    os.truncate(path, keep)
+
+
+# ============================================================================
+# 일괄 태깅
+# ============================================================================
+
+def tag_menus(names, checkpoint_path=None, call=call_claude, api_key=None,
+              batch_size=TAGGER_BATCH_SIZE, concurrency=TAGGER_CONCURRENCY,
+              max_attempts=TAGGER_MAX_ATTEMPTS, progress=None):
+    """
+    메뉴 이름들에 태그를 붙입니다.
+
+    체크포인트가 있으면 이미 태깅된 메뉴는 건너뛰고, 새로 태깅한 메뉴는 묶음이 끝날 때마다
+    체크포인트에 추가합니다. 태그를 얻지 못한 메뉴는 다음 묶음에 다시 넣어 max_attempts번까지 시도합니다.
+
+    Args:
+        call: call_claude와 같은 시그니처의 함수 (대역 모델로 교체 가능)
+        progress: 묶음이 끝날 때마다 progress(완료 수, 전체 수, 실패 수) 호출
+
+    Returns:
+        {"tags": {메뉴 이름: 태그 목록}, "failed": {메뉴 이름: 마지막 사유}}
+    """
+    names = list(dict.fromkeys(names))
+    if checkpoint_path:
+        truncate_torn_tail(checkpoint_path)
+    done = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    tagged = {name: done[name] for name in names if name in done}
+    failed = {}
+    queue = deque((name, 0) for name in names if name not in tagged)  # (이름, 지금까지 시도 횟수)
+
+    checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="tagger") as executor:
+            running = {}
+            while queue or running:
+                while queue and len(running) < concurrency:
+                    batch = [queue.popleft() for _ in range(min(batch_size, len(queue)))]
+                    future = executor.submit(tag_batch, [name for name, _ in batch], call, api_key)
+                    running[future] = batch
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batch = running.pop(future)
+                    result, error = future.result()
+                    for name, attempts in batch:
+                        tags = result.get(name)
+                        if tags:
+                            tagged[name] = tags
+                            if checkpoint is not None:
+                                checkpoint.write(
+                                    json.dumps({"name": name, "tags": tags}, ensure_ascii=False) + "\n"
+                                )
+                        elif attempts + 1 < max_attempts:
+                            queue.append((name, attempts + 1))
+                        else:
+                            failed[name] = error or "허용 태그가 없는 응답"
+                    if checkpoint is not None:
+                        checkpoint.flush()
+                    if progress is not None:
+                        progress(len(tagged), len(names), len(failed))
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    return {"tags": tagged, "failed": failed}
+
+
+def read_vendor_menus(filename):
+    """업체 메뉴 파일 읽기: JSON 배열({"name", ...}) 또는 한 줄에 이름 하나인 텍스트"""
+    if filename.endswith(".json"):
+        return list(iter_menu_json(filename))
+    with open(filename, "r", encoding="utf-8") as f:
+        return [{"name": line.strip()} for line in f if line.strip()]
+
+
+def tag_menu_file(src, dst, checkpoint_path=None, **options):
+    """
+    업체 메뉴 파일을 태깅해 menus.json 형식으로 저장합니다.
+    이미 tags가 있는 메뉴는 그대로 두고, 태깅에 실패한 메뉴는 결과에서 빠집니다. (다시 실행하면 재시도)
+
+    Args:
+        checkpoint_path: 기본은 '{dst}.ckpt.jsonl'
+        options: tag_menus()로 넘길 인자 (call, api_key, batch_size, concurrency, ...)
+
+    Returns:
+        {"menus": 저장한 메뉴 수, "tagged": 태그를 붙인 수 (체크포인트 포함), "failed": {이름: 사유}}
+    """
+    menus = read_vendor_menus(src)
+    pending = [menu["name"] for menu in menus if not menu.get("tags")]
+    result = tag_menus(pending, checkpoint_path or f"{dst}.ckpt.jsonl", **options)
+
+    count = 0
+    tmp_path = dst + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for menu in menus:
+            tags = menu.get("tags") or result["tags"].get(menu["name"])
+            if not tags:
+                continue
+            f.write(",\n" if count else "")
+            f.write("    " + json.dumps(dict(menu, tags=tags), ensure_ascii=False))
+            count += 1
+        f.write("\n]\n")
+    os.replace(tmp_path, dst)  # 읽는 쪽(MenuReloader 등)이 반쯤 쓴 파일을 보지 않도록
+
+    return {"menus": count, "tagged": len(result["tags"]), "failed": result["failed"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="신규 메뉴 자동 태깅")
+    parser.add_argument("src", help="업체 메뉴 파일 (.json 또는 한 줄에 이름 하나인 텍스트)")
+    parser.add_argument("dst", help="저장할 menus.json 형식 파일")
+    parser.add_argument("--checkpoint", default=None, help="체크포인트 경로 (기본: {dst}.ckpt.jsonl)")
+    parser.add_argument("--batch-size", type=int, default=TAGGER_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=TAGGER_CONCURRENCY)
+    parser.add_argument("--stub", type=float, default=None, metavar="LATENCY",
+                        help="Claude 대신 대역 모델 사용 (응답 지연 초)")
+    args = parser.parse_args()
+
+    API_KEY = ""
+    call = call_claude
+    if args.stub is not None:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+        from stubs import stub_call_claude_tagger
+        call = stub_call_claude_tagger(args.stub)
+
+    def print_progress(done, total, failed):
+        print(f"\r   🏷️ 태깅 중... {done}/{total} (실패 {failed})", end="", flush=True)
+
+    summary = tag_menu_file(
+        args.src, args.dst, args.checkpoint, call=call, api_key=API_KEY,
+        batch_size=args.batch_size, concurrency=args.concurrency, progress=print_progress
+    )
+    print(f"\n💾 '{args.dst}' 저장: {summary['menus']}개 메뉴 (태깅 {summary['tagged']}개)")
+    for name, reason in summary["failed"].items():
+        print(f"   ⚠️ 실패: {name} ({reason})")
@@ -0,0 +1,138 @@
+"""
+추천 파이프라인 동시 실행 도구
+
+날씨 조회와 의도 분석(Claude)은 서로 의존하지 않으므로 공용 스레드 풀에서 동시에 시작하고,
+추천 계산 직전에만 기다립니다. 전체 대기 시간이 두 호출의 합이 아니라 더 긴 쪽에 가까워집니다.
+
+사용 예:
+    futures = {
+        "weather": submit(get_weather_info, LAT, LON),
+        "intent": submit(get_intent_tags, user_input, api_key),
+    }
+    results = join(futures, on_done=lambda name, result: print(f"{name} 완료"))
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+PIPELINE_MAX_WORKERS = 8   # 날씨/의도 분석 등 I/O 작업용 스레드 수
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """프로세스 공용 스레드 풀 (처음 호출 시 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PIPELINE_MAX_WORKERS, thread_name_prefix="pipeline"
+            )
+        return _executor
+
+
+def submit(fn, *args, **kwargs):
+    """
+    fn을 공용 스레드 풀에서 실행하고 Future를 반환합니다.
+    호출한 쪽의 contextvars를 복사해 넘기므로 단계별 시간 기록(tracing)이 같은 요청에 묶입니다.
+    """
+    return submit_to(get_executor(), fn, *args, **kwargs)
+
+
+def submit_to(executor, fn, *args, **kwargs):
+    """
+    submit과 같지만 지정한 스레드 풀에서 실행합니다.
+    공용 풀에서 도는 작업이 다시 작업을 나눠 기다릴 때는 별도 풀을 써야 합니다.
+    (같은 풀에서 서로 기다리면 스레드가 모자라 막힐 수 있음)
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, fn, *args, **kwargs)
+
+
+def join(futures, on_done=None):
+    """
+    {이름: Future}를 모두 기다려 {이름: 결과}를 반환합니다.
+    실패한 작업의 결과는 예외 객체입니다. (다른 작업은 계속 기다림)
+
+    Args:
+        on_done: 끝나는 순서대로 on_done(이름, 결과)를 호출 (부분 진행 표시용,
+                 join을 호출한 스레드에서 실행되므로 Streamlit 호출도 가능)
+    """
+    names = {future: name for name, future in futures.items()}
+    results = {}
+    for future in as_completed(names):
+        name = names[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = e
+        if on_done is not None:
+            on_done(name, results[name])
+    return results
+
+
+# ============================================================================
+# 동일 요청 합치기 (singleflight)
+# ============================================================================
+
+# 합쳐진 실제 호출은 별도 풀에서 실행 (호출한 쪽이 공용 풀 스레드여도 서로 기다리다 막히지 않도록)
+_flight_executor = None
+
+
+def _get_flight_executor():
+    global _flight_executor
+    with _executor_lock:
+        if _flight_executor is None:
+            _flight_executor = ThreadPoolExecutor(
+                max_workers=PIPELINE_MAX_WORKERS, thread_name_prefix="singleflight"
+            )
+        return _flight_executor
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 실제 호출 한 번으로 합칩니다.
+
+    먼저 온 호출이 실행을 시작하고, 끝나기 전에 같은 키로 들어온 호출은 그 결과(또는 예외)를
+    함께 받습니다. 끝난 뒤에 들어온 호출은 새로 실행합니다. (결과를 저장하지는 않음)
+
+    각 호출자는 자기 timeout만큼만 기다리며(concurrent.futures.TimeoutError),
+    한 호출자가 포기해도 실제 호출은 계속되어 나머지 호출자에게 결과를 돌려줍니다.
+    """
+
+    def __init__(self, name="singleflight"):
+        self.name = name
+        self.calls = 0    # 실제로 실행한 횟수
+        self.shared = 0   # 진행 중인 호출에 합쳐진 횟수
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, timeout=None, **kwargs):
+        """key가 같은 진행 중 호출이 있으면 그 결과를, 없으면 fn(*args, **kwargs)를 실행해 반환합니다."""
+        started = False
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                context = contextvars.copy_context()
+                future = _get_flight_executor().submit(context.run, fn, *args, **kwargs)
+                self._inflight[key] = future
+                self.calls += 1
+                started = True
+            else:
+                self.shared += 1
+        if started:
+            # 이미 끝난 Future면 콜백이 이 스레드에서 바로 실행되므로 락 밖에서 등록
+            future.add_done_callback(lambda f, key=key: self._forget(key, f))
+        return future.result(timeout=timeout)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "shared": self.shared, "inflight": len(self._inflight)}
@@ -0,0 +1,300 @@
+"""
+추천 메뉴 → 근처 식당 연결
+
+식당 데이터(이름, 좌표, 파는 메뉴, 영업시간)를 로드 시점에 '메뉴 이름 → 격자 칸 → 식당 번호'
+색인으로 만들어 둡니다. 조회는 현재 위치의 칸부터 고리 모양으로 넓혀 가며 그 메뉴를 파는
+식당만 거리를 계산하고, 가까운 식당을 충분히 찾으면 바깥 칸은 보지 않으므로
+식당이 수만 개여도 메뉴당 1ms 안에 끝납니다.
+
+restaurants.json 형식:
+    [
+        {"name": "홍대 찌개집", "lat": 37.5563, "lon": 126.9220,
+         "menus": ["김치찌개", "된장찌개"],
+         "hours": [["11:00", "15:00"], ["17:00", "02:00"]],   # 없으면 항상 영업, 자정 넘김 가능
+         "closed_days": [0]},                                   # 휴무 요일 (월=0 ... 일=6)
+        ...
+    ]
+
+사용 예:
+    index = get_restaurant_index("restaurants.json")
+    nearby = index.resolve([r["name"] for r in results], LAT, LON)   # {메뉴: [식당, ...]}
+"""
+
+import heapq
+import math
+import os
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from menu_store import iter_menu_json
+from trend_boost import normalize_text
+
+
+RESTAURANT_FILE = "restaurants.json"
+RESTAURANT_SEARCH_RADIUS = 1000    # m, 이 거리 안의 식당만
+RESTAURANT_GRID_CELL = 100         # m, 격자 한 칸 크기
+RESTAURANT_RESULT_LIMIT = 3        # 메뉴당 돌려줄 식당 수
+
+METERS_PER_DEGREE_LAT = 111320.0
+
+# 영업시간의 기준 시간대 (서버가 UTC 등 다른 시간대에서 돌아도 서울 시각으로 판단)
+try:
+    RESTAURANT_TIMEZONE = ZoneInfo("Asia/Seoul")
+except ZoneInfoNotFoundError:  # tzdata가 없는 환경 (한국은 일광 절약 시간 없음)
+    RESTAURANT_TIMEZONE = timezone(timedelta(hours=9), "KST")
+
+
+def local_now():
+    """영업시간 기준 현재 시각 (RESTAURANT_TIMEZONE, tzinfo 없는 값)"""
+    return datetime.now(RESTAURANT_TIMEZONE).replace(tzinfo=None)
+
+
+def parse_hours(hours):
+    """[["11:00", "22:00"], ...] → [(시작 분, 끝 분), ...]. 없으면 None (항상 영업)"""
+    if not hours:
+        return None
+    result = []
+    for start, end in hours:
+        h1, m1 = map(int, start.split(":"))
+        h2, m2 = map(int, end.split(":"))
+        result.append((h1 * 60 + m1, h2 * 60 + m2))
+    return result
+
+
+def is_open_at(hours, minute, weekday=None, closed_days=()):
+    """
+    영업시간 목록에서 하루 중 minute분에 영업 중인지 (끝 시각이 시작보다 이르면 자정 넘김)
+
+    weekday(월=0 ... 일=6)를 주면 휴무 요일도 확인합니다. 자정을 넘긴 뒤의 시간은
+    전날 시작한 영업이므로 전날 요일로 판단합니다. (월요일 휴무인 17:00~02:00 가게는
+    월요일 01:00에 영업 중, 화요일 01:00에는 영업 안 함)
+    """
+    today_open = weekday is None or weekday not in closed_days
+    if hours is None:
+        return today_open
+    yesterday_open = weekday is None or (weekday - 1) % 7 not in closed_days
+    for start, end in hours:
+        if start < end:
+            if today_open and start <= minute < end:
+                return True
+        elif (today_open and minute >= start) or (yesterday_open and minute < end):
+            return True
+    return False
+
+
+def _ring_cells(cy, cx, ring):
+    """(cy, cx)에서 체비셰프 거리가 정확히 ring인 칸들"""
+    if ring == 0:
+        yield cy, cx
+        return
+    for x in range(cx - ring, cx + ring + 1):
+        yield cy - ring, x
+        yield cy + ring, x
+    for y in range(cy - ring + 1, cy + ring):
+        yield y, cx - ring
+        yield y, cx + ring
+
+
+# ============================================================================
+# 공간 색인
+# ============================================================================
+
+class RestaurantIndex:
+    """
+    메뉴 이름 → 격자 칸 → 식당 번호 색인
+
+    좌표는 데이터 중심 위도 기준의 등거리 투영으로 RESTAURANT_GRID_CELL 크기 칸에 나누고,
+    거리도 투영 좌표의 직선 거리로 계산합니다. (홍대 주변처럼 수 km 범위에서는 구면 거리와의
+    차이가 0.1% 미만)
+    영업 여부는 식당마다가 아니라 서로 다른 (영업시간, 휴무 요일) 조합마다 조회 시각 기준으로
+    한 번 계산해, 식당별 확인은 목록 조회 한 번입니다.
+
+    Args:
+        restaurants: [{"name", "lat", "lon", "menus", "hours"?, "closed_days"?}, ...]
+        cell_size: 격자 한 칸 크기(m)
+    """
+
+    def __init__(self, restaurants, cell_size=RESTAURANT_GRID_CELL):
+        self.restaurants = []
+        self.lats = array("d")
+        self.lons = array("d")
+        self._xs = array("d")     # 투영 좌표(m), 거리 계산용
+        self._ys = array("d")
+        self.cell_size = cell_size
+        self._schedules = []      # 서로 다른 (영업시간, 휴무 요일) 조합
+        self._schedule_ids = {}   # 조합 → 번호
+        self._schedule_of = array("I")   # 식당별 조합 번호
+        self._open_cache = (None, None)  # ((요일, 분), 조합별 영업 여부) - 같은 분의 조회끼리 공유
+        self._menu_cells = {}     # 정규화한 메뉴 이름 → {(칸 y, 칸 x): [식당 번호, ...]}
+
+        restaurants = list(restaurants)
+        ref_lat = sum(r["lat"] for r in restaurants) / len(restaurants) if restaurants else 37.5
+        self._meters_per_lat = METERS_PER_DEGREE_LAT
+        self._meters_per_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(ref_lat))
+
+        for restaurant in restaurants:
+            self.add(restaurant)
+
+    def __len__(self):
+        return len(self.restaurants)
+
+    def _project(self, lat, lon):
+        """위경도 → 투영 좌표 (x, y) m"""
+        return lon * self._meters_per_lon, lat * self._meters_per_lat
+
+    def _cell(self, x, y):
+        return math.floor(y / self.cell_size), math.floor(x / self.cell_size)
+
+    def add(self, restaurant):
+        """식당 한 곳을 색인에 추가합니다."""
+        position = len(self.restaurants)
+        self.restaurants.append(restaurant)
+        self.lats.append(restaurant["lat"])
+        self.lons.append(restaurant["lon"])
+        x, y = self._project(restaurant["lat"], restaurant["lon"])
+        self._xs.append(x)
+        self._ys.append(y)
+        hours = parse_hours(restaurant.get("hours"))
+        schedule = (tuple(hours) if hours else None, frozenset(restaurant.get("closed_days") or ()))
+        schedule_id = self._schedule_ids.get(schedule)
+        if schedule_id is None:
+            schedule_id = self._schedule_ids[schedule] = len(self._schedules)
+            self._schedules.append(schedule)
+            self._open_cache = (None, None)
+        self._schedule_of.append(schedule_id)
+
+        cell = self._cell(x, y)
+        for menu in {normalize_text(name) for name in restaurant.get("menus", ())}:
+            self._menu_cells.setdefault(menu, {}).setdefault(cell, []).append(position)
+
+    def is_open(self, position, at):
+        """식당이 at(datetime) 시각에 영업 중인지"""
+        return self._open_schedules(at)[self._schedule_of[position]]
+
+    def _open_schedules(self, at):
+        """at 시각의 영업시간 조합별 영업 여부 (분 단위로 한 번만 계산)"""
+        if at.tzinfo is not None:
+            at = at.astimezone(RESTAURANT_TIMEZONE)
+        key = (at.weekday(), at.hour * 60 + at.minute)
+        cached_key, open_now = self._open_cache
+        if cached_key != key:
+            open_now = [
+                is_open_at(hours, key[1], key[0], closed_days)
+                for hours, closed_days in self._schedules
+            ]
+            self._open_cache = (key, open_now)
+        return open_now
+
+    def nearest(self, menu_name, lat, lon, radius=RESTAURANT_SEARCH_RADIUS,
+                limit=RESTAURANT_RESULT_LIMIT, at=None, open_only=True):
+        """
+        menu_name을 파는 식당 중 (lat, lon)에서 radius(m) 안에 있는 가까운 식당을 찾습니다.
+
+        Args:
+            at: 영업 여부를 확인할 시각 (기본: 서울 기준 지금, tzinfo가 있으면 서울 시각으로 변환)
+            open_only: False면 영업시간을 무시
+
+        Returns:
+            [{"name", "lat", "lon", "distance_m"}, ...] (가까운 순, 최대 limit개)
+        """
+        cells = self._menu_cells.get(normalize_text(menu_name))
+        if not cells or limit <= 0:
+            return []
+        open_now = None
+        if open_only:
+            open_now = self._open_schedules(at or local_now())
+            if not any(open_now):
+                return []
+            if all(open_now):
+                open_now = None
+
+        qx, qy = self._project(lat, lon)
+        cy, cx = self._cell(qx, qy)
+        reach = math.ceil(radius / self.cell_size)
+        best = []  # 가까운 limit개를 (-거리, -번호) 최대 힙으로 유지 (같은 거리면 번호 작은 쪽 우선)
+
+        xs, ys, hypot = self._xs, self._ys, math.hypot
+        schedule_of = self._schedule_of
+
+        def visit(ids):
+            for i in ids:
+                distance = hypot(xs[i] - qx, ys[i] - qy)
+                if distance > radius or (len(best) >= limit and distance > -best[0][0]):
+                    continue
+                if open_now is not None and not open_now[schedule_of[i]]:
+                    continue
+                heapq.heappush(best, (-distance, -i))
+                if len(best) > limit:
+                    heapq.heappop(best)
+
+        if len(cells) < (2 * reach + 1) ** 2:
+            # 이 메뉴를 파는 칸이 반경 칸 수보다 적으면 그 칸들만 훑음
+            for (y, x), ids in cells.items():
+                if abs(y - cy) <= reach and abs(x - cx) <= reach:
+                    visit(ids)
+        else:
+            # 가운데 칸부터 고리 모양으로 넓혀 가다가, 다음 고리가 더 가까울 수 없으면 멈춤
+            for ring in range(reach + 1):
+                for cell in _ring_cells(cy, cx, ring):
+                    ids = cells.get(cell)
+                    if ids:
+                        visit(ids)
+                if len(best) >= limit and -best[0][0] <= ring * self.cell_size:
+                    break
+
+        return [
+            {
+                "name": self.restaurants[i]["name"],
+                "lat": self.lats[i],
+                "lon": self.lons[i],
+                "distance_m": round(distance),
+            }
+            for distance, i in sorted((-neg_distance, -neg_i) for neg_distance, neg_i in best)
+        ]
+
+    def resolve(self, menu_names, lat, lon, radius=RESTAURANT_SEARCH_RADIUS,
+                limit=RESTAURANT_RESULT_LIMIT, at=None, open_only=True):
+        """추천 메뉴 이름들 → {메뉴 이름: 가까운 영업 중 식당 목록} (영업 여부는 같은 시각 기준)"""
+        at = at or local_now()
+        return {
+            name: self.nearest(name, lat, lon, radius, limit, at, open_only)
+            for name in menu_names
+        }
+
+
+# ============================================================================
+# 로드
+# ============================================================================
+
+def load_restaurants(filename=RESTAURANT_FILE, cell_size=RESTAURANT_GRID_CELL):
+    """식당 JSON을 스트리밍으로 읽어 RestaurantIndex를 만듭니다. (좌표가 없는 항목은 건너뜀)"""
+    restaurants = (
+        r for r in iter_menu_json(filename)
+        if isinstance(r.get("lat"), (int, float)) and isinstance(r.get("lon"), (int, float))
+    )
+    return RestaurantIndex(restaurants, cell_size=cell_size)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_restaurant_index(filename=RESTAURANT_FILE):
+    """
+    파일별 공용 식당 색인 (처음 호출 시 로드, 파일이 바뀌면 다시 로드)
+    파일이 없거나 읽을 수 없으면 None (식당 연결 없이 메뉴만 추천)
+    """
+    try:
+        mtime = os.path.getmtime(filename)
+    except OSError:
+        return None
+    with _indexes_lock:
+        entry = _indexes.get(filename)
+        if entry is None or entry[0] != mtime:
+            try:
+                entry = _indexes[filename] = (mtime, load_restaurants(filename))
+            except Exception as e:
+                print(f"Error loading restaurants: {e}")
+                return entry[1] if entry else None
+        return entry[1]
@@ -0,0 +1,425 @@
+"""
+추천 HTTP 서비스 (헤드리스, asyncio)
+
+메뉴 DB·인덱스·날씨 캐시·API 클라이언트를 한 프로세스에 띄워 두고 다른 시스템이
+HTTP로 추천을 받아 갈 수 있게 합니다. 요청마다 menus.json을 다시 읽거나 클라이언트를
+새로 만들지 않습니다. 외부 의존성 없이 asyncio.start_server 위에서 HTTP/1.1(keep-alive)을 처리합니다.
+
+엔드포인트 (GET은 쿼리 문자열, POST는 JSON 본문):
+    /recommend  q=자연어 입력 또는 tags={태그: 숫자 점수}, lat, lon, top_k, radius,
+                weather=SUNNY|CLOUDY|RAINY|SNOWY, temp=HOT|COLD|NORMAL (주면 날씨 조회 생략),
+                slot=lunch|dinner|... (그 시간대 예보 날씨로 추천, 없으면 현재 날씨)
+                (restaurants.json이 있으면 결과마다 가까운 영업 중 식당 "restaurants" 포함)
+    /intent     q=자연어 입력 → {"tags": {...}, "fallback": Claude 호출 실패로 {}를 돌려줬는지}
+    /health     상태 확인
+    /metrics    단계별 지연 시간 통계 (tracing.export)
+
+사용법:
+    python server.py --port 8080 --menus menus.json
+    curl "localhost:8080/recommend?q=비오는데+따뜻한+국물&top_k=3"
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import intent_utils
+import main
+import weather_utils
+from intent_utils import get_intent_tags
+from menu_reload import MenuReloader
+from pipeline_utils import submit
+from restaurants import RESTAURANT_FILE, RESTAURANT_SEARCH_RADIUS, get_restaurant_index
+from Tavily_Search import get_tavily_client, trend_queries
+from tracing import tracer, span
+from trend_boost import get_trend_booster
+from weather_utils import WEATHER_TIME_SLOTS, get_weather_for_slot, get_weather_info
+
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+SERVER_MAX_BODY = 1 << 20          # 요청 본문 최대 바이트
+SERVER_MAX_HEADERS = 100
+SERVER_KEEPALIVE_TIMEOUT = 30      # 초, 다음 요청을 기다리는 시간
+SERVER_DEFAULT_TOP_K = 3
+SERVER_MAX_TOP_K = 100
+SERVER_WEATHER_TIMEOUT = 5         # 초, 넘으면 기본 날씨로 추천
+SERVER_INTENT_TIMEOUT = 20         # 초, 넘으면 취향 없음으로 추천
+SERVER_MAX_RADIUS = 5000           # m, 식당 검색 반경 상한
+
+# weather=/temp=로 직접 줄 수 있는 값 (상태마다 점수표가 메모리에 남으므로 임의 값은 거부)
+SERVER_WEATHER_STATES = ("SUNNY", "CLOUDY", "RAINY", "SNOWY")
+SERVER_TEMP_FLAGS = ("HOT", "COLD", "NORMAL")
+
+
+class BadRequest(Exception):
+    """클라이언트 요청 오류 (400)"""
+
+
+def _run_blocking(fn, *args, **kwargs):
+    """블로킹 I/O 함수를 공용 스레드 풀에서 실행하고 await할 수 있게 합니다. (tracing 컨텍스트 유지)"""
+    return asyncio.wrap_future(submit(fn, *args, **kwargs))
+
+
+# ============================================================================
+# 서비스 (프로세스 수명 동안 유지되는 상태)
+# ============================================================================
+
+class RecommendationService:
+    """
+    추천 요청 처리기. 메뉴 인덱스와 트렌드 가산점을 한 번 준비해 모든 요청이 공유합니다.
+    menus.json이 바뀌면 바뀐 메뉴만 반영한 새 버전으로 교체합니다. (진행 중인 요청은 이전 버전 사용)
+
+    Args:
+        menu_file: 메뉴 DB 경로 (컴파일된 .bin이 최신이면 mmap으로 로드)
+        api_key: Claude API 키 (비우면 ANTHROPIC_API_KEY 환경변수)
+        tavily_api_key: 있으면 트렌드 가산점 백그라운드 갱신 시작
+        restaurant_file: 식당 데이터 경로 (없으면 식당 연결 없이 메뉴만 추천)
+    """
+
+    def __init__(self, menu_file="menus.json", api_key=None, tavily_api_key=None, lat=main.LAT, lon=main.LON,
+                 restaurant_file=RESTAURANT_FILE):
+        self.api_key = api_key or main.MY_API_KEY
+        self.lat, self.lon = lat, lon
+        self.restaurant_file = restaurant_file
+        get_restaurant_index(restaurant_file)  # 첫 요청이 로드를 기다리지 않도록 미리 로드
+        menu_db = main.load_menu_db(menu_file)
+        self.trend_booster = get_trend_booster(
+            menu_db, get_tavily_client(tavily_api_key or ""), trend_queries
+        )
+        self.menu_reloader = MenuReloader(
+            menu_file, menu_db, on_swap=self.trend_booster.set_index
+        ).start()
+        if tavily_api_key:
+            self.trend_booster.start()
+
+    @property
+    def menu_db(self):
+        """현재 버전의 메뉴 인덱스 (요청마다 한 번만 읽어 끝까지 사용)"""
+        return self.menu_reloader.index
+
+    async def intent(self, user_input):
+        """
+        자연어 입력 → ({태그: 점수}, 성공 여부) (규칙 → 캐시 → Claude)
+        Claude 호출이 실패하거나 시간을 넘기면 main.py/app.py처럼 취향 없음({})으로 추천하고,
+        오류는 요청 기록(tracing)의 meta.intent_error에 남깁니다.
+        """
+        try:
+            tags = await _run_blocking(
+                get_intent_tags, user_input, self.api_key, timeout=SERVER_INTENT_TIMEOUT
+            )
+        except Exception as e:
+            tracer.annotate(intent_error=f"{type(e).__name__}: {e}")
+            return {}, False
+        return tags, True
+
+    async def weather(self, lat, lon, slot=None):
+        """현재 날씨, slot을 주면 그 시간대 예보 날씨 (위치별 예보는 한 번 받아 메모리에서 조회)"""
+        if slot:
+            weather_desc, temp_flag = await _run_blocking(
+                get_weather_for_slot, lat, lon, slot, timeout=SERVER_WEATHER_TIMEOUT
+            )
+        else:
+            weather_desc, temp_flag = await _run_blocking(
+                get_weather_info, lat, lon, timeout=SERVER_WEATHER_TIMEOUT
+            )
+        if not weather_desc:
+            return "SUNNY", "NORMAL", False
+        return weather_desc, temp_flag, True
+
+    async def recommend(self, params):
+        """
+        날씨 조회와 의도 분석을 동시에 진행한 뒤 추천을 계산합니다.
+        weather/temp를 주면 날씨 조회를, tags를 주면 의도 분석을 건너뜁니다.
+        """
+        top_k = _int_param(params, "top_k", SERVER_DEFAULT_TOP_K)
+        if not 1 <= top_k <= SERVER_MAX_TOP_K:
+            raise BadRequest(f"top_k는 1~{SERVER_MAX_TOP_K} 사이여야 합니다.")
+        lat = _float_param(params, "lat", self.lat)
+        lon = _float_param(params, "lon", self.lon)
+        radius = _float_param(params, "radius", RESTAURANT_SEARCH_RADIUS)
+        if not 0 < radius <= SERVER_MAX_RADIUS:
+            raise BadRequest(f"radius는 0 초과 {SERVER_MAX_RADIUS} 이하(m)여야 합니다.")
+        slot = _choice_param(params, "slot", ("now", *WEATHER_TIME_SLOTS))
+        weather_desc = _choice_param(params, "weather", SERVER_WEATHER_STATES)
+        temp_flag = _choice_param(params, "temp", SERVER_TEMP_FLAGS, default="NORMAL")
+
+        if params.get("tags") is not None:
+            intent = _completed((_tags_param(params["tags"]), True))
+        else:
+            intent = self.intent(_str_param(params, "q"))
+
+        if weather_desc:
+            weather = _completed((weather_desc, temp_flag, True))
+        else:
+            weather = self.weather(lat, lon, slot)
+
+        (weather_desc, temp_flag, weather_ok), (user_tags, intent_ok) = await asyncio.gather(weather, intent)
+
+        menu_db = self.menu_db
+        results = main.calculate_recommendations(
+            menu_db, weather_desc, temp_flag, user_tags,
+            top_k=top_k, boosts=self.trend_booster.boosts_for(menu_db)
+        )
+        items = [
+            {"name": r["name"], "score": r["score"], "reasons": r["reasons"], "tags": r["tags"]}
+            for r in results
+        ]
+
+        restaurant_index = get_restaurant_index(self.restaurant_file)
+        if restaurant_index is not None:
+            with span("restaurants"):
+                nearby = restaurant_index.resolve([item["name"] for item in items], lat, lon, radius)
+            for item in items:
+                item["restaurants"] = nearby[item["name"]]
+
+        return {
+            "weather": {"desc": weather_desc, "temp": temp_flag, "slot": slot or "now",
+                        "fallback": not weather_ok},
+            "user_tags": user_tags,
+            "intent_fallback": not intent_ok,
+            "results": items,
+        }
+
+    def health(self):
+        return {
+            "status": "ok",
+            "menus": len(self.menu_db),
+            "menu_version": self.menu_reloader.version,
+            "trend_boosts": len(self.trend_booster.boosts),
+            "restaurants": len(get_restaurant_index(self.restaurant_file) or ()),
+            "coalesced": {
+                "weather": weather_utils._weather_flight.stats(),
+                "forecast": weather_utils._forecast_flight.stats(),
+                "intent": intent_utils._intent_flight.stats(),
+            },
+        }
+
+
+async def _completed(value):
+    return value
+
+
+def _parse_json_param(value, name):
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        raise BadRequest(f"{name}이(가) 올바른 JSON이 아닙니다.")
+
+
+def _str_param(params, name, default=""):
+    value = params.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise BadRequest(f"{name}은(는) 문자열이어야 합니다.")
+    return value
+
+
+def _choice_param(params, name, choices, default=None):
+    """choices 중 하나인 문자열 (비어 있으면 default)"""
+    value = _str_param(params, name) or default
+    if value is not None and value not in choices:
+        raise BadRequest(f"{name}은(는) {', '.join(choices)} 중 하나여야 합니다.")
+    return value
+
+
+def _tags_param(value):
+    """{태그: 숫자 점수} 사전 (JSON 문자열도 허용). 점수가 숫자가 아니면 400"""
+    if isinstance(value, str):
+        value = _parse_json_param(value, "tags")
+    if not isinstance(value, dict) or not all(
+        isinstance(tag, str) and isinstance(score, (int, float)) and not isinstance(score, bool)
+        and math.isfinite(score)
+        for tag, score in value.items()
+    ):
+        raise BadRequest("tags는 {태그: 숫자 점수} 객체여야 합니다.")
+    return value
+
+
+def _int_param(params, name, default):
+    try:
+        return int(params.get(name, default))
+    except (TypeError, ValueError, OverflowError):  # OverflowError: JSON 본문의 1e400 등
+        raise BadRequest(f"{name}은(는) 정수여야 합니다.")
+
+
+def _float_param(params, name, default):
+    """유한한 실수 ("nan", "inf"는 float()가 받아 주므로 따로 거부)"""
+    try:
+        value = float(params.get(name, default))
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name}은(는) 숫자여야 합니다.")
+    if not math.isfinite(value):
+        raise BadRequest(f"{name}은(는) 유한한 숫자여야 합니다.")
+    return value
+
+
+# ============================================================================
+# HTTP 처리
+# ============================================================================
+
+async def _read_request(reader):
+    """
+    HTTP 요청 하나를 읽어 (메서드, 경로, 파라미터, keep-alive 여부)를 반환합니다.
+    연결이 닫혔으면 None
+    """
+    request_line = await asyncio.wait_for(reader.readline(), SERVER_KEEPALIVE_TIMEOUT)
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest("잘못된 요청 줄")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= SERVER_MAX_HEADERS:
+            raise BadRequest("헤더가 너무 많습니다.")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise BadRequest("잘못된 Content-Length")
+    if not 0 <= length <= SERVER_MAX_BODY:
+        raise BadRequest("요청 본문이 너무 큽니다.")
+    body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+    if body:
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            raise BadRequest("요청 본문이 UTF-8이 아닙니다.")
+        data = _parse_json_param(text, "요청 본문")
+        if not isinstance(data, dict):
+            raise BadRequest("요청 본문은 JSON 객체여야 합니다.")
+        params.update(data)
+
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, url.path, params, keep_alive
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+class RecommendationServer:
+    """RecommendationService를 HTTP로 노출하는 asyncio 서버"""
+
+    def __init__(self, service, host=SERVER_HOST, port=SERVER_PORT):
+        self.service = service
+        self.host = host
+        self.port = port
+        self._server = None
+        self.routes = {
+            "/recommend": self._recommend,
+            "/intent": self._intent,
+            "/health": self._health,
+            "/metrics": self._metrics,
+        }
+
+    async def _recommend(self, params):
+        return await self.service.recommend(params)
+
+    async def _intent(self, params):
+        tags, ok = await self.service.intent(_str_param(params, "q"))
+        return {"tags": tags, "fallback": not ok}
+
+    async def _health(self, params):
+        return self.service.health()
+
+    async def _metrics(self, params):
+        return tracer.export(_int_param(params, "n", 20))
+
+    async def _dispatch(self, method, path, params):
+        handler = self.routes.get(path)
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"없는 경로: {path}"}
+        if method not in ("GET", "POST"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"지원하지 않는 메서드: {method}"}
+
+        with tracer.request(f"http{path.replace('/', '.')}"):
+            try:
+                return HTTPStatus.OK, await handler(params)
+            except BadRequest as e:
+                return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            except TimeoutError:
+                return HTTPStatus.GATEWAY_TIMEOUT, {"error": "외부 API 응답 시간 초과"}
+            except Exception as e:
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as e:
+                    _write_response(writer, HTTPStatus.BAD_REQUEST, {"error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+
+                method, path, params, keep_alive = request
+                status, payload = await self._dispatch(method, path, params)
+                with span("http.write"):
+                    _write_response(writer, status, payload, keep_alive)
+                    await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # port=0이면 실제 포트
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추천 HTTP 서비스")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--menus", default="menus.json", help="메뉴 DB 경로")
+    parser.add_argument("--restaurants", default=RESTAURANT_FILE, help="식당 데이터 경로")
+    args = parser.parse_args()
+
+    service = RecommendationService(
+        args.menus, tavily_api_key=os.environ.get("TAVILY_API_KEY"), restaurant_file=args.restaurants
+    )
+    server = RecommendationServer(service, args.host, args.port)
+    print(f"🚀 추천 서비스 시작: http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,17 @@
+"""
+테스트 공용 설정
+
+추천 모듈은 recommendation/ 안에서 서로 평평하게 import하므로(예: from tracing import traced)
+recommendation/과 benchmarks/(대역 서버, 합성 데이터)를 import 경로에 넣습니다.
+
+실행:
+    cd recommendation && python -m pytest -q
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_DIR = os.path.dirname(TESTS_DIR)
+sys.path.insert(0, os.path.join(PACKAGE_DIR, "benchmarks"))
+sys.path.insert(0, PACKAGE_DIR)
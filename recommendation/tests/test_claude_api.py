@@ -0,0 +1,46 @@
+"""claude_api: 설치된 anthropic SDK로 대역 서버(Anthropic Messages API)에 실제 호출"""
+
+import json
+
+import pytest
+
+import claude_api
+from stubs import STUB_INTENT_RESPONSE, StubServer
+
+
+@pytest.fixture
+def stub_anthropic(monkeypatch):
+    """대역 서버를 띄우고, 새 클라이언트 관리자가 ANTHROPIC_BASE_URL로 그 서버를 보게 합니다."""
+    manager = claude_api.ClaudeClientManager()
+    monkeypatch.setattr(claude_api, "client_manager", manager)
+    with StubServer() as server:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", server.url)
+        yield server
+    manager.close_all()
+
+
+def test_call_claude_text(stub_anthropic):
+    assert claude_api.call_claude("국물 땡겨", api_key="stub") == STUB_INTENT_RESPONSE
+    assert stub_anthropic.requests == ["/v1/messages"]
+
+
+def test_call_claude_intent_stream(stub_anthropic):
+    tags = claude_api.call_claude_intent("국물 땡겨", api_key="stub")
+    assert tags == json.loads(STUB_INTENT_RESPONSE)
+
+
+def test_client_reused_across_calls(stub_anthropic):
+    first = claude_api.get_client("stub")
+    claude_api.call_claude("국물 땡겨", api_key="stub")
+    assert claude_api.get_client("stub") is first
+
+
+def test_client_settings_applied():
+    manager = claude_api.ClaudeClientManager(timeout=7.0, connect_timeout=2.0, max_retries=0)
+    client = manager.get("stub", base_url="http://127.0.0.1:9")
+    try:
+        assert client.max_retries == 0
+        assert client.timeout.read == 7.0
+        assert client.timeout.connect == 2.0
+    finally:
+        manager.close_all()
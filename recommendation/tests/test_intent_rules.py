@@ -0,0 +1,71 @@
+"""intent_rules.classify_local: 부정 표현, 군더더기, 키워드"""
+
+import pytest
+
+import intent_utils
+from intent_rules import LOCAL_INTENT_MIN_CONFIDENCE, classify_local
+from intent_utils import normalize_query
+
+
+def classify(text):
+    return classify_local(normalize_query(text))
+
+
+@pytest.mark.parametrize("text", [
+    "매운거 별로",
+    "국물 말고",
+    "맵지 않은",
+    "안 매운 거",
+    "국물 빼고 아무거나",
+    "튀김은 싫어",
+])
+def test_negation_defers_to_claude(text):
+    assert classify(text) == ({}, 0.0)
+
+
+@pytest.mark.parametrize("text, tags", [
+    ("살 안 찌는 거 먹고 싶어", {"LIGHT": 5}),
+    ("오늘 좀 매운 국물 먹고 싶어", {"SOUP": 5, "SPICY": 5}),
+    ("국물로 줘", {"SOUP": 5}),
+    ("해장하고 싶어", {"SOUP": 3, "SPICY": 3}),
+    ("냉면 땡겨", {"NOODLES": 5, "COLD_SERVE": 5}),
+    ("크림 파스타 추천해줘", {"NOODLES": 5, "CREAMY": 5}),
+])
+def test_keywords_with_fillers(text, tags):
+    assert classify(text) == (tags, 1.0)
+
+
+@pytest.mark.parametrize("text", ["아무거나", "상관없는 거", "뭐든 좋아"])
+def test_anything_means_no_preference(text):
+    tags, confidence = classify(text)
+    assert tags == {}
+    assert confidence > 0
+
+
+def test_intensifier_and_softener():
+    assert classify("엄청 매운 라면")[0] == {"SPICY": 5, "NOODLES": 5, "SOUP": 5}
+    assert classify("살짝 매콤한 거") == ({"SPICY": 2}, 1.0)
+
+
+def test_conflicting_tags_tie_defers():
+    assert classify("따뜻한 거 차가운 거") == ({}, 0.0)
+
+
+@pytest.mark.parametrize("text", ["로제 파스타", "한식", "인도 커리"])
+def test_single_syllable_fillers_do_not_eat_words(text):
+    # "로제"의 "로", "한식"의 "한", "인도"의 "인"은 군더더기가 아님 → 확신도가 낮아 Claude로
+    assert classify(text)[1] < LOCAL_INTENT_MIN_CONFIDENCE
+
+
+def test_negation_reaches_claude(monkeypatch, tmp_path):
+    calls = []
+
+    def call_claude_intent(prompt, api_key=None):
+        calls.append(prompt)
+        return {"LIGHT": 3}
+
+    monkeypatch.setattr(intent_utils, "call_claude_intent", call_claude_intent)
+    cache = intent_utils.IntentCache(path=str(tmp_path / "intent.sqlite3"))
+    tags = intent_utils.get_intent_tags("매운거 별로", "key", cache=cache, structured=True)
+    assert tags == {"LIGHT": 3}
+    assert calls == ["매운거 별로"]
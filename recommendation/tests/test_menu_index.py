@@ -0,0 +1,144 @@
+"""MenuIndex: 원래 점수 계산 루프(전 메뉴 × 태그)와 같은 순위/점수/점수 요인"""
+
+import json
+import os
+import random
+
+import pytest
+
+import main
+from conftest import PACKAGE_DIR
+from menu_index import MenuIndex
+
+WEATHER_TABLE = main.WEATHER_TO_FOOD_SCORE
+TAGS = ("SOUP", "HOT_SERVE", "COLD_SERVE", "SPICY", "LIGHT", "HEAVY", "RICE", "NOODLES", "FRIED",
+        "CREAMY", "DRY")
+
+
+def reference_recommendations(menu_list, weather_desc, temp_flag, user_tags, boosts=None):
+    """인덱스 도입 전 calculate_recommendations (가산점은 점수에 더하고 요인 끝에 붙임)"""
+    weather_pref = {}
+    if weather_desc in WEATHER_TABLE:
+        for tag, score in WEATHER_TABLE[weather_desc].items():
+            weather_pref[tag] = weather_pref.get(tag, 0) + score
+    if temp_flag in WEATHER_TABLE:
+        for tag, score in WEATHER_TABLE[temp_flag].items():
+            weather_pref[tag] = weather_pref.get(tag, 0) + score
+
+    scored_results = []
+    for i, menu in enumerate(menu_list):
+        total_score = 0
+        reasons = []
+        menu_tags = set(menu["tags"])
+        for tag, score in weather_pref.items():
+            if tag in menu_tags:
+                total_score += score
+                reasons.append(f"날씨({tag} +{score})")
+        for tag, score in user_tags.items():
+            if tag in menu_tags:
+                weighted_score = score * 2.0
+                total_score += weighted_score
+                reasons.append(f"취향({tag} +{weighted_score:.0f})")
+        boost = (boosts or {}).get(i, 0)
+        if boost > 0:
+            total_score += boost
+            reasons.append(f"트렌드(검색 +{boost:.1f})")
+        scored_results.append({
+            "name": menu["name"], "score": total_score, "reasons": reasons, "tags": menu["tags"]
+        })
+    return sorted(scored_results, key=lambda x: x["score"], reverse=True)
+
+
+def as_rows(results):
+    return [(r["name"], r["score"], type(r["score"]), list(r["reasons"]), r["tags"]) for r in results]
+
+
+def random_menus(rng, count):
+    return [{"name": f"메뉴{i}", "tags": rng.sample(TAGS, rng.randint(0, 5))} for i in range(count)]
+
+
+def random_user_tags(rng):
+    tags = rng.sample(TAGS + ("UNKNOWN",), rng.randint(0, 4))
+    return {tag: rng.choice((0, 1, 3, 5, 2.5)) for tag in tags}
+
+
+@pytest.fixture(scope="module")
+def real_menus():
+    with open(os.path.join(PACKAGE_DIR, "menus.json"), encoding="utf-8") as f:
+        menus = json.load(f)
+    return list({menu["name"]: menu for menu in reversed(menus)}.values())[::-1]
+
+
+@pytest.mark.parametrize("source", ["real", "random"])
+def test_matches_reference_loop(source, real_menus):
+    rng = random.Random(1)
+    menus = real_menus if source == "real" else random_menus(rng, 1000)
+    index = MenuIndex(menus)
+    index.precompute_weather(WEATHER_TABLE)
+    for round_ in range(100):
+        weather = rng.choice(("RAINY", "SNOWY", "SUNNY", "CLOUDY", "FOGGY"))
+        temp = rng.choice(("HOT", "COLD", "NORMAL"))
+        user_tags = random_user_tags(rng)
+        expected = as_rows(reference_recommendations(menus, weather, temp, user_tags))
+
+        assert as_rows(main.calculate_recommendations(index, weather, temp, user_tags)) == expected
+        if round_ < 10:  # 목록을 넘기면 매번 인덱스를 새로 만듦
+            assert as_rows(main.calculate_recommendations(menus, weather, temp, user_tags)) == expected
+        top_k = rng.randint(0, 12)
+        assert as_rows(index.score_for_weather(weather, temp, user_tags, top_k=top_k)) == expected[:top_k]
+
+
+def test_no_preference_ranking_is_ready_after_precompute():
+    menus = random_menus(random.Random(2), 500)
+    index = MenuIndex(menus)
+    index.precompute_weather(WEATHER_TABLE)
+    for state in index._weather_states.values():
+        assert state["ranking"] is not None
+    expected = as_rows(reference_recommendations(menus, "RAINY", "COLD", {}))
+    assert as_rows(index.score_for_weather("RAINY", "COLD", {}, top_k=5)) == expected[:5]
+    assert as_rows(index.score_for_weather("RAINY", "COLD", {})) == expected
+
+
+def test_boosts_match_reference():
+    rng = random.Random(3)
+    menus = random_menus(rng, 800)
+    index = MenuIndex(menus)
+    index.precompute_weather(WEATHER_TABLE)
+    for _ in range(50):
+        boosts = {rng.randrange(len(menus)): rng.choice((0, 0.5, 2.0, 7.5)) for _ in range(20)}
+        user_tags = random_user_tags(rng)
+        expected = as_rows(reference_recommendations(menus, "SUNNY", "HOT", user_tags, boosts))
+        for top_k in (3, None):
+            got = index.score_for_weather("SUNNY", "HOT", user_tags, top_k=top_k, boosts=boosts)
+            assert as_rows(got) == (expected[:top_k] if top_k else expected)
+
+
+def test_batch_matches_single():
+    rng = random.Random(4)
+    menus = random_menus(rng, 600)
+    index = MenuIndex(menus)
+    index.precompute_weather(WEATHER_TABLE)
+    users = [random_user_tags(rng) for _ in range(30)]
+    batch = index.score_batch_for_weather("CLOUDY", "NORMAL", users, top_k=3)
+    for user_tags, results in zip(users, batch):
+        assert as_rows(results) == as_rows(reference_recommendations(menus, "CLOUDY", "NORMAL", user_tags))[:3]
+
+
+def test_with_menus_matches_fresh_index():
+    rng = random.Random(5)
+    menus = random_menus(rng, 400)
+    index = MenuIndex(menus)
+    index.precompute_weather(WEATHER_TABLE)
+
+    changed = [dict(menu) for menu in menus[50:]]          # 앞 50개 삭제
+    changed[0]["tags"] = ["SOUP", "SPICY"]                  # 태그 변경
+    changed.append({"name": "새 메뉴", "tags": ["CREAMY", "NOODLES", "SPICY"]})  # 추가
+    new_index, changes = index.with_menus(changed)
+    assert changes["added"] == ["새 메뉴"]
+    assert changes["changed"] == [changed[0]["name"]]
+    assert len(changes["removed"]) == 50
+
+    for weather in ("RAINY", "SUNNY"):
+        for user_tags in ({}, {"SPICY": 5}):
+            expected = as_rows(reference_recommendations(changed, weather, "COLD", user_tags))
+            assert as_rows(new_index.score_for_weather(weather, "COLD", user_tags)) == expected
@@ -0,0 +1,74 @@
+"""menu_store: 스트리밍 JSON 로드(청크 경계), 중복 제거, 컴파일된 DB와의 일치"""
+
+import json
+import os
+
+import pytest
+
+import menu_store
+
+
+def write_menus(path, menus):
+    path.write_text(json.dumps(menus, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_streaming_dedup_keeps_first_by_full_name(tmp_path):
+    menus = [
+        {"name": "김치찌개", "tags": ["SOUP"]},
+        {"name": "김치찌개 ", "tags": ["SOUP", "SPICY"]},   # 이름이 다르면 다른 메뉴
+        {"name": "김치찌개", "tags": ["RICE"]},             # 중복 → 먼저 나온 항목 유지
+        {"name": "냉면", "tags": ["NOODLES", "COLD_SERVE"]},
+    ]
+    index = menu_store.load_menu_index_streaming(write_menus(tmp_path / "menus.json", menus), chunk_size=7)
+    assert [(m["name"], m["tags"]) for m in index.menus] == [
+        ("김치찌개", ["SOUP"]),
+        ("김치찌개 ", ["SOUP", "SPICY"]),
+        ("냉면", ["NOODLES", "COLD_SERVE"]),
+    ]
+
+
+def test_streaming_matches_compiled(tmp_path):
+    menus = [{"name": f"메뉴{i % 50}", "tags": ["SOUP"] if i % 3 else ["DRY", "SPICY"]} for i in range(120)]
+    path = write_menus(tmp_path / "menus.json", menus)
+    streamed = menu_store.load_menu_index_streaming(path, chunk_size=16)
+    count = menu_store.compile_menu_db(menus, str(tmp_path / "menus.bin"))
+    compiled = menu_store.open_compiled_menu_db(str(tmp_path / "menus.bin"))
+    assert len(streamed) == count == len(compiled) == 50
+    assert list(streamed.menus) == list(compiled.menus)
+
+
+# ============================================================================
+# iter_menu_json
+# ============================================================================
+
+MULTIBYTE_MENUS = [
+    {"name": "김치찌개", "tags": ["SOUP", "SPICY"]},
+    {"name": "🍜 라멘", "tags": ["NOODLES"]},
+    {"name": "크림 \"파스타\"", "tags": ["CREAMY", "NOODLES"]},
+    {"name": "é", "tags": []},
+]
+
+
+def test_iter_menu_json_chunks_split_inside_characters(tmp_path):
+    path = write_menus(tmp_path / "menus.json", MULTIBYTE_MENUS)
+    # 1~8바이트 청크: 3바이트 한글, 4바이트 이모지의 모든 중간 지점에서 잘림
+    for chunk_size in range(1, 9):
+        assert list(menu_store.iter_menu_json(path, chunk_size=chunk_size)) == MULTIBYTE_MENUS
+
+
+def test_iter_menu_json_reports_progress(tmp_path):
+    path = write_menus(tmp_path / "menus.json", MULTIBYTE_MENUS)
+    seen = []
+    list(menu_store.iter_menu_json(path, chunk_size=5, on_chunk=lambda read, total: seen.append((read, total))))
+    total = os.path.getsize(path)
+    assert seen[-1] == (total, total)
+    assert [read for read, _ in seen] == sorted(read for read, _ in seen)
+
+
+@pytest.mark.parametrize("text", ['{"name": "김치찌개"}', '[{"name": "김치찌개", "tags": []}', "[{\"name\": "])
+def test_iter_menu_json_rejects_malformed(tmp_path, text):
+    path = tmp_path / "menus.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(menu_store.iter_menu_json(str(path), chunk_size=4))
@@ -0,0 +1,121 @@
+"""pipeline_utils: 동시 실행(submit/join), 동일 요청 합치기(SingleFlight)"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from pipeline_utils import SingleFlight, join, submit
+from tracing import span, tracer
+
+
+def run_callers(count, target):
+    """count개 스레드에서 target()을 동시에 호출하고 결과(또는 예외) 목록을 반환합니다."""
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        futures = [pool.submit(target) for _ in range(count)]
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        release.wait(5)
+        return {"key": key}
+
+    def caller():
+        return flight.do("a", fetch, "a")
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(caller) for _ in range(6)]
+        deadline = time.monotonic() + 5
+        while flight.calls + flight.shared < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        results = [f.result(timeout=5) for f in futures]
+
+    assert calls == ["a"]
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"calls": 1, "shared": 5, "inflight": 0}
+
+
+def test_singleflight_different_keys_run_separately():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.do("a", lambda: 3) == 3   # 끝난 호출은 저장하지 않으므로 새로 실행
+    assert flight.stats() == {"calls": 3, "shared": 0, "inflight": 0}
+
+
+def test_singleflight_propagates_errors_to_all_callers():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    threading.Timer(0.2, release.set).start()
+    results = run_callers(4, lambda: flight.do("k", fail))
+    assert all(isinstance(r, RuntimeError) and str(r) == "upstream down" for r in results)
+    assert flight.calls + flight.shared == 4
+    assert flight.stats()["inflight"] == 0
+    assert flight.do("k", lambda: "recovered") == "recovered"   # 실패는 남지 않음
+
+
+def test_singleflight_timeout_does_not_cancel_shared_call():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "done"
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        patient = pool.submit(flight.do, "k", slow)
+        time.sleep(0.05)
+        with pytest.raises(FutureTimeoutError):
+            flight.do("k", slow, timeout=0.05)
+        release.set()
+        assert patient.result(timeout=5) == "done"
+    assert flight.stats() == {"calls": 1, "shared": 1, "inflight": 0}
+
+
+def test_singleflight_immediate_result_does_not_deadlock():
+    flight = SingleFlight("test")
+    for i in range(200):
+        assert flight.do(i % 3, lambda: i, timeout=5) == i
+    assert flight.stats()["inflight"] == 0
+
+
+def test_join_collects_results_and_exceptions_in_completion_order():
+    order = []
+
+    def boom():
+        raise ValueError("bad")
+
+    futures = {
+        "slow": submit(time.sleep, 0.1),
+        "fast": submit(lambda: "ok"),
+        "error": submit(boom),
+    }
+    results = join(futures, on_done=lambda name, result: order.append(name))
+    assert results["fast"] == "ok"
+    assert results["slow"] is None
+    assert isinstance(results["error"], ValueError)
+    assert order[-1] == "slow"
+
+
+def test_submit_keeps_trace_request():
+    def stage():
+        with span("test.stage"):
+            return "ok"
+
+    with tracer.request("test.submit") as record:
+        assert submit(stage).result(timeout=5) == "ok"
+    assert [s["stage"] for s in record["stages"]] == ["test.stage"]
@@ -0,0 +1,124 @@
+"""restaurants: 가까운 영업 중 식당 찾기, 자정 넘김/휴무 요일 규칙"""
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from gen_restaurants import HONGDAE_LAT, HONGDAE_LON, iter_synthetic_restaurants
+from restaurants import METERS_PER_DEGREE_LAT, RestaurantIndex, is_open_at, parse_hours
+
+MONDAY = datetime(2026, 10, 19)   # 월요일 (weekday 0)
+
+
+def at(day_offset, hour, minute=0):
+    return MONDAY + timedelta(days=day_offset, hours=hour, minutes=minute)
+
+
+def venue(name, hours, closed_days=(), lat=HONGDAE_LAT, lon=HONGDAE_LON, menus=("김치찌개",)):
+    return {"name": name, "lat": lat, "lon": lon, "menus": list(menus),
+            "hours": hours, "closed_days": list(closed_days)}
+
+
+# ============================================================================
+# 영업 여부
+# ============================================================================
+
+def test_overnight_shift_uses_previous_day_closure():
+    index = RestaurantIndex([venue("심야집", [["17:00", "02:00"]], closed_days=[0])])
+    assert index.is_open(0, at(0, 1))        # 월 01:00 = 일요일 영업분
+    assert not index.is_open(0, at(0, 18))   # 월 18:00 = 월요일 휴무
+    assert not index.is_open(0, at(1, 1))    # 화 01:00 = 월요일(휴무) 영업분
+    assert index.is_open(0, at(1, 18))
+
+
+def test_daytime_hours_and_closed_day():
+    index = RestaurantIndex([venue("점심집", [["11:00", "15:00"], ["17:00", "22:00"]], closed_days=[6])])
+    assert index.is_open(0, at(0, 12))
+    assert not index.is_open(0, at(0, 16))
+    assert not index.is_open(0, at(6, 12))   # 일요일 휴무
+    assert not index.is_open(0, at(0, 0, 30))  # 월 00:30은 일요일 영업분이지만 자정을 넘기지 않음
+
+
+def test_always_open_respects_closed_days():
+    index = RestaurantIndex([venue("24시", None, closed_days=[2])])
+    assert index.is_open(0, at(1, 23, 59))
+    assert not index.is_open(0, at(2, 0, 30))
+
+
+def test_aware_datetime_converted_to_seoul():
+    index = RestaurantIndex([venue("점심집", [["11:00", "15:00"]])])
+    assert index.is_open(0, datetime(2026, 10, 19, 3, 0, tzinfo=timezone.utc))     # 서울 12:00
+    assert not index.is_open(0, datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc))  # 서울 21:00
+
+
+def test_is_open_at_without_weekday_ignores_closed_days():
+    hours = parse_hours([["22:00", "03:00"]])
+    assert is_open_at(hours, 23 * 60)
+    assert is_open_at(hours, 2 * 60)
+    assert not is_open_at(hours, 12 * 60)
+    assert is_open_at(None, 0)
+
+
+# ============================================================================
+# 가까운 식당 (전수 계산과 비교)
+# ============================================================================
+
+def brute_open(restaurant, when):
+    """교대(시작 요일, 시작 분, 길이)로 펼쳐 직접 확인하는 영업 여부"""
+    hours = parse_hours(restaurant.get("hours"))
+    closed = set(restaurant.get("closed_days") or ())
+    if hours is None:
+        return when.weekday() not in closed
+    minute = when.hour * 60 + when.minute
+    for start, end in hours:
+        length = (end - start) % (24 * 60) or 24 * 60
+        for days_ago in (0, 1):
+            if (when.weekday() - days_ago) % 7 in closed:
+                continue
+            if 0 <= minute + days_ago * 24 * 60 - start < length:
+                return True
+    return False
+
+
+def brute_nearest(restaurants, menu, lat, lon, radius, limit, when, open_only):
+    ref_lat = sum(r["lat"] for r in restaurants) / len(restaurants)
+    per_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(ref_lat))
+    found = []
+    for i, r in enumerate(restaurants):
+        if menu not in r["menus"] or (open_only and not brute_open(r, when)):
+            continue
+        distance = math.hypot((r["lon"] - lon) * per_lon, (r["lat"] - lat) * METERS_PER_DEGREE_LAT)
+        if distance <= radius:
+            found.append((distance, i))
+    return [r["name"] for r in (restaurants[i] for _, i in sorted(found)[:limit])]
+
+
+@pytest.fixture(scope="module")
+def synthetic():
+    restaurants = list(iter_synthetic_restaurants(3000, seed=7))
+    return restaurants, RestaurantIndex(restaurants)
+
+
+@pytest.mark.parametrize("when", [at(0, 12), at(1, 1, 30), at(6, 3, 59), at(3, 16)])
+@pytest.mark.parametrize("radius, limit", [(300, 3), (1000, 5), (2500, 1)])
+def test_nearest_matches_brute_force(synthetic, when, radius, limit):
+    restaurants, index = synthetic
+    menus = list(dict.fromkeys(m for r in restaurants[:40] for m in r["menus"]))[:15]
+    points = [(HONGDAE_LAT, HONGDAE_LON), (HONGDAE_LAT + 0.012, HONGDAE_LON - 0.02)]
+    for lat, lon in points:
+        for menu in menus:
+            for open_only in (True, False):
+                got = [r["name"] for r in index.nearest(menu, lat, lon, radius, limit, when, open_only)]
+                assert got == brute_nearest(restaurants, menu, lat, lon, radius, limit, when, open_only)
+
+
+def test_overnight_closed_day_in_nearest():
+    restaurants = [
+        venue("월휴무 심야", [["17:00", "04:00"]], closed_days=[0]),
+        venue("매일 심야", [["17:00", "04:00"]], lat=HONGDAE_LAT + 0.001),
+    ]
+    index = RestaurantIndex(restaurants)
+    names = lambda when: [r["name"] for r in index.nearest("김치찌개", HONGDAE_LAT, HONGDAE_LON, at=when)]
+    assert names(at(0, 1)) == ["월휴무 심야", "매일 심야"]
+    assert names(at(1, 1)) == ["매일 심야"]
@@ -0,0 +1,140 @@
+"""server: 파라미터 검증(잘못된 입력은 400), Claude 실패 시 취향 없음으로 추천"""
+
+import asyncio
+import http.client
+import json
+import os
+import threading
+
+import pytest
+
+import intent_utils
+import server
+from conftest import PACKAGE_DIR
+from tracing import tracer
+
+
+@pytest.fixture(scope="module")
+def running_server(tmp_path_factory):
+    """대역 없이 로컬 메뉴 DB로 서비스를 띄우고, 별도 스레드의 이벤트 루프에서 HTTP를 받습니다."""
+    service = server.RecommendationService(
+        os.path.join(PACKAGE_DIR, "menus.json"),
+        restaurant_file=str(tmp_path_factory.mktemp("server") / "restaurants.json"),
+    )
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    http_server = asyncio.run_coroutine_threadsafe(
+        server.RecommendationServer(service, port=0).start(), loop
+    ).result(timeout=10)
+    yield http_server
+    loop.call_soon_threadsafe(http_server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    service.menu_reloader.stop()
+
+
+@pytest.fixture(autouse=True)
+def isolated_intent(monkeypatch, tmp_path):
+    """공용 의도 캐시 대신 임시 캐시, Claude 호출은 실패하도록"""
+    cache = intent_utils.IntentCache(path=str(tmp_path / "intent.sqlite3"))
+    monkeypatch.setattr(intent_utils, "get_intent_cache", lambda: cache)
+
+    def call_claude_intent(prompt, api_key=None):
+        raise RuntimeError("Claude 연결 실패")
+
+    monkeypatch.setattr(intent_utils, "call_claude_intent", call_claude_intent)
+    monkeypatch.setattr(intent_utils, "call_claude", call_claude_intent)
+
+
+def request(running_server, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", running_server.port, timeout=30)
+    try:
+        if isinstance(body, dict):
+            body = json.dumps(body)
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+    finally:
+        conn.close()
+
+
+VALID = {"tags": {"SOUP": 5}, "weather": "RAINY", "temp": "COLD"}
+
+
+@pytest.mark.parametrize("override", [
+    {"lat": "nan"},
+    {"lon": "inf"},
+    {"lat": "-Infinity"},
+    {"radius": "nan"},
+    {"radius": 0},
+    {"radius": 999999},
+    {"lat": "north"},
+    {"top_k": 0},
+    {"top_k": "many"},
+    {"top_k": 1e400},
+    {"tags": {"SPICY": "5"}},
+    {"tags": {"SPICY": True}},
+    {"tags": "{not json"},
+    {"tags": ["SPICY"]},
+    {"weather": "FOGGY"},
+    {"temp": "WARM"},
+    {"slot": "brunch"},
+    {"slot": ["lunch"]},
+    {"q": 123, "tags": None},
+])
+def test_recommend_rejects_bad_params(running_server, override):
+    status, payload = request(running_server, "POST", "/recommend", {**VALID, **override})
+    assert status == 400
+    assert "error" in payload
+
+
+def test_recommend_rejects_nan_query_string(running_server):
+    status, _ = request(running_server, "GET", "/recommend?lat=nan&tags=%7B%7D&weather=SUNNY")
+    assert status == 400
+
+
+@pytest.mark.parametrize("body", [b'{"q": "\xff\xfe"}', b"[1, 2]", b"{oops"])
+def test_bad_body_is_400(running_server, body):
+    status, _ = request(running_server, "POST", "/recommend", body)
+    assert status == 400
+
+
+def test_intent_requires_string(running_server):
+    status, _ = request(running_server, "POST", "/intent", {"q": ["국물"]})
+    assert status == 400
+
+
+def test_recommend_with_valid_params(running_server):
+    status, payload = request(running_server, "POST", "/recommend", {**VALID, "top_k": 2})
+    assert status == 200
+    assert len(payload["results"]) == 2
+    assert payload["user_tags"] == {"SOUP": 5}
+    assert payload["intent_fallback"] is False
+
+
+def test_claude_failure_falls_back_to_no_preference(running_server):
+    status, payload = request(
+        running_server, "POST", "/recommend", {"q": "오늘은 특별한 날이라서", "weather": "SUNNY"}
+    )
+    assert status == 200
+    assert payload["user_tags"] == {}
+    assert payload["intent_fallback"] is True
+    assert payload["results"]
+
+    record = next(r for r in tracer.recent() if r["name"] == "http.recommend")
+    assert "Claude 연결 실패" in record["meta"]["intent_error"]
+    assert any(stage["stage"] == "intent" and stage["error"] for stage in record["stages"])
+
+
+def test_intent_endpoint_fallback(running_server):
+    assert request(running_server, "GET", "/intent?q=%EA%B5%AD%EB%AC%BC") == (
+        200, {"tags": {"SOUP": 5}, "fallback": False}
+    )
+    status, payload = request(running_server, "POST", "/intent", {"q": "오늘은 특별한 날이라서"})
+    assert (status, payload) == (200, {"tags": {}, "fallback": True})
+
+
+def test_unknown_path_and_method(running_server):
+    assert request(running_server, "GET", "/nope")[0] == 404
+    assert request(running_server, "DELETE", "/health")[0] == 405
@@ -0,0 +1,42 @@
+"""Tavily_Search: 여러 쿼리 동시 검색, 공용 풀 안에서 호출해도 막히지 않음"""
+
+from concurrent.futures import wait
+
+import pytest
+
+from pipeline_utils import PIPELINE_MAX_WORKERS, submit
+from stubs import StubServer
+from Tavily_Search import TavilyClient
+
+
+@pytest.fixture
+def client():
+    with StubServer(latency=0.05) as server:
+        client = TavilyClient(api_key="", base_url=server.url, pool_size=2)
+        yield client, server
+        client.close()
+
+
+def test_search_many_merges_and_caches(client):
+    client, server = client
+    queries = ["요즘 유행하는 음식", "홍대 맛집 트렌드", "요즘 유행하는 음식"]
+    merged = client.search_many(queries)
+    assert merged["errors"] == {}
+    assert set(merged["answers"]) <= set(queries)
+    assert merged["results"]
+    assert all(item["queries"] for item in merged["results"])
+    assert client.search_many(queries) == merged
+    assert len(server.requests) == 2   # 중복 쿼리는 한 번, 두 번째 호출은 캐시
+
+
+def test_search_many_inside_shared_pool(client):
+    """공용 풀의 모든 스레드가 search_many를 기다려도 검색은 전용 풀에서 끝남"""
+    client, server = client
+    futures = [
+        submit(client.search_many, [f"쿼리 {i}-{j}" for j in range(3)])
+        for i in range(PIPELINE_MAX_WORKERS * 2)
+    ]
+    done, pending = wait(futures, timeout=30)
+    assert not pending
+    assert all(not f.result()["errors"] for f in done)
+    assert len(server.requests) == PIPELINE_MAX_WORKERS * 2 * 3
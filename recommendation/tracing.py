@@ -0,0 +1,267 @@
+"""
+단계별 지연 시간 측정 모듈
+
+추천 요청 하나를 날씨 조회 → 의도 분석(Claude) → 메뉴 로드 → 추천 계산 → 화면 출력
+단계로 나눠 시간을 잽니다. 단계별 시간은 프로세스 안의 히스토그램(p50/p95/p99)에 쌓이고,
+요청 단위 기록은 최근 TRACE_HISTORY_SIZE개만 보관합니다.
+
+사용 예:
+    with trace_request("app"):
+        with span("weather"):
+            get_weather_info(...)
+
+    @traced("intent")
+    def get_intent_tags(...):
+        ...
+
+내보내기:
+    - export() / export_json(path): 단계별 통계 + 최근 요청 기록
+    - 로그 싱크: 요청이 끝날 때마다 logging("tracing") DEBUG 로그,
+      환경변수 TRACE_LOG_PATH가 있으면 JSON Lines 파일에도 한 줄씩 추가
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+TRACE_HISTORY_SIZE = 50       # 보관할 최근 요청 수
+TRACE_SAMPLE_SIZE = 2048      # 단계별 히스토그램이 보관하는 최근 샘플 수
+TRACE_LOG_PATH = os.environ.get("TRACE_LOG_PATH")  # JSON Lines 싱크 경로 (선택)
+
+logger = logging.getLogger("tracing")
+
+# 현재 스레드(컨텍스트)에서 진행 중인 요청 기록
+_current_request = contextvars.ContextVar("current_request", default=None)
+
+
+# ============================================================================
+# 히스토그램
+# ============================================================================
+
+class LatencyHistogram:
+    """최근 max_samples개 샘플로 백분위를 계산하는 지연 시간 히스토그램 (ms)"""
+
+    def __init__(self, max_samples=TRACE_SAMPLE_SIZE):
+        self._samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total_ms = 0.0
+        self.errors = 0
+
+    def add(self, ms, error=False):
+        self._samples.append(ms)
+        self.count += 1
+        self.total_ms += ms
+        self.errors += error
+
+    def summary(self):
+        """{count, errors, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}"""
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": 0, "errors": 0, "mean_ms": 0.0,
+                    "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": samples[-1],
+        }
+
+
+# ============================================================================
+# 트레이서
+# ============================================================================
+
+class Tracer:
+    """
+    단계 시간을 히스토그램과 현재 요청 기록에 남깁니다.
+
+    요청 기록 형식:
+        {"name", "started_at", "total_ms", "meta", "stages": [{"stage", "ms", "error"}, ...]}
+
+    요청 기록은 contextvars로 전달되므로, 다른 스레드에서 실행하는 단계는
+    contextvars.copy_context().run(...)으로 감싸야 같은 요청에 묶입니다.
+    """
+
+    def __init__(self, history_size=TRACE_HISTORY_SIZE, sample_size=TRACE_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.enabled = True
+        self._histograms = {}
+        self._recent = deque(maxlen=history_size)
+        self._sinks = []
+        self._lock = threading.Lock()
+
+    def _record(self, stage, ms, error):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.sample_size)
+            histogram.add(ms, error)
+
+    # --- 측정 --------------------------------------------------------------
+
+    @contextmanager
+    def span(self, stage):
+        """with 블록의 실행 시간을 stage 이름으로 기록합니다. (예외가 나도 기록)"""
+        if not self.enabled:
+            yield
+            return
+
+        error = False
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self._record(stage, ms, error)
+            request = _current_request.get()
+            if request is not None:
+                request["stages"].append({"stage": stage, "ms": ms, "error": error})
+
+    def traced(self, stage):
+        """함수 실행 시간을 stage 이름으로 기록하는 데코레이터"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def start_request(self, name, **meta):
+        """요청 기록을 시작합니다. with 블록으로 감쌀 수 없는 곳(Streamlit 스크립트)용"""
+        request = {
+            "name": name,
+            "started_at": time.time(),
+            "total_ms": None,
+            "meta": meta,
+            "stages": [],
+            "_start": time.perf_counter(),
+        }
+        request["_token"] = _current_request.set(request)
+        return request
+
+    def finish_request(self, request):
+        """요청 기록을 끝내고 최근 기록과 싱크로 보냅니다."""
+        request["total_ms"] = (time.perf_counter() - request.pop("_start")) * 1000
+        try:
+            _current_request.reset(request.pop("_token"))
+        except ValueError:  # 시작한 컨텍스트와 다른 곳에서 끝낸 경우
+            _current_request.set(None)
+        if not self.enabled:
+            return request
+
+        self._record(f"request.{request['name']}", request["total_ms"], False)
+        with self._lock:
+            self._recent.append(request)
+            sinks = list(self._sinks)
+        for sink in sinks:
+            try:
+                sink(request)
+            except Exception as e:
+                logger.warning("trace sink failed: %s", e)
+        return request
+
+    @contextmanager
+    def request(self, name, **meta):
+        """with 블록 하나를 요청 하나로 기록합니다."""
+        record = self.start_request(name, **meta)
+        try:
+            yield record
+        finally:
+            self.finish_request(record)
+
+    def annotate(self, **meta):
+        """진행 중인 요청 기록의 meta에 값을 더합니다. (대체값으로 넘어간 오류 등, 요청이 없으면 무시)"""
+        request = _current_request.get()
+        if request is not None:
+            request["meta"].update(meta)
+
+    # --- 조회/내보내기 -----------------------------------------------------
+
+    def add_sink(self, sink):
+        """요청이 끝날 때마다 sink(요청 기록)를 호출합니다."""
+        with self._lock:
+            self._sinks.append(sink)
+
+    def stats(self):
+        """단계별 히스토그램 요약 {stage: summary}"""
+        with self._lock:
+            return {stage: h.summary() for stage, h in sorted(self._histograms.items())}
+
+    def recent(self, n=None):
+        """최근 요청 기록 (최신순)"""
+        with self._lock:
+            records = list(self._recent)
+        records.reverse()
+        return records[:n] if n is not None else records
+
+    def export(self, n=None):
+        return {"stages": self.stats(), "recent": self.recent(n)}
+
+    def export_json(self, path, n=None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.export(n), f, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+
+
+def stage_breakdown(request):
+    """요청 기록의 단계별 합계 {stage: ms} (같은 단계가 여러 번이면 더함)"""
+    breakdown = {}
+    for entry in request["stages"]:
+        breakdown[entry["stage"]] = breakdown.get(entry["stage"], 0.0) + entry["ms"]
+    return breakdown
+
+
+# ============================================================================
+# 로그 싱크
+# ============================================================================
+
+def log_sink(request):
+    """요청 기록을 한 줄 요약으로 DEBUG 로그에 남깁니다."""
+    if logger.isEnabledFor(logging.DEBUG):
+        parts = ", ".join(f"{stage} {ms:.1f}ms" for stage, ms in stage_breakdown(request).items())
+        logger.debug("%s %.1fms [%s]", request["name"], request["total_ms"], parts)
+
+
+def jsonl_sink(path):
+    """요청 기록을 JSON Lines 파일에 한 줄씩 추가하는 싱크를 만듭니다."""
+    lock = threading.Lock()
+
+    def sink(request):
+        line = json.dumps(request, ensure_ascii=False)
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    return sink
+
+
+# 프로세스 공용 트레이서
+tracer = Tracer()
+tracer.add_sink(log_sink)
+if TRACE_LOG_PATH:
+    tracer.add_sink(jsonl_sink(TRACE_LOG_PATH))
+
+span = tracer.span
+traced = tracer.traced
+trace_request = tracer.request
@@ -0,0 +1,265 @@
+"""
+검색 트렌드 기반 메뉴 가산점
+
+백그라운드 스레드가 주기적으로 Tavily 트렌드 검색을 돌리고, 결과 제목/본문에서
+메뉴 이름을 Aho–Corasick 다중 패턴 매칭으로 한 번에 찾아 메뉴별 가산점을 갱신합니다.
+
+가산점은 매 갱신마다 새 dict를 만들어 (인덱스, 가산점) 쌍의 참조만 바꿔 끼우므로,
+추천 계산 쪽은 락 없이 booster.boosts_for(index)로 현재 dict를 읽기만 하면 됩니다.
+
+갱신 규칙:
+    새 가산점 = 이전 가산점 × TREND_DECAY + 언급 점수 × TREND_MENTION_WEIGHT  (최대 TREND_MAX_BOOST)
+    언급 점수는 메뉴를 언급한 검색 결과들의 점수(score, 없으면 1) 합입니다.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+TREND_REFRESH_INTERVAL = 60 * 60   # 초, 트렌드 검색 주기
+TREND_DECAY = 0.5                  # 갱신마다 이전 가산점에 곱하는 비율
+TREND_MENTION_WEIGHT = 1.0         # 언급 점수 1당 가산점
+TREND_MAX_BOOST = 3.0              # 메뉴당 최대 가산점
+TREND_MIN_BOOST = 0.05             # 이보다 작아지면 가산점 삭제
+TREND_MIN_NAME_LENGTH = 2          # 이보다 짧은 메뉴 이름은 오탐이 많아 매칭하지 않음
+
+
+def normalize_text(text):
+    """매칭용 정규화: 공백 제거 + 소문자 ('치즈 돈까스' == '치즈돈까스')"""
+    return "".join(text.split()).lower()
+
+
+# ============================================================================
+# Aho–Corasick 다중 패턴 매처
+# ============================================================================
+
+class AhoCorasick:
+    """
+    여러 패턴을 텍스트 한 번 훑기로 모두 찾는 매처
+
+    Args:
+        patterns: [(패턴 문자열, 값), ...]  같은 패턴에 여러 값이 있으면 모두 반환
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]      # 상태 → {문자: 다음 상태}
+        self._fail = [0]       # 상태 → 실패 링크
+        self._output = [[]]    # 상태 → 이 상태에서 끝나는 패턴 값 (실패 링크 쪽 포함)
+
+        for pattern, value in patterns:
+            if pattern:
+                self._insert(pattern, value)
+        self._build_links()
+
+    def _insert(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(value)
+
+    def _build_links(self):
+        """너비 우선으로 실패 링크를 만들고, 실패 링크 쪽 출력을 합쳐 둡니다."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = (
+                        self._output[next_state] + self._output[self._fail[next_state]]
+                    )
+
+    def __len__(self):
+        return len(self._goto)
+
+    def iter_matches(self, text):
+        """텍스트에서 찾은 패턴의 값을 등장 순서대로 내보냅니다. (중복 포함)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                yield from output[state]
+
+
+# ============================================================================
+# 트렌드 가산점 갱신 작업
+# ============================================================================
+
+class TrendBooster:
+    """
+    메뉴 인덱스에 대한 트렌드 가산점 {메뉴 번호: 가산점}을 관리합니다.
+
+    Args:
+        index: MenuIndex (메뉴 번호가 가산점의 키)
+        search_client: search_many(queries)를 가진 검색 클라이언트 (예: TavilyClient)
+        queries: 트렌드 쿼리 목록을 돌려주는 함수 (예: Tavily_Search.trend_queries)
+        interval: 백그라운드 갱신 주기(초)
+    """
+
+    def __init__(self, index, search_client, queries, interval=TREND_REFRESH_INTERVAL,
+                 decay=TREND_DECAY, mention_weight=TREND_MENTION_WEIGHT, max_boost=TREND_MAX_BOOST):
+        self.search_client = search_client
+        self.queries = queries
+        self.interval = interval
+        self.decay = decay
+        self.mention_weight = mention_weight
+        self.max_boost = max_boost
+
+        self._state = (index, {})  # (인덱스, 가산점): 메뉴 번호가 어느 인덱스 기준인지 함께 교체
+        self._state_lock = threading.Lock()
+        self.updated_at = None     # 마지막 갱신 시각 (time.time())
+        self.last_error = None
+
+        self._matcher = None
+        self._matcher_key = None   # (인덱스, 메뉴 수): 인덱스가 바뀌거나 메뉴가 늘면 다시 만듦
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def index(self):
+        return self._state[0]
+
+    @property
+    def boosts(self):
+        """현재 가산점 {메뉴 번호: 점수} (읽기 전용, 갱신 시 통째로 교체)"""
+        return self._state[1]
+
+    def boosts_for(self, index):
+        """index 기준 가산점. 메뉴 DB 교체 직후처럼 기준 인덱스가 다르면 빈 dict"""
+        state_index, boosts = self._state
+        return boosts if state_index is index else {}
+
+    def set_index(self, index, positions=None):
+        """
+        메뉴 인덱스를 교체합니다. (메뉴 DB를 다시 로드한 경우)
+
+        positions({이전 번호: 새 번호}, 예: MenuIndex.with_menus의 변경 내역)를 주면
+        남은 메뉴의 가산점을 새 번호로 옮깁니다. 없으면 가산점을 비우고 백그라운드 갱신을 바로 깨웁니다.
+        """
+        with self._state_lock:
+            old_index, boosts = self._state
+            if index is old_index:
+                return
+            if positions is None:
+                self._state = (index, {})
+            else:
+                self._state = (index, {positions[i]: b for i, b in boosts.items() if i in positions})
+        if positions is None:
+            self._wake.set()
+
+    def _get_matcher(self, index):
+        key = (id(index), len(index))
+        if self._matcher is None or self._matcher_key != key:
+            names = ((normalize_text(index[i]["name"]), i) for i in range(len(index)))
+            self._matcher = AhoCorasick(
+                (name, i) for name, i in names if len(name) >= TREND_MIN_NAME_LENGTH
+            )
+            self._matcher_key = key
+        return self._matcher
+
+    def count_mentions(self, results, index=None):
+        """검색 결과 목록에서 메뉴별 언급 점수 {메뉴 번호: 점수}를 셉니다. (결과 하나당 메뉴별 1회)"""
+        matcher = self._get_matcher(self.index if index is None else index)
+        mentions = {}
+        for item in results:
+            text = normalize_text(f"{item.get('title') or ''} {item.get('content') or ''}")
+            weight = item.get("score") or 1.0
+            for position in set(matcher.iter_matches(text)):
+                mentions[position] = mentions.get(position, 0.0) + weight
+        return mentions
+
+    def apply_mentions(self, mentions, index=None):
+        """
+        이전 가산점을 감쇠시키고 새 언급을 더해 가산점 dict를 교체합니다.
+        index(언급을 센 기준 인덱스)가 그 사이 교체되었으면 메뉴 번호가 맞지 않으므로 버립니다.
+        """
+        with self._state_lock:
+            state_index, previous = self._state
+            if index is not None and index is not state_index:
+                return previous
+
+            boosts = {}
+            for position, boost in previous.items():
+                boost *= self.decay
+                if boost >= TREND_MIN_BOOST:
+                    boosts[position] = boost
+            for position, score in mentions.items():
+                boost = boosts.get(position, 0.0) + score * self.mention_weight
+                boosts[position] = min(self.max_boost, boost)
+
+            boosts = {position: round(boost, 2) for position, boost in boosts.items()}
+            self._state = (state_index, boosts)
+        self.updated_at = time.time()
+        return boosts
+
+    def refresh(self):
+        """트렌드 검색 1회 → 가산점 갱신. 검색이 전부 실패하면 기존 가산점을 유지합니다."""
+        with self._refresh_lock:
+            index = self.index
+            queries = list(self.queries())
+            response = self.search_client.search_many(queries)
+            if response["errors"] and len(response["errors"]) == len(queries):
+                self.last_error = "; ".join(response["errors"].values())
+                return self.boosts
+            self.last_error = None
+
+            mentions = self.count_mentions(response["results"], index)
+            return self.apply_mentions(mentions, index)
+
+    # --- 백그라운드 실행 ---------------------------------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error refreshing trend boosts: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        """백그라운드 갱신 스레드를 시작합니다. (이미 실행 중이면 무시)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="trend-boost", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+
+_default_booster = None
+_default_booster_lock = threading.Lock()
+
+
+def get_trend_booster(index, search_client, queries):
+    """
+    프로세스 공용 TrendBooster (처음 호출 시 생성)
+    Streamlit 재실행이나 캐시 초기화로 갱신 스레드가 여러 개 생기지 않게 합니다.
+    이후 메뉴 DB 교체는 set_index로 알립니다. (예: MenuReloader의 on_swap)
+    """
+    global _default_booster
+    with _default_booster_lock:
+        if _default_booster is None:
+            _default_booster = TrendBooster(index, search_client, queries)
+        return _default_booster
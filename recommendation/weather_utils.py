@@ -1,5 +1,25 @@
+import threading
+import time
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from pipeline_utils import SingleFlight
+from tracing import traced
+
+WEATHER_API_URL = "https://api.open-meteo.com/v1/forecast"
+WEATHER_REQUEST_TIMEOUT = 10       # 초
+WEATHER_CACHE_TTL = 15 * 60        # 초, 이 시간이 지나면 백그라운드에서 갱신
+WEATHER_COORD_PRECISION = 2        # 캐시 키 좌표 반올림 자릿수 (약 1km)
+WEATHER_BATCH_SIZE = 100           # 다중 좌표 요청 한 번에 담을 최대 지점 수
+WEATHER_FORECAST_DAYS = 2          # 시간별 예보를 받아 둘 일수 (오늘 + 내일)
+WEATHER_FORECAST_TTL = 60 * 60     # 초, 예보 갱신 주기 (open-meteo 예보는 1시간 단위로 갱신)
+
+# 식사 시간대 → 기준 시각(시). "now"는 현재 시각
+WEATHER_TIME_SLOTS = {
+    "breakfast": 8,
+    "lunch": 12,
+    "dinner": 18,
+    "late_night": 22,
+}
 
 SEASON_AVG_TEMP = {
     "winter": 2,
@@ -35,42 +55,343 @@ def get_weather_description(code):
     elif code in [71, 73, 75, 77, 85, 86]: return "SNOWY"
     else: return "UNKNOWN"
 
-def get_weather_info(latitude, longitude):
+# 연결을 재사용하는 공용 세션
+_session = requests.Session()
+
+# (반올림 위도, 반올림 경도) → (조회 시각, (상태, 온도플래그))
+_weather_cache = {}
+_refreshing = set()
+_cache_lock = threading.Lock()
+
+# (반올림 위도, 반올림 경도) → (조회 시각, HourlyForecast)
+_forecast_cache = {}
+
+# 같은 격자점에 대한 동시 조회는 open-meteo 호출 한 번으로 합침
+_weather_flight = SingleFlight("weather")
+_forecast_flight = SingleFlight("forecast")
+
+
+def weather_cache_key(latitude, longitude, grid=None):
     """
-    날씨 정보를 가져와서 (상태, 온도플래그) 튜플을 반환합니다.
-    예: ("SUNNY", "HOT") 또는 ("RAINY", "NORMAL")
+    캐시 키용 좌표. 기본은 소수점 WEATHER_COORD_PRECISION자리 반올림이고,
+    grid(도 단위 격자 간격)를 주면 가장 가까운 격자점으로 맞춥니다.
+    """
+    if grid is None:
+        return (round(latitude, WEATHER_COORD_PRECISION), round(longitude, WEATHER_COORD_PRECISION))
+    return (round(round(latitude / grid) * grid, 6), round(round(longitude / grid) * grid, 6))
+
+
+def parse_current_weather(current):
+    """open-meteo 'current' 블록을 (상태, 온도플래그) 튜플로 변환합니다."""
+    # 1. 날씨 상태 (SUNNY, RAINY 등)
+    weather_desc = get_weather_description(current['weather_code'])
+
+    # 2. 온도 플래그 (HOT, COLD, NORMAL)
+    temp_analysis = classify_temp_now(current['temperature_2m'])
+    active_flags = [k for k, v in temp_analysis.items() if v is True]
+
+    # HOT이나 COLD가 아니면 NORMAL 반환 (IndexError 방지)
+    temp_flag = active_flags[0] if active_flags else "NORMAL"
+
+    return weather_desc, temp_flag
+
+
+def classify_hourly(codes, temps, months, delta=5.0):
+    """
+    시간별 날씨 코드/기온/월 목록을 한 번에 [(상태, 온도플래그) 또는 None, ...]으로 변환합니다.
+    get_weather_description, classify_temp_now와 같은 기준이며 계절은 각 시각의 월로 정합니다.
+    (값이 비어 있는 시각은 None)
+    """
+    descs = {code: get_weather_description(code) for code in set(codes)}
+    bounds = {}  # 월 → (COLD 상한, HOT 하한)
+    for month in set(months):
+        avg = SEASON_AVG_TEMP[get_season(month)]
+        bounds[month] = (avg - delta, avg + delta)
+
+    result = []
+    for code, temp, month in zip(codes, temps, months):
+        if code is None or temp is None:
+            result.append(None)
+            continue
+        cold_max, hot_min = bounds[month]
+        # classify_temp_now와 같이 COLD를 먼저 확인
+        temp_flag = "COLD" if temp <= cold_max else "HOT" if temp >= hot_min else "NORMAL"
+        result.append((descs[code], temp_flag))
+    return result
+
+
+class HourlyForecast:
+    """
+    한 위치의 시간별 예보를 (상태, 온도플래그)로 미리 분류해 둔 것.
+    시각은 open-meteo 응답의 현지 시각(분 없는 정시) 기준이며, 조회는 메모리에서만 합니다.
     """
-    url = "https://api.open-meteo.com/v1/forecast"
+
+    def __init__(self, times, codes, temps, utc_offset=0):
+        hours = [datetime.fromisoformat(t) for t in times]
+        self.utc_offset = utc_offset  # 초, 현지 시각 = UTC + utc_offset
+        self._by_hour = {
+            hour: value
+            for hour, value in zip(hours, classify_hourly(codes, temps, [h.month for h in hours]))
+            if value is not None
+        }
+
+    def __len__(self):
+        return len(self._by_hour)
+
+    def local_now(self):
+        """예보 지역의 현재 시각 (서버 시간대와 무관)"""
+        return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=self.utc_offset)
+
+    def at(self, when):
+        """when(현지 시각)이 속한 정시의 (상태, 온도플래그). 예보 범위 밖이면 None"""
+        return self._by_hour.get(when.replace(minute=0, second=0, microsecond=0))
+
+    def slot_time(self, slot, now=None):
+        """
+        시간대의 다음 기준 시각. 오늘 그 시각이 지났으면 내일
+        (예: 14시에 "lunch" → 내일 12시, "now" → 지금)
+        """
+        now = now or self.local_now()
+        if slot == "now":
+            return now
+        if slot not in WEATHER_TIME_SLOTS:
+            raise ValueError(f"알 수 없는 시간대: {slot}")
+        target = now.replace(hour=WEATHER_TIME_SLOTS[slot], minute=0, second=0, microsecond=0)
+        if target.hour < now.hour:
+            target += timedelta(days=1)
+        return target
+
+    def for_slot(self, slot, now=None):
+        """시간대의 (상태, 온도플래그). 예보 범위 밖이면 None"""
+        return self.at(self.slot_time(slot, now))
+
+
+@traced("weather.fetch")
+def fetch_weather_info(latitude, longitude):
+    """캐시 없이 open-meteo를 호출합니다. (실패 시 예외)"""
     params = {
         "latitude": latitude,
         "longitude": longitude,
         "current": "temperature_2m,weather_code",
         "timezone": "Asia/Seoul",
     }
-    
+    response = _session.get(WEATHER_API_URL, params=params, timeout=WEATHER_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return parse_current_weather(response.json()['current'])
+
+
+@traced("weather.forecast_fetch")
+def fetch_weather_forecast(latitude, longitude, days=WEATHER_FORECAST_DAYS):
+    """캐시 없이 open-meteo 시간별 예보를 받아 HourlyForecast로 반환합니다. (실패 시 예외)"""
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "hourly": "temperature_2m,weather_code",
+        "forecast_days": days,
+        "timezone": "Asia/Seoul",
+    }
+    response = _session.get(WEATHER_API_URL, params=params, timeout=WEATHER_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    hourly = data['hourly']
+    return HourlyForecast(
+        hourly['time'], hourly['weather_code'], hourly['temperature_2m'],
+        utc_offset=data.get('utc_offset_seconds', 0)
+    )
+
+
+def _fetch_and_store(key):
+    """조회 후 캐시에 저장합니다. (기다리던 호출자가 모두 시간 초과로 떠나도 결과는 남음)"""
+    value = fetch_weather_info(*key)
+    with _cache_lock:
+        _weather_cache[key] = (time.monotonic(), value)
+    return value
+
+
+def _fetch_and_store_forecast(key):
+    """시간별 예보를 받아 예보 캐시에 저장합니다."""
+    forecast = fetch_weather_forecast(*key)
+    with _cache_lock:
+        _forecast_cache[key] = (time.monotonic(), forecast)
+    return forecast
+
+
+def _refresh_in_background(key, flight=None, fetch=_fetch_and_store):
+    """만료된 캐시 항목을 백그라운드 스레드에서 갱신합니다. (실패 시 기존 값 유지)"""
+    flight = flight or _weather_flight
+    refresh_key = (flight.name, key)
+
+    def run():
+        try:
+            flight.do(key, fetch, key)
+        except Exception as e:
+            print(f"Error refreshing weather: {e}")
+        finally:
+            with _cache_lock:
+                _refreshing.discard(refresh_key)
+
+    with _cache_lock:
+        if refresh_key in _refreshing:
+            return
+        _refreshing.add(refresh_key)
+    threading.Thread(target=run, daemon=True).start()
+
+
+@traced("weather")
+def get_weather_info(latitude, longitude, ttl=None, timeout=None):
+    """
+    날씨 정보를 가져와서 (상태, 온도플래그) 튜플을 반환합니다.
+    예: ("SUNNY", "HOT") 또는 ("RAINY", "NORMAL")
+
+    반올림한 좌표 기준으로 캐시하며, ttl(기본 WEATHER_CACHE_TTL)이 지나면
+    기존 값을 바로 돌려주고 백그라운드에서 갱신합니다. (stale-while-revalidate)
+    캐시가 비어 있을 때 같은 좌표로 동시에 들어온 호출은 조회 한 번을 함께 기다립니다.
+
+    Args:
+        timeout: 이 호출이 조회를 기다릴 최대 시간(초). 넘으면 (None, None)
+                 (조회 자체는 계속되어 다른 호출자와 캐시에 반영됨)
+    """
+    ttl = WEATHER_CACHE_TTL if ttl is None else ttl
+    key = weather_cache_key(latitude, longitude)
+
+    with _cache_lock:
+        entry = _weather_cache.get(key)
+
+    if entry is not None:
+        fetched_at, value = entry
+        if time.monotonic() - fetched_at >= ttl:
+            _refresh_in_background(key)
+        return value
+
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        current = data['current']
-        
-        # 1. 날씨 상태 (SUNNY, RAINY 등)
-        weather_desc = get_weather_description(current['weather_code'])
-        
-        # 2. 온도 플래그 (HOT, COLD, NORMAL)
-        temp_analysis = classify_temp_now(current['temperature_2m'])
-        active_flags = [k for k, v in temp_analysis.items() if v is True]
-        
-        # HOT이나 COLD가 아니면 NORMAL 반환 (IndexError 방지)
-        temp_flag = active_flags[0] if active_flags else "NORMAL"
-        
-        return weather_desc, temp_flag
+        return _weather_flight.do(key, _fetch_and_store, key, timeout=timeout)
+    except Exception as e:
+        print(f"Error fetching weather: {type(e).__name__} {e}")
+        return None, None
 
+
+def get_weather_forecast(latitude, longitude, ttl=None, timeout=None):
+    """
+    위치의 시간별 예보(HourlyForecast)를 반환합니다. 조회에 실패하면 None
+
+    get_weather_info와 같은 방식으로 반올림한 좌표 기준으로 캐시하며, ttl(기본
+    WEATHER_FORECAST_TTL)이 지나면 기존 예보를 바로 돌려주고 백그라운드에서 갱신합니다.
+    """
+    ttl = WEATHER_FORECAST_TTL if ttl is None else ttl
+    key = weather_cache_key(latitude, longitude)
+
+    with _cache_lock:
+        entry = _forecast_cache.get(key)
+
+    if entry is not None:
+        fetched_at, forecast = entry
+        if time.monotonic() - fetched_at >= ttl:
+            _refresh_in_background(key, _forecast_flight, _fetch_and_store_forecast)
+        return forecast
+
+    try:
+        return _forecast_flight.do(key, _fetch_and_store_forecast, key, timeout=timeout)
     except Exception as e:
-        print(f"Error fetching weather: {e}")
+        print(f"Error fetching forecast: {type(e).__name__} {e}")
+        return None
+
+
+@traced("weather")
+def get_weather_for_slot(latitude, longitude, slot="now", ttl=None, timeout=None):
+    """
+    시간대(WEATHER_TIME_SLOTS의 키 또는 "now")의 (상태, 온도플래그) 튜플을 반환합니다.
+    예: get_weather_for_slot(LAT, LON, "dinner") → ("RAINY", "COLD")
+
+    위치마다 예보를 한 번 받아 모든 시각을 미리 분류해 두므로, 갱신 주기 안에서는
+    시간대를 바꿔 가며 불러도 네트워크를 다시 쓰지 않습니다.
+    예보를 받지 못했거나 예보 범위 밖이면 (None, None)
+    """
+    forecast = get_weather_forecast(latitude, longitude, ttl=ttl, timeout=timeout)
+    if forecast is None:
         return None, None
+    return forecast.for_slot(slot) or (None, None)
+
+
+def fetch_weather_info_batch(points):
+    """
+    여러 좌표를 open-meteo 다중 좌표 요청(쉼표 구분) 한 번으로 조회합니다. (실패 시 예외)
+
+    Returns:
+        points와 같은 순서의 (상태, 온도플래그) 리스트
+    """
+    params = {
+        "latitude": ",".join(str(lat) for lat, _ in points),
+        "longitude": ",".join(str(lon) for _, lon in points),
+        "current": "temperature_2m,weather_code",
+        "timezone": "Asia/Seoul",
+    }
+    response = _session.get(WEATHER_API_URL, params=params, timeout=WEATHER_REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+
+    # 좌표가 하나면 객체, 여러 개면 배열로 응답
+    if isinstance(data, dict):
+        data = [data]
+    if len(data) != len(points):
+        raise ValueError(f"응답 개수 불일치: 요청 {len(points)}개, 응답 {len(data)}개")
+    return [parse_current_weather(item['current']) for item in data]
+
+
+def get_weather_info_batch(coordinates, grid=None, ttl=None):
+    """
+    여러 위치의 날씨를 최소한의 요청으로 가져옵니다.
+
+    가까운 좌표는 격자점(grid, 기본은 캐시 키 반올림) 하나로 합치고, 캐시에 없거나
+    만료된 격자점만 WEATHER_BATCH_SIZE개씩 묶어 다중 좌표 요청으로 조회합니다.
+
+    Args:
+        coordinates: [(위도, 경도), ...]
+        grid: 격자 간격(도). 예: 0.05 → 약 5km 단위로 합침
+        ttl: 캐시 유효 시간(초, 기본 WEATHER_CACHE_TTL)
+
+    Returns:
+        coordinates와 같은 순서의 (상태, 온도플래그) 리스트
+        (조회에 실패한 위치는 (None, None))
+    """
+    ttl = WEATHER_CACHE_TTL if ttl is None else ttl
+    keys = [weather_cache_key(lat, lon, grid) for lat, lon in coordinates]
+
+    # 격자점 중복 제거 후 신선한 캐시 값 재사용
+    resolved = {}
+    now = time.monotonic()
+    with _cache_lock:
+        for key in dict.fromkeys(keys):
+            entry = _weather_cache.get(key)
+            if entry is not None and now - entry[0] < ttl:
+                resolved[key] = entry[1]
+    missing = [key for key in dict.fromkeys(keys) if key not in resolved]
+
+    for start in range(0, len(missing), WEATHER_BATCH_SIZE):
+        chunk = missing[start:start + WEATHER_BATCH_SIZE]
+        try:
+            values = fetch_weather_info_batch(chunk)
+        except Exception as e:
+            print(f"Error fetching weather batch: {e}")
+            continue
+
+        fetched_at = time.monotonic()
+        with _cache_lock:
+            for key, value in zip(chunk, values):
+                _weather_cache[key] = (fetched_at, value)
+                resolved[key] = value
+
+    return [resolved.get(key, (None, None)) for key in keys]
+
+
+def clear_weather_cache():
+    """날씨 캐시를 비웁니다. (다음 호출은 새로 조회)"""
+    with _cache_lock:
+        _weather_cache.clear()
+        _forecast_cache.clear()
 
 # 이 파일 자체를 실행했을 때만 테스트 코드가 돌아가게 함
 if __name__ == "__main__":
     desc, temp = get_weather_info(37.4201, 127.1262)
-    print(f"결과: {desc}, {temp}")
\ No newline at end of file
+    print(f"결과: {desc}, {temp}")
+    for slot in WEATHER_TIME_SLOTS:
+        print(f"{slot}: {get_weather_for_slot(37.4201, 127.1262, slot)}")
\ No newline at end of file